@@ -9,7 +9,10 @@ import time
 
 # Import the registry to get functions
 sys.path.append('/Users/liweikang/Code/gtool_registry_version')
+import gtools
+import gtools.api
 from gtools.registry import list_all_modules, get_module_info, ConfigHandler, execute_start_sh, auto_import_functions_modules
+from gtools.utils.capture import capture_output
 
 # Auto import all functions
 auto_import_functions_modules()
@@ -417,50 +420,12 @@ def execute_graph(modules: List[Dict[str, Any]]) -> str:
         name = module.get('module_name', module.get('name', 'unknown'))
         params = module.get('params', {})
         try:
-            # Import the module
-            module_info = get_module_info(name)
-            if not module_info['has_function']:
-                results.append(f"{name}: Function not found")
-                continue
-            
-            func = module_info['function']
-            args_parser = module_info['args_parser']
-            
-            # Parse params into args
-            parser = args_parser()
-            # Convert params to command line args
-            args_list = []
-            for key, value in params.items():
-                if key == '_positional_args':
-                    for k, v in value.items():
-                        if isinstance(v, list):
-                            args_list.extend([str(x) for x in v])
-                        else:
-                            args_list.append(str(v))
-                else:
-                    args_list.append(f"--{key}")
-                    if isinstance(value, bool):
-                        if value:
-                            pass  # flag
-                        else:
-                            args_list.pop()  # remove if false
-                    elif isinstance(value, list):
-                        args_list.extend([str(x) for x in value])
-                    else:
-                        args_list.append(str(value))
-            
-            args = parser.parse_args(args_list)
-            
-            # Capture output
-            import io
-            from contextlib import redirect_stdout, redirect_stderr
-            
-            output = io.StringIO()
-            with redirect_stdout(output), redirect_stderr(output):
-                func(args)
-            
-            result = output.getvalue()
-            results.append(f"{name}:\n{result}")
+            # Call the module directly; its return value and timing come back as a RunResult
+            with capture_output() as (out, err):
+                run_result = gtools.run(name, **params)
+            output = out.getvalue() + err.getvalue()
+            summary = f"-> {run_result.value!r} ({run_result.timing['total_ms']:.1f} ms)"
+            results.append(f"{name}:\n{output}{summary}")
         except Exception as e:
             results.append(f"{name}: Error - {str(e)}")
     return "\n".join(results)
@@ -774,64 +739,24 @@ def main():
             st.session_state.node_logs[display_name] += f"Parameters: {params}\n"
 
             try:
-                # Import the module
-                module_info = get_module_info(name)
-                if not module_info['has_function']:
-                    error_msg = f"❌ Error: Function '{name}' not found\n"
-                    st.session_state.terminal_content += error_msg
-                    st.session_state.node_logs[display_name] += error_msg
-                    continue
-
-                func = module_info['function']
-                args_parser = module_info['args_parser']
-                
-                # Get parameter configuration for correct option strings
-                params_config = []
-                if module_info['has_args']:
-                    params_config = parse_argparse_for_ui(module_info['args_parser'])
-
-                # Parse params into args
-                parser = args_parser()
-                args_list = []
-                for key, value in params.items():
-                    if key == '_positional_args':
-                        for k, v in value.items():
-                            if isinstance(v, list):
-                                args_list.extend([str(x) for x in v])
-                            else:
-                                args_list.append(str(v))
-                    else:
-                        # 对于可选参数，使用正确的选项字符串
-                        param_config = next((p for p in params_config if p['dest'] == key), None)
-                        if param_config and 'option_strings' in param_config and param_config['option_strings']:
-                            option_string = param_config['option_strings'][0]  # 使用第一个选项字符串
-                            args_list.append(option_string)
-                        else:
-                            args_list.append(f"--{key}")
-                        
-                        if isinstance(value, bool):
-                            if value:
-                                pass  # flag
-                            else:
-                                args_list.pop()  # remove if false
-                        elif isinstance(value, list):
-                            args_list.extend([str(x) for x in value])
-                        else:
-                            args_list.append(str(value))
-
-                st.session_state.node_logs[display_name] += f"Args list: {args_list}\n"
-
-                args = parser.parse_args(args_list)
+                # Resolve the module and compile params (merged with its default config)
+                func, args, timing = gtools.api.prepare(name, **params)
+                st.session_state.node_logs[display_name] += f"Args: {vars(args)}\n"
 
                 # Use streaming output for real-time display
                 streaming_output = StreamingOutput(terminal_placeholder, 'terminal_content', node_name=display_name)
                 
                 # Redirect stdout and stderr to our streaming output
-                import io
                 from contextlib import redirect_stdout, redirect_stderr
 
+                call_start = time.perf_counter()
                 with redirect_stdout(streaming_output), redirect_stderr(streaming_output):
-                    func(args)
+                    value = gtools.api.call(name, func, args)
+                timing['call_ms'] = (time.perf_counter() - call_start) * 1000
+
+                if value is not None:
+                    st.session_state.node_logs[display_name] += f"Result: {value!r}\n"
+                st.session_state.node_logs[display_name] += f"Timing: {timing}\n"
 
                 # The output has already been streamed, so we don't need to add it again
                 st.session_state.node_logs[display_name] += f"✅ Completed\n"
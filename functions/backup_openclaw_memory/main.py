@@ -257,7 +257,7 @@ class OpenClawMemoryBackup:
         return deleted
 
 
-@FUNCTION.regist(module_name='backup_openclaw_memory')
+@FUNCTION.regist(module_name='backup_openclaw_memory', io_bound=True, max_parallel=1)
 def main(args: argparse.Namespace):
     """Main entry point for backup_openclaw_memory module."""
     print("🐱 OpenClaw Memory Backup & Restore")
@@ -7,11 +7,13 @@ import argparse
 from gtools.registry import ARGS, FUNCTION
 
 
-@FUNCTION.regist(module_name="calculator")
+@FUNCTION.regist(module_name="calculator", pure=True, thread_safe=True)
 def main(args: argparse.Namespace):
     """计算器主函数"""
     print("🧮 计算器模块")
 
+    result = None
+
     if args.operation == "add":
         result = sum(args.numbers)
         print(f"{' + '.join(map(str, args.numbers))} = {result}")
@@ -33,6 +35,8 @@ def main(args: argparse.Namespace):
         print(f"输入数字: {args.numbers}")
         print(f"操作类型: {args.operation}")
 
+    return result
+
 
 @ARGS.regist(module_name="calculator")
 def parse_args():
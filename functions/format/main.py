@@ -10,6 +10,7 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from gtools.events import emit
 from gtools.registry import ARGS, FUNCTION
 
 
@@ -283,16 +284,20 @@ def run_check_only(
     for file_path in files:
         print(f"\n📄 检查文件: {file_path}")
 
+        file_issues = False
         if "pylint" in available_tools and args.use_pylint:
-            issues_found |= run_pylint_check(
+            file_issues |= run_pylint_check(
                 file_path, args.pylint_score, args.pylint_disable, args.pylint_config
             )
 
         if "black" in available_tools and args.use_black:
-            issues_found |= run_black_check(file_path)
+            file_issues |= run_black_check(file_path)
 
         if "isort" in available_tools and args.use_isort:
-            issues_found |= run_isort_check(file_path)
+            file_issues |= run_isort_check(file_path)
+
+        issues_found |= file_issues
+        emit("file_checked", path=file_path, issues=file_issues)
 
     if issues_found:
         print(f"\n⚠️  发现代码质量问题，使用 gtools format 进行修复")
@@ -334,8 +339,10 @@ def run_format(files: List[str], available_tools: List[str], args: argparse.Name
             print(f"  ✅ 已格式化")
         else:
             print(f"  📝 无需更改")
+        emit("file_formatted", path=file_path, changed=file_changed)
 
     print(f"\n🎉 格式化完成! 处理了 {formatted_count}/{len(files)} 个文件")
+    emit("format_done", formatted=formatted_count, total=len(files))
 
 
 @FUNCTION.regist(module_name="format")
@@ -340,7 +340,7 @@ def saved_bags(image_folders: List[str], bags: Set[str]):
     save_txt(founded_bags, "/tmp/founded_bags.txt")
 
 
-@FUNCTION.regist(module_name=f"mark_imgs")
+@FUNCTION.regist(module_name=f"mark_imgs", cpu_bound=True, est_memory_mb=512, max_parallel=1)
 def main(args: argparse.Namespace) -> None:
     out_path = "/tmp/oup_img.txt"  # 使用局部变量而不是全局变量
     if args.sp_name is not None:
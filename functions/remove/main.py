@@ -7,6 +7,7 @@ import argparse
 import shutil
 from pathlib import Path
 
+from gtools.manifest import get_module_index
 from gtools.registry import ARGS, FUNCTION
 
 RESERVE_MODULES = {"create", "remove", "test_module", "calculator", "update"}
@@ -30,14 +31,17 @@ def main(args: argparse.Namespace):
 
     # 检查是否是系统保留模块
     reserved_modules = RESERVE_MODULES
-    if module_name in reserved_modules:
+    if module_name.split("/")[-1] in reserved_modules:
         print(f"❌ 不能删除系统保留模块: {module_name}")
         print(f"保留模块列表: {', '.join(sorted(reserved_modules))}")
         return
 
     base_dir = Path(__file__).parent.parent.parent
-    module_dir = base_dir / "functions" / module_name
-    config_dir = base_dir / "configs" / module_name
+    # 支持嵌套命名空间下的功能包（如 vision/mark_imgs）
+    index = get_module_index()
+    files = index.get(module_name) or index.find(module_name)
+    module_dir = Path(files.path) if files else base_dir / "functions" / module_name
+    config_dir = base_dir / "configs" / module_dir.name
 
     # 检查模块是否存在
     module_exists = module_dir.exists()
@@ -108,29 +112,32 @@ def list_removable_modules():
 
     # 获取所有模块
     all_modules = set()
-
-    # 从 functions 目录获取
-    if functions_dir.exists():
-        for item in functions_dir.iterdir():
-            if (
-                item.is_dir()
-                and not item.name.startswith(".")
-                and not item.name.startswith("__")
-            ):  # 排除 __pycache__ 等
-                all_modules.add(item.name)
-
-    # 从 configs 目录获取
+    module_dirs = {}
+
+    # 从 functions 目录获取（一次遍历的索引，包含嵌套命名空间下的功能包）
+    index = get_module_index()
+    namespaces = {item.rsplit("/", 1)[0] for item in index.modules if "/" in item}
+    for item, files in index.modules.items():
+        # 只包含子功能包的命名空间目录不单独列出
+        if files.main_py is None and item in namespaces:
+            continue
+        all_modules.add(item)
+        module_dirs[item] = Path(files.path)
+
+    # 从 configs 目录获取（与功能包同名的配置目录已包含在上面）
+    module_dir_names = {path.name for path in module_dirs.values()}
     if configs_dir.exists():
         for item in configs_dir.iterdir():
             if (
                 item.is_dir()
                 and not item.name.startswith(".")
                 and not item.name.startswith("__")
+                and item.name not in module_dir_names
             ):  # 排除 __pycache__ 等
                 all_modules.add(item.name)
 
     # 过滤掉保留模块
-    removable_modules = all_modules - reserved_modules
+    removable_modules = {name for name in all_modules if name.split("/")[-1] not in reserved_modules}
 
     if not removable_modules:
         print("🔍 没有找到可删除的模块")
@@ -138,8 +145,8 @@ def list_removable_modules():
         return
 
     for module_name in sorted(removable_modules):
-        module_dir = functions_dir / module_name
-        config_dir = configs_dir / module_name
+        module_dir = module_dirs.get(module_name, functions_dir / module_name)
+        config_dir = configs_dir / module_dir.name
 
         status_parts = []
         if module_dir.exists():
@@ -8,7 +8,7 @@ import time
 from gtools.registry import ARGS, FUNCTION
 
 
-@FUNCTION.regist(module_name="test_module")
+@FUNCTION.regist(module_name="test_module", thread_safe=True, io_bound=True)
 def main(args: argparse.Namespace):
     """主函数：处理测试模块的逻辑"""
     print("=" * 50)
@@ -6,6 +6,15 @@ __version__ = "1.0.0"
 __author__ = "gtools team"
 __description__ = "A registry-based function calling and configuration system"
 
-from .registry import FUNCTION, ARGS
+__all__ = ["FUNCTION", "ARGS", "run", "arun", "gather", "RunResult", "ModuleExitError"]
 
-__all__ = ["FUNCTION", "ARGS"]
\ No newline at end of file
+
+def __getattr__(name):
+    """延迟导出注册器和调用接口，使瘦客户端（gtools.client）无需导入 registry"""
+    if name in ("FUNCTION", "ARGS"):
+        from . import registry
+        return getattr(registry, name)
+    if name in ("run", "arun", "gather", "RunResult", "ModuleExitError"):
+        from . import api
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
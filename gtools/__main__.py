@@ -1,7 +1,7 @@
 """
 gtools 包的主入口点
 """
-from .cli import main
+from .client import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,245 @@
+"""
+Python 调用接口
+在 Python 代码中直接调用功能模块，不经过命令行字符串和 stdout 解析：
+
+    >>> import gtools
+    >>> result = gtools.run("calculator", numbers=[1, 2, 3], operation="multiply")
+    >>> result.value
+    6.0
+    >>> result.timing
+    {'resolve_ms': 0.4, 'compile_ms': 0.1, 'call_ms': 0.05, 'total_ms': 0.6}
+
+关键字参数与 configs/<module>/default.json 深度合并后直接编译为 argparse.Namespace。
+位置参数既可以放在 _positional_args 中，也可以按 dest 直接作为关键字参数传入。
+
+在 asyncio 中使用 arun / gather，同步模块在受管理的线程池中执行，协程模块直接 await：
+
+    >>> result = await gtools.arun("calculator", numbers=[1, 2])
+    >>> results = await gtools.gather(("calculator", {"numbers": [i]}) for i in range(100))
+"""
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import events
+from .registry import (
+    FUNCTION,
+    PARSERS,
+    auto_import_module,
+    compile_module_args,
+    invoke,
+    validate_module,
+)
+
+
+class ModuleExitError(RuntimeError):
+    """模块以非零退出码调用了 sys.exit"""
+
+    def __init__(self, module_name: str, exit_code: int):
+        super().__init__(f"模块 '{module_name}' 退出，退出码 {exit_code}")
+        self.module_name = module_name
+        self.exit_code = exit_code
+
+
+class RunResult:
+    """一次模块调用的结果：返回值与分阶段耗时（毫秒）"""
+
+    __slots__ = ("module", "value", "timing")
+
+    def __init__(self, module: str, value: Any, timing: Dict[str, float]):
+        self.module = module
+        self.value = value
+        self.timing = timing
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"module": self.module, "value": self.value, "timing": dict(self.timing)}
+
+    def __repr__(self) -> str:
+        return f"RunResult(module={self.module!r}, value={self.value!r}, total_ms={self.timing['total_ms']:.2f})"
+
+
+def _ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 3)
+
+
+def build_config(module_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """默认配置与关键字参数合并；以位置参数 dest 命名的关键字参数归入 _positional_args"""
+    from .runner import build_module_config
+
+    params = dict(params)
+    parser = PARSERS.get_parser(module_name)
+    if parser is not None:
+        positional = dict(params.get("_positional_args", {}))
+        for action in parser._actions:
+            if not action.option_strings and action.dest in params:
+                positional[action.dest] = params.pop(action.dest)
+        if positional:
+            params["_positional_args"] = positional
+    return build_module_config(module_name, params)
+
+
+def prepare(module_name: str, **params: Any):
+    """解析模块并编译参数，返回 (函数, Namespace, 耗时)
+
+    Raises:
+        LookupError: 模块未注册或注册不完整
+        ConfigCompileError: 参数不合法
+    """
+    start = time.perf_counter()
+    if not FUNCTION.has(module_name):
+        auto_import_module(module_name)
+    if not validate_module(module_name):
+        raise LookupError(f"模块 '{module_name}' 未注册或注册不完整")
+    func = FUNCTION.get(module_name)
+    resolved = time.perf_counter()
+    args = compile_module_args(module_name, build_config(module_name, params))
+    compiled = time.perf_counter()
+    return func, args, {"resolve_ms": _ms(start, resolved), "compile_ms": _ms(resolved, compiled)}
+
+
+def _exit_code(e: SystemExit) -> int:
+    return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+
+
+def call(module_name: str, func, args) -> Any:
+    """调用模块函数；sys.exit(0) 视为正常结束，非零退出码转换为 ModuleExitError"""
+    try:
+        with events.scope(module_name):
+            return invoke(func, args)
+    except SystemExit as e:
+        code = _exit_code(e)
+        if code != 0:
+            raise ModuleExitError(module_name, code) from None
+        return None
+
+
+def run(module_name: str, **params: Any) -> RunResult:
+    """在当前进程中调用模块并返回 RunResult
+
+    模块的 print 输出照常写入 stdout；需要单独收集时配合 gtools.utils.capture.capture_output 使用。
+
+    Raises:
+        LookupError: 模块未注册或注册不完整
+        ConfigCompileError: 参数不合法
+        ModuleExitError: 模块以非零退出码退出
+    """
+    start = time.perf_counter()
+    func, args, timing = prepare(module_name, **params)
+    call_start = time.perf_counter()
+    value = call(module_name, func, args)
+    end = time.perf_counter()
+    timing["call_ms"] = _ms(call_start, end)
+    timing["total_ms"] = _ms(start, end)
+    return RunResult(module_name, value, timing)
+
+
+# ---- asyncio 接口 ----
+
+DEFAULT_GATHER_LIMIT = 64
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+# 事件循环 -> {模块名: asyncio.Semaphore}，信号量只能在创建它的事件循环中使用
+_LOOP_LIMITS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """arun 执行同步模块使用的线程池（首次使用时创建，大小由 GTOOLS_ASYNC_WORKERS 指定）"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                workers = int(os.environ.get("GTOOLS_ASYNC_WORKERS", 0)) or min(32, (os.cpu_count() or 1) + 4)
+                _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gtools-arun")
+    return _EXECUTOR
+
+
+def shutdown_executor(wait: bool = True):
+    """关闭 arun 的线程池，之后再调用 arun 会重新创建"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _module_limit(loop, module_name: str, coroutine: bool) -> Optional[asyncio.Semaphore]:
+    """按执行特性限制同一模块的并发：max_parallel，未声明 thread_safe 的同步模块单实例运行"""
+    limits = _LOOP_LIMITS.setdefault(loop, {})
+    if module_name not in limits:
+        capabilities = FUNCTION.get_capabilities(module_name)
+        limit = capabilities["max_parallel"]
+        if not coroutine and not capabilities["thread_safe"]:
+            limit = 1
+        limits[module_name] = asyncio.Semaphore(limit) if limit else None
+    return limits[module_name]
+
+
+async def _acall(module_name: str, func, args) -> Any:
+    """执行协程模块，退出码处理与 call 一致"""
+    try:
+        with events.scope(module_name):
+            return await func(args)
+    except SystemExit as e:
+        code = _exit_code(e)
+        if code != 0:
+            raise ModuleExitError(module_name, code) from None
+        return None
+
+
+async def arun(module_name: str, **params: Any) -> RunResult:
+    """run 的异步版本：协程模块直接 await，同步模块在线程池中执行，不阻塞事件循环
+
+    Raises:
+        与 run 相同
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    if FUNCTION.has(module_name) and not FUNCTION.is_lazy(module_name):
+        func, args, timing = prepare(module_name, **params)
+    else:
+        # 首次调用需要导入功能包，放到线程池中避免阻塞事件循环
+        func, args, timing = await loop.run_in_executor(
+            get_executor(), functools.partial(prepare, module_name, **params))
+
+    coroutine = inspect.iscoroutinefunction(func)
+    limit = _module_limit(loop, module_name, coroutine)
+    if limit is not None:
+        await limit.acquire()
+    try:
+        call_start = time.perf_counter()
+        if coroutine:
+            value = await _acall(module_name, func, args)
+        else:
+            value = await loop.run_in_executor(get_executor(), call, module_name, func, args)
+        end = time.perf_counter()
+    finally:
+        if limit is not None:
+            limit.release()
+    timing["call_ms"] = _ms(call_start, end)
+    timing["total_ms"] = _ms(start, end)
+    return RunResult(module_name, value, timing)
+
+
+async def gather(calls: Iterable[Tuple[str, Dict[str, Any]]], limit: Optional[int] = DEFAULT_GATHER_LIMIT,
+                 return_exceptions: bool = False) -> List[Any]:
+    """并发执行多个 (模块名, 参数) 调用，同时运行的调用数不超过 limit，结果按输入顺序返回
+
+    return_exceptions 为 True 时失败的调用以异常对象出现在结果中，否则第一个异常向上抛出
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def bounded(module_name: str, params: Dict[str, Any]):
+        if semaphore is None:
+            return await arun(module_name, **params)
+        async with semaphore:
+            return await arun(module_name, **params)
+
+    return await asyncio.gather(*(bounded(module_name, params or {}) for module_name, params in calls),
+                                return_exceptions=return_exceptions)
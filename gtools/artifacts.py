@@ -0,0 +1,97 @@
+"""
+管道节点之间的数据边
+节点的返回值发布到内存中的 ArtifactStore，下游节点通过 inputs 声明把它注入到自己的参数中：
+
+    {"name": "stats", "module_name": "calculator", "inputs": {"numbers": "calculator2.result"}}
+
+引用格式为 <节点名>.result，之后可以用 .<键> 取字典的键或列表的下标（如 loader.result.images.0）。
+值也可以是引用列表，注入时组成列表：{"numbers": ["calculator1.result", "calculator2.result"]}。
+引用的节点自动成为依赖。注入的值不经过参数类型转换；串行和线程池执行时就是上游返回的同一个对象
+（不经过序列化，下游节点不应修改它），进程池和独立进程中经 pickle 传递。
+所有引用它的下游节点结束后，值从存储中释放。
+跨进程时较大的返回值以共享内存传递（见 gtools.transport），存储中保存的是 SharedValue，释放时 unlink。
+"""
+from typing import Any, Dict, List, Tuple
+
+from .transport import SharedValue
+
+
+def parse_ref(ref: str) -> Tuple[str, List[str]]:
+    """解析 <节点名>.result[.<键>...]，返回 (节点名, 键路径)
+
+    Raises:
+        ValueError: 格式不合法
+    """
+    parts = ref.split(".") if isinstance(ref, str) else []
+    if len(parts) < 2 or not parts[0] or parts[1] != "result" or not all(parts[2:]):
+        raise ValueError(f"输入引用格式应为 <节点名>.result[.<键>...]: {ref!r}")
+    return parts[0], parts[2:]
+
+
+class ArtifactStore:
+    """节点返回值的内存存储，按下游引用数计数，最后一个下游节点结束后释放
+
+    Usage:
+    ---
+    >>> store = ArtifactStore()
+    >>> store.publish("loader", images, consumers=2)
+    >>> store.resolve("loader.result.0")
+    >>> store.release("loader")
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._consumers: Dict[str, int] = {}
+
+    def publish(self, name: str, value: Any, consumers: int):
+        """保存节点的返回值，consumers 为引用它的下游节点数"""
+        if consumers > 0:
+            self._values[name] = value
+            self._consumers[name] = consumers
+
+    def resolve(self, ref: str) -> Any:
+        """按引用取值
+
+        Raises:
+            KeyError: 节点没有发布返回值，或键路径不存在
+        """
+        name, path = parse_ref(ref)
+        if name not in self._values:
+            raise KeyError(f"节点 '{name}' 没有可用的返回值")
+        value = self._values[name]
+        if isinstance(value, SharedValue):
+            # 由执行节点的进程连接共享内存后再取键
+            return value.select(path) if path else value
+        for key in path:
+            try:
+                value = value[int(key)] if isinstance(value, (list, tuple)) else value[key]
+            except (KeyError, IndexError, TypeError, ValueError):
+                raise KeyError(f"{ref}: 返回值中没有 '{key}'") from None
+        return value
+
+    def release(self, name: str):
+        """一个下游节点不再需要该值；引用数归零时释放"""
+        if name not in self._consumers:
+            return
+        self._consumers[name] -= 1
+        if self._consumers[name] <= 0:
+            del self._consumers[name]
+            self._discard(self._values.pop(name, None))
+
+    def clear(self):
+        """释放全部值（管道结束时，失败或被跳过的下游节点不会再 release）"""
+        for value in self._values.values():
+            self._discard(value)
+        self._values.clear()
+        self._consumers.clear()
+
+    @staticmethod
+    def _discard(value: Any):
+        if isinstance(value, SharedValue):
+            value.unlink()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -0,0 +1,442 @@
+"""
+启动与分发基准测试（gtools bench startup / discovery / transport）
+以子进程方式重复执行典型命令，统计冷启动与热启动耗时的分位数，
+结果可保存为 JSON，便于在不同提交之间对比 CLI 开销。
+
+- 冷启动：每次运行使用全新的 gtools 缓存目录和字节码缓存目录（清单、.pyc 均需重建）
+- 热启动：所有运行共享同一缓存目录，并先执行若干次预热
+- discovery：在临时目录中生成 10~5000 个嵌套命名空间下的合成功能包，
+  测量 gtools list 与单模块调用随模块数量的变化
+- transport：管道节点跨进程传递 10M~2G 返回值，pickle 经管道 vs 共享内存（gtools.transport）
+"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+BENCH_VERSION = 1
+
+# 基准测试会清除的环境变量，避免转发到常驻服务或输出导入报告
+_STRIPPED_ENV = ("GTOOLS_SERVER", "GTOOLS_IMPORT_PROFILE", "GTOOLS_CACHE_DIR", "PYTHONPYCACHEPREFIX")
+
+
+def get_project_root() -> str:
+    """gtools 项目根目录"""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """线性插值分位数，q 取值 0-100"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """耗时样本（毫秒）的统计摘要"""
+    return {
+        "runs": len(samples),
+        "min": min(samples) if samples else 0.0,
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        "max": max(samples) if samples else 0.0,
+    }
+
+
+def write_synthetic_pipeline(path: str) -> str:
+    """生成基准测试用的管道配置：计算器 -> 测试模块（试运行）"""
+    config = {
+        "working_directory": os.path.dirname(path),
+        "modules": [
+            {
+                "name": "calculator",
+                "params": {"operation": "multiply", "show_details": True,
+                           "_positional_args": {"numbers": [2, 3, 4]}},
+            },
+            {
+                "name": "test_module",
+                "params": {"dry_run": True, "items": "bench"},
+                "depends_on": ["calculator"],
+            },
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def default_scenarios(pipeline_path: str) -> Dict[str, List[str]]:
+    """基准场景：名称 -> gtools 参数"""
+    module_config = os.path.join(get_project_root(), "configs", "calculator", "default.json")
+    return {
+        "root": ["root"],
+        "list": ["list"],
+        "info": ["info", "calculator"],
+        "module": ["calculator", "1", "2", "3"],
+        "module_config": ["run", "--module-config", module_config,
+                          "--option", "_positional_args.numbers=[1,2,3]"],
+        "pipeline": ["run", "--config", pipeline_path],
+    }
+
+
+class StartupBenchmark:
+    """启动基准测试
+
+    Usage:
+    ---
+    >>> bench = StartupBenchmark(repeat=10)
+    >>> results = bench.run()
+    >>> print(bench.format_table(results))
+    """
+
+    def __init__(self, repeat: int = 10, warmup: int = 2, modes: Optional[List[str]] = None,
+                 scenarios: Optional[List[str]] = None):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.modes = modes or ["cold", "warm"]
+        self.scenarios = scenarios
+        self._workdir: Optional[str] = None
+
+    def _base_env(self) -> Dict[str, str]:
+        env = {k: v for k, v in os.environ.items() if k not in _STRIPPED_ENV}
+        root = get_project_root()
+        env["PYTHONPATH"] = root + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+        return env
+
+    def _fresh_cache_env(self, name: str, base_env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """创建一组新的缓存目录并返回对应的环境变量"""
+        cache_root = tempfile.mkdtemp(prefix=f"{name}-", dir=self._workdir)
+        env = dict(base_env) if base_env is not None else self._base_env()
+        env["GTOOLS_CACHE_DIR"] = os.path.join(cache_root, "gtools")
+        env["PYTHONPYCACHEPREFIX"] = os.path.join(cache_root, "pycache")
+        return env
+
+    def time_command(self, argv: List[str], env: Dict[str, str], cwd: Optional[str] = None) -> float:
+        """执行一次命令，返回耗时（毫秒）；命令失败时抛出 RuntimeError"""
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-m", "gtools"] + argv, env=env,
+                              cwd=cwd or get_project_root(), stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+            raise RuntimeError(f"命令 'gtools {' '.join(argv)}' 退出码 {proc.returncode}: "
+                               f"{stderr[-1] if stderr else ''}")
+        return elapsed
+
+    def run_scenario(self, argv: List[str], mode: str, cwd: Optional[str] = None,
+                     env: Optional[Dict[str, str]] = None) -> List[float]:
+        """按模式重复执行同一场景，返回耗时样本"""
+        if mode == "cold":
+            return [self.time_command(argv, self._fresh_cache_env("cold", env), cwd)
+                    for _ in range(self.repeat)]
+
+        env = self._fresh_cache_env("warm", env)
+        for _ in range(self.warmup):
+            self.time_command(argv, env, cwd)
+        return [self.time_command(argv, env, cwd) for _ in range(self.repeat)]
+
+    def run(self) -> Dict[str, Any]:
+        """执行全部场景，返回可序列化为 JSON 的结果"""
+        self._workdir = tempfile.mkdtemp(prefix="gtools-bench-")
+        try:
+            pipeline_path = write_synthetic_pipeline(os.path.join(self._workdir, "pipeline.json"))
+            scenarios = default_scenarios(pipeline_path)
+            if self.scenarios:
+                unknown = [name for name in self.scenarios if name not in scenarios]
+                if unknown:
+                    raise ValueError(f"未知的基准场景: {', '.join(unknown)}")
+                scenarios = {name: scenarios[name] for name in self.scenarios}
+
+            results: Dict[str, Dict[str, Any]] = {}
+            for name, argv in scenarios.items():
+                results[name] = {"argv": argv}
+                for mode in self.modes:
+                    samples = self.run_scenario(argv, mode)
+                    results[name][mode] = dict(summarize(samples), samples=samples)
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
+
+        return {
+            "version": BENCH_VERSION,
+            "suite": "startup",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": self.repeat,
+            "warmup": self.warmup,
+            "results": results,
+        }
+
+    @staticmethod
+    def format_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+        """文本表格；提供 baseline 时附加 p50 相对变化"""
+        header = f"{'场景':<16} {'模式':<6} {'min':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+        if baseline:
+            header += f" {'Δp50':>9}"
+        title = "启动基准" if report.get("suite") == "startup" else "模块发现基准"
+        lines = [f"gtools {title}（{report['repeat']} 次/场景，单位 ms，提交 {report.get('commit') or '-'}）",
+                 header, "-" * len(header)]
+        base_results = (baseline or {}).get("results", {})
+        for name, result in report["results"].items():
+            for mode in ("cold", "warm"):
+                stats = result.get(mode)
+                if not stats:
+                    continue
+                line = (f"{name:<16} {mode:<6} {stats['min']:>9.1f} {stats['p50']:>9.1f} "
+                        f"{stats['p90']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+                if baseline:
+                    base = base_results.get(name, {}).get(mode)
+                    if base and base.get("p50"):
+                        line += f" {(stats['p50'] - base['p50']) / base['p50'] * 100:>+8.1f}%"
+                    else:
+                        line += f" {'-':>9}"
+                lines.append(line)
+        return "\n".join(lines)
+
+
+SYNTHETIC_MODULE_TEMPLATE = '''"""
+合成功能包（基准测试生成）
+"""
+import argparse
+
+from gtools.registry import ARGS, FUNCTION
+
+
+@FUNCTION.regist(module_name="{name}")
+def main(args: argparse.Namespace):
+    print(args.value)
+
+
+@ARGS.regist(module_name="{name}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="合成功能包 {name}")
+    parser.add_argument("--value", type=int, default=0)
+    return parser
+'''
+
+
+def write_synthetic_project(root: str, count: int, per_namespace: int = 100) -> str:
+    """在 root 下生成包含 count 个功能包的项目，返回第一个模块名
+
+    功能包按每 per_namespace 个放入一个命名空间目录（functions/ns_000/mod_00000/main.py），
+    gtools 包以符号链接方式引入，使 functions 目录解析到 root 下
+    """
+    os.makedirs(os.path.join(root, "functions"))
+    os.makedirs(os.path.join(root, "configs"))
+    open(os.path.join(root, "functions", "__init__.py"), "w").close()
+    os.symlink(os.path.join(get_project_root(), "gtools"), os.path.join(root, "gtools"))
+    for i in range(count):
+        name = f"mod_{i:05d}"
+        module_dir = os.path.join(root, "functions", f"ns_{i // per_namespace:03d}", name)
+        os.makedirs(module_dir)
+        with open(os.path.join(module_dir, "main.py"), "w", encoding="utf-8") as f:
+            f.write(SYNTHETIC_MODULE_TEMPLATE.format(name=name))
+    return "mod_00000"
+
+
+class DiscoveryBenchmark(StartupBenchmark):
+    """模块发现基准：测量 gtools list 与单模块调用随功能包数量的变化"""
+
+    def __init__(self, sizes: Optional[List[int]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.sizes = sizes or [10, 100, 1000, 5000]
+
+    def run(self) -> Dict[str, Any]:
+        """为每个规模生成合成项目并执行 list / info / 单模块调用"""
+        self._workdir = tempfile.mkdtemp(prefix="gtools-bench-")
+        try:
+            results: Dict[str, Dict[str, Any]] = {}
+            for size in self.sizes:
+                root = os.path.join(self._workdir, f"project-{size}")
+                module_name = write_synthetic_project(root, size)
+                env = {k: v for k, v in os.environ.items() if k not in _STRIPPED_ENV + ("PYTHONPATH",)}
+                scenarios = {
+                    "list": ["list"],
+                    "info": ["info", module_name],
+                    "module": [module_name, "--value", "1"],
+                }
+                for name, argv in scenarios.items():
+                    if self.scenarios and name not in self.scenarios:
+                        continue
+                    key = f"{name}@{size}"
+                    results[key] = {"argv": argv, "modules": size}
+                    for mode in self.modes:
+                        samples = self.run_scenario(argv, mode, cwd=root, env=env)
+                        results[key][mode] = dict(summarize(samples), samples=samples)
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
+
+        return {
+            "version": BENCH_VERSION,
+            "suite": "discovery",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": self.repeat,
+            "warmup": self.warmup,
+            "sizes": self.sizes,
+            "results": results,
+        }
+
+
+def _transport_payload(size: int):
+    """基准测试的载荷：有 numpy 时为 uint8 数组（如解码后的图像），否则为 bytearray"""
+    try:
+        import numpy
+    except ImportError:
+        return bytearray(b"\x07") * size
+    return numpy.full(size, 7, dtype=numpy.uint8)
+
+
+def _touch(value) -> int:
+    """消费者读取每个内存页，共享内存的缺页开销计入耗时"""
+    view = memoryview(value).cast("B")
+    return sum(view[::4096])
+
+
+def _transport_producer(conn, size: int, mode: str):
+    """子进程：生成载荷后等待开始信号，记录发送前的时间并按指定方式发送"""
+    from .transport import share
+
+    value = _transport_payload(size)
+    conn.send("ready")
+    conn.recv()
+    start = time.perf_counter()
+    conn.send(start)
+    conn.send(share(value, threshold=0) if mode == "shm" else value)
+    conn.recv()
+    conn.close()
+
+
+class TransportBenchmark:
+    """管道节点跨进程传递大对象的基准：pickle 经管道传递 vs 共享内存（pickle 协议 5 带外缓冲区）
+
+    每次测量由子进程生成载荷，计时从子进程开始发送到父进程得到可用对象并读取每个内存页为止。
+
+    Usage:
+    ---
+    >>> bench = TransportBenchmark(sizes=[10 << 20, 1 << 30], repeat=3)
+    >>> print(bench.format_table(bench.run()))
+    """
+
+    MODES = ("pipe", "shm")
+
+    def __init__(self, sizes: Optional[List[int]] = None, repeat: int = 3):
+        self.sizes = sizes or [10 << 20, 100 << 20, 1 << 30, 2 << 30]
+        self.repeat = repeat
+
+    def measure(self, size: int, mode: str) -> float:
+        """一次传递的耗时（毫秒）"""
+        from .pipeline import _mp_context
+        from .transport import SharedValue, close_attached
+
+        ctx = _mp_context()
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=_transport_producer, args=(child_conn, size, mode), daemon=True)
+        proc.start()
+        child_conn.close()
+        handle = None
+        try:
+            if parent_conn.recv() != "ready":
+                raise RuntimeError("载荷生成失败")
+            parent_conn.send("go")
+            start = parent_conn.recv()
+            value = parent_conn.recv()
+            if isinstance(value, SharedValue):
+                handle, value = value, value.load()
+            _touch(value)
+            elapsed = (time.perf_counter() - start) * 1000
+            parent_conn.send("done")
+        except EOFError:
+            raise RuntimeError(f"子进程异常退出（退出码 {proc.exitcode}），载荷可能超出可用内存") from None
+        finally:
+            value = None
+            close_attached()
+            if handle is not None:
+                handle.unlink()
+            proc.join()
+        return elapsed
+
+    def run(self) -> Dict[str, Any]:
+        """对每个大小分别测量两种传递方式"""
+        from .transport import prepare
+
+        prepare()
+        results: Dict[str, Dict[str, Any]] = {}
+        for size in self.sizes:
+            entry: Dict[str, Any] = {"bytes": size}
+            for mode in self.MODES:
+                samples = [self.measure(size, mode) for _ in range(self.repeat)]
+                entry[mode] = dict(summarize(samples), samples=samples)
+            results[_format_size(size)] = entry
+        return {
+            "version": BENCH_VERSION,
+            "suite": "transport",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "payload": type(_transport_payload(1)).__name__,
+            "repeat": self.repeat,
+            "results": results,
+        }
+
+    @staticmethod
+    def format_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+        """文本表格：两种方式的 p50、吞吐量与加速比；提供 baseline 时附加共享内存 p50 的相对变化"""
+        header = (f"{'大小':<8} {'pipe p50':>10} {'shm p50':>10} {'pipe GB/s':>10} {'shm GB/s':>10} "
+                  f"{'加速':>8}")
+        if baseline:
+            header += f" {'Δshm':>9}"
+        lines = [f"gtools 跨进程传递基准（{report['payload']}，{report['repeat']} 次/大小，单位 ms，"
+                 f"提交 {report.get('commit') or '-'}）", header, "-" * len(header)]
+        base_results = (baseline or {}).get("results", {})
+        for name, result in report["results"].items():
+            pipe, shm = result["pipe"]["p50"], result["shm"]["p50"]
+
+            def throughput(ms: float) -> float:
+                return result["bytes"] / (1 << 30) / (ms / 1000) if ms > 0 else 0.0
+
+            line = (f"{name:<8} {pipe:>10.1f} {shm:>10.1f} {throughput(pipe):>10.2f} {throughput(shm):>10.2f} "
+                    f"{pipe / shm if shm > 0 else 0:>7.1f}x")
+            if baseline:
+                base = base_results.get(name, {}).get("shm")
+                line += f" {(shm - base['p50']) / base['p50'] * 100:>+8.1f}%" if base and base.get("p50") \
+                    else f" {'-':>9}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+    for unit, factor in (("G", 1 << 30), ("M", 1 << 20), ("K", 1 << 10)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def _git_commit() -> Optional[str]:
+    """当前提交的短哈希，非 git 仓库时返回 None"""
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=get_project_root(),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.decode().strip() or None
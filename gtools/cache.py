@@ -0,0 +1,268 @@
+"""
+纯模块的结果缓存
+声明 pure=True 即启用缓存：这样的模块（如 calculator）通过 run_module / run --module-config 执行时，
+以 模块名 + 模块源文件哈希 + 合并后的完整参数 计算内容地址，
+把捕获的 stdout/stderr 和返回值保存在缓存目录下，再次以相同参数运行时直接回放。
+缓存总大小超过上限时按最近使用时间（LRU）淘汰。
+
+- 禁用：--no-cache 或环境变量 GTOOLS_NO_CACHE=1
+- 大小上限：环境变量 GTOOLS_RESULT_CACHE_MB（默认 64）
+- 命中/未命中/淘汰计数和缓存大小估计保存在缓存目录下固定大小的 counters 文件中，由 gtools cache stats 读取
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows：不加锁，并发执行时计数可能丢失
+    fcntl = None
+
+from .manifest import get_cache_dir
+from .utils.json_exact import fits_json
+
+RESULT_CACHE_VERSION = 1
+DEFAULT_MAX_MB = 64
+
+# counters 文件：命中、未命中、淘汰次数和缓存大小估计，各 8 字节
+COUNTER_NAMES = ("hits", "misses", "evictions", "size_bytes")
+_COUNTERS = struct.Struct("<4q")
+
+
+def _source_digest(func: Callable) -> Optional[str]:
+    """模块函数所在源文件的 sha1，无法定位源文件时返回 None（不缓存）"""
+    module = sys.modules.get(getattr(func, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _encode_args(args: argparse.Namespace) -> Optional[str]:
+    """参数的稳定 JSON 表示；参数不能经 JSON 原样表示时（tuple、Path 等）返回 None（不缓存）"""
+    values = vars(args)
+    if not fits_json(values):
+        return None
+    return json.dumps(values, sort_keys=True, ensure_ascii=False)
+
+
+class ResultCache:
+    """磁盘结果缓存
+
+    Usage:
+    ---
+    >>> cache = ResultCache()
+    >>> key = cache.key_for("calculator", func, args)
+    >>> record = cache.get(key)
+    >>> if record is None:
+    >>>     cache.put(key, {"stdout": "...", "stderr": "", "result": 6})
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or os.path.join(get_cache_dir(), "results")
+        if max_bytes is None:
+            try:
+                max_mb = float(os.environ.get("GTOOLS_RESULT_CACHE_MB", DEFAULT_MAX_MB))
+            except ValueError:
+                max_mb = DEFAULT_MAX_MB
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+    def key_for(self, module_name: str, func: Callable, args: argparse.Namespace) -> Optional[str]:
+        """计算缓存键；源文件不可读或参数不能经 JSON 原样表示时返回 None"""
+        digest = _source_digest(func)
+        encoded = _encode_args(args)
+        if digest is None or encoded is None:
+            return None
+        payload = "\n".join([str(RESULT_CACHE_VERSION), module_name, digest, encoded])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存记录，命中时刷新最近使用时间"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self._update_counters(misses=1)
+            return None
+        self._update_counters(hits=1)
+        return record
+
+    def put(self, key: str, record: Dict[str, Any]):
+        """写入缓存记录并按需淘汰，缓存目录不可写时静默跳过
+
+        每次写入只累加缓存大小估计，估计值超过上限（或还没有估计值）时才扫描缓存目录淘汰
+        """
+        path = self._path(key)
+        record = dict(record, created=time.time())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            return
+        counters = self._update_counters(size_bytes=size)
+        # 估计值只有本条记录时（刚创建计数文件或缓存原本为空）扫描一次以校准
+        if counters is None or counters["size_bytes"] > self.max_bytes or counters["size_bytes"] == size:
+            self.evict()
+
+    def _entries(self):
+        """所有缓存文件的 (路径, 大小, 最近使用时间)"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """扫描缓存目录，总大小超过上限时从最久未使用的记录开始删除，返回删除数量
+
+        扫描结果同时校准缓存大小估计
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._update_counters(evictions=removed, size=total)
+        return removed
+
+    def _counters_path(self) -> str:
+        return os.path.join(self.cache_dir, "counters")
+
+    def _read_counters(self) -> Dict[str, int]:
+        """读取计数，文件不存在或损坏时全部为 0"""
+        try:
+            with open(self._counters_path(), "rb") as f:
+                data = f.read(_COUNTERS.size)
+        except OSError:
+            data = b""
+        values = _COUNTERS.unpack(data) if len(data) == _COUNTERS.size else (0,) * len(COUNTER_NAMES)
+        return dict(zip(COUNTER_NAMES, values))
+
+    def _update_counters(self, size: Optional[int] = None, **amounts: int) -> Optional[Dict[str, int]]:
+        """累加计数并返回更新后的值；size 不为 None 时把缓存大小估计设为 size
+
+        计数文件大小固定，在文件锁内读取、修改、写回，多个进程同时执行时不会丢失计数；
+        不可写时返回 None
+        """
+        flags = os.O_RDWR | os.O_CREAT
+        try:
+            try:
+                fd = os.open(self._counters_path(), flags, 0o644)
+            except FileNotFoundError:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                fd = os.open(self._counters_path(), flags, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.read(fd, _COUNTERS.size)
+                values = list(_COUNTERS.unpack(data)) if len(data) == _COUNTERS.size else [0] * len(COUNTER_NAMES)
+                for i, name in enumerate(COUNTER_NAMES):
+                    values[i] += amounts.get(name, 0)
+                if size is not None:
+                    values[COUNTER_NAMES.index("size_bytes")] = size
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _COUNTERS.pack(*values))
+            finally:
+                os.close(fd)  # 同时释放文件锁
+        except OSError:
+            return None
+        return dict(zip(COUNTER_NAMES, values))
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        entries = self._entries()
+        counters = self._read_counters()
+        return {
+            "cache_dir": self.cache_dir,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def clear(self) -> int:
+        """删除全部缓存记录和统计，返回删除的记录数"""
+        entries = self._entries()
+        for path, _, _ in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        try:
+            os.unlink(self._counters_path())
+        except OSError:
+            pass
+        return len(entries)
+
+
+def cache_enabled(no_cache: bool = False) -> bool:
+    """是否启用结果缓存"""
+    return not no_cache and os.environ.get("GTOOLS_NO_CACHE", "") in ("", "0")
+
+
+def run_cached(module_name: str, func: Callable, args: argparse.Namespace,
+               capabilities: Dict[str, Any], no_cache: bool = False) -> Any:
+    """执行模块函数：纯模块命中缓存时回放输出，否则执行并记录
+
+    只有声明了 pure=True、正常返回且返回值能经 JSON 原样还原的执行才会被缓存
+    """
+    from .registry import invoke
+
+    if not capabilities.get("pure") or not cache_enabled(no_cache):
+        return invoke(func, args)
+
+    from .utils.capture import capture_output
+
+    cache = ResultCache()
+    key = cache.key_for(module_name, func, args)
+    if key is None:
+        return invoke(func, args)
+
+    record = cache.get(key)
+    if record is not None:
+        sys.stdout.write(record.get("stdout", ""))
+        sys.stderr.write(record.get("stderr", ""))
+        print(f"⚡ 命中结果缓存 ({key[:12]})，使用 --no-cache 重新执行", file=sys.stderr)
+        return record.get("result")
+
+    with capture_output(tee=True) as (out, err):
+        result = invoke(func, args)
+    # 命中时返回值从 JSON 还原，不能原样还原的返回值不缓存
+    if fits_json(result):
+        cache.put(key, {"module": module_name, "stdout": out.getvalue(), "stderr": err.getvalue(),
+                        "result": result})
+    return result
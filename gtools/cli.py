@@ -6,7 +6,8 @@ import os
 import argparse
 import traceback
 import json
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from beautifultable import BeautifulTable
 
 from .registry import (
@@ -17,11 +18,29 @@ from .registry import (
     list_all_modules, 
     validate_module,
     auto_import_functions_modules,
+    auto_import_module,
     list_modules_with_start_sh,
     execute_start_sh,
     get_module_start_sh_path,
-    get_module_skill_md_path
+    get_module_skill_md_path,
+    has_default_config,
+    get_module_parser,
+    compile_module_args,
+    ConfigCompileError
 )
+from .cache import run_cached
+from . import events, stats, trace
+from .output import DEFAULT_BUFFER_SIZE, BufferedStdout, default_log_path, parse_size
+from .utils.text import display_width
+from .watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, Watcher, split_watch_argv
+
+# 模块数量超过该值时 gtools list 不再渲染表格
+LIST_TABLE_LIMIT = 200
+
+
+def _ljust_display(text: str, width: int) -> str:
+    """按显示宽度左对齐"""
+    return text + " " * (width - display_width(text))
 
 
 class CLI:
@@ -29,6 +48,8 @@ class CLI:
     
     def __init__(self):
         self.config_handler = ConfigHandler()
+        # 是否禁用纯模块的结果缓存（--no-cache）
+        self.no_cache = False
     
     def create_main_parser(self) -> argparse.ArgumentParser:
         """创建主命令行解析器"""
@@ -45,9 +66,30 @@ class CLI:
   gtools list                             # 列出所有可用模块
   gtools root                             # 输出 gtools 根目录路径
   gtools run --config config.json                   # 运行管道配置文件
+  gtools run --config config.json --max-workers 8   # 依赖完成的节点并行执行
+  gtools run --config config.json --isolate         # 每个节点在独立子进程中执行
+  gtools run --config config.json --incremental --explain  # 跳过指纹未变化的节点并说明原因
   gtools run --module-config config.json            # 运行单模块配置文件
   gtools run --module-config config.json --option operation=multiply  # 覆盖配置参数
   gtools info module_name                 # 显示模块详细信息
+  gtools serve                            # 启动常驻服务（客户端设置 GTOOLS_SERVER=1 后自动转发）
+  gtools --import-profile                 # 分析各功能模块及重量级依赖的导入耗时
+  gtools --import-profile=json            # 以 JSON 格式输出导入耗时报告
+  gtools sweep calculator --grid operation=add,multiply --grid _positional_args.numbers=[1,2],[3,4]
+  gtools watch calculator 1 2 --paths data/  # 监听文件变化并重新执行模块
+  gtools --no-cache calculator 1 2        # 不使用纯模块的结果缓存（声明 pure=True 的模块默认缓存）
+  gtools --trace out.json calculator 1 2  # 记录各阶段耗时（Chrome trace，可用 Perfetto 查看）
+  gtools --stats run --config pipeline.json  # 报告每个节点的 CPU、峰值内存、I/O
+  gtools --quiet format src/              # 模块输出写入日志文件（--output-buffer 为缓冲写终端）
+  gtools --events events.jsonl format src/  # 模块发出的结构化事件写入 JSONL
+  gtools cache stats                      # 查看结果缓存统计
+  eval "$(gtools completion bash)"        # 启用 bash 补全（zsh 使用 completion zsh）
+  gtools batch jobs.jsonl --workers 8     # 在同一进程中批量执行 JSONL 任务
+  cat jobs.jsonl | gtools batch --executor process  # 从标准输入读取任务，使用进程池
+  gtools bench startup --json result.json # 启动/分发基准测试并保存结果
+  gtools bench startup --compare base.json  # 与之前保存的结果对比
+  gtools bench discovery --sizes 10 5000  # 测量 list / 单模块调用随模块数量的变化
+  gtools bench transport --sizes 10M 1G   # 节点间跨进程传递大对象：pickle 经管道 vs 共享内存
             """.strip()
         )
         
@@ -64,6 +106,69 @@ class CLI:
         run_parser.add_argument('--config', required=False, help='管道配置文件路径（用于多模块管道）')
         run_parser.add_argument('--module-config', required=False, help='单模块配置文件路径（用于启动单个模块）')
         run_parser.add_argument('--option', required=False, nargs='+', help='覆盖配置文件中的参数，格式：key=value，支持多个参数')
+        run_parser.add_argument('--no-cache', action='store_true', help='不使用纯模块（声明 pure=True，默认缓存结果）的结果缓存')
+        run_parser.add_argument('--max-workers', type=int, default=1,
+                                help='管道中同时运行的节点数（默认 1，依赖完成的节点立即启动）')
+        run_parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                                help='管道节点的执行器类型（默认 thread）')
+        run_parser.add_argument('--on-error', choices=['fail-fast', 'continue'], default='fail-fast',
+                                help='节点失败时：fail-fast 不再启动新节点；continue 只跳过其下游节点')
+        run_parser.add_argument('--isolate', action='store_true',
+                                help='每个节点在独立子进程中执行（单独的工作目录、环境变量和输出，崩溃不影响其他节点）')
+        run_parser.add_argument('--incremental', action='store_true',
+                                help='增量执行：跳过指纹（源码、参数、输入文件、上游）与上次成功执行相同的节点')
+        run_parser.add_argument('--force', action='store_true', help='增量执行时仍重新执行全部节点')
+        run_parser.add_argument('--force-node', action='append', metavar='NAME',
+                                help='增量执行时强制重新执行指定节点及其下游，可重复指定')
+        run_parser.add_argument('--explain', action='store_true', help='增量执行时说明每个节点执行或跳过的原因')
+        
+        serve_parser = subparsers.add_parser('serve', help='启动常驻服务，保持模块和解析器驻留以加速重复调用')
+        serve_parser.add_argument('--socket', required=False, help='Unix 域套接字路径（默认：缓存目录下的 serve.sock）')
+        
+        sweep_parser = subparsers.add_parser('sweep', help='在模块配置基础上做参数扫描，进程池并行执行所有组合')
+        sweep_parser.add_argument('module', help='模块名')
+        sweep_parser.add_argument('--grid', action='append', required=True, metavar='KEY=V1,V2',
+                                  help='扫描参数及候选值，可重复指定，例如 operation=add,multiply 或 _positional_args.numbers=[1,2],[3,4]')
+        sweep_parser.add_argument('--module-config', help='基础配置文件（默认使用 configs/<module>/default.json）')
+        sweep_parser.add_argument('--workers', type=int, default=None, help='并发数（默认 CPU 核数）')
+        sweep_parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                                  help='执行器类型（默认 process）')
+        sweep_parser.add_argument('--output', help='保存完整结果（.csv 为表格，其他扩展名为 JSONL）')
+        
+        watch_parser = subparsers.add_parser('watch', help='执行模块并在文件变化后自动重新执行（模块常驻，main.py 变化时重新加载）')
+        watch_parser.add_argument('module', help='模块名')
+        watch_parser.add_argument('module_args', nargs='*', metavar='ARGS',
+                                  help='传给模块的参数（与选项冲突时放在 -- 之后）')
+        watch_parser.add_argument('--paths', nargs='+', metavar='PATH',
+                                  help='监听的文件或目录（默认：模块功能包目录和默认配置文件）')
+        watch_parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                                  help=f'轮询间隔秒数（默认 {DEFAULT_INTERVAL}）')
+        watch_parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                                  help=f'变化平息多久后再执行，秒（默认 {DEFAULT_DEBOUNCE}）')
+        
+        completion_parser = subparsers.add_parser('completion', help='输出 shell 补全脚本（基于预生成的索引，补全时不导入模块）')
+        completion_parser.add_argument('shell', choices=['bash', 'zsh', 'refresh'],
+                                       help='bash / zsh: 输出补全脚本；refresh: 重新生成补全索引')
+        
+        cache_parser = subparsers.add_parser('cache', help='管理纯模块的结果缓存')
+        cache_parser.add_argument('action', choices=['stats', 'clear'], help='stats: 显示缓存统计；clear: 清空缓存')
+        cache_parser.add_argument('--json', action='store_true', help='以 JSON 格式输出统计')
+        
+        batch_parser = subparsers.add_parser('batch', help='在同一进程中批量执行 JSONL 格式的模块调用')
+        batch_parser.add_argument('input', nargs='?', default='-', help='任务文件路径，每行一个 JSON 任务（默认：- 表示标准输入）')
+        batch_parser.add_argument('--workers', type=int, default=None, help='并发数（默认：CPU 核数）')
+        batch_parser.add_argument('--executor', choices=['thread', 'process'], default='thread', help='线程池或进程池（默认：thread）')
+        batch_parser.add_argument('--ordered', action='store_true', help='按输入顺序输出结果（默认按完成顺序）')
+        
+        bench_parser = subparsers.add_parser('bench', help='运行基准测试，测量 CLI 启动和分发开销')
+        bench_parser.add_argument('suite', choices=['startup', 'discovery', 'transport'], help='基准测试套件：startup（启动与分发）、discovery（模块数量扩展性）、transport（节点间跨进程传递大对象）')
+        bench_parser.add_argument('--repeat', type=int, default=None, help='每个场景的重复次数（默认：10，transport 为 3）')
+        bench_parser.add_argument('--warmup', type=int, default=2, help='热启动模式下的预热次数（默认：2）')
+        bench_parser.add_argument('--mode', choices=['cold', 'warm', 'both'], default='both', help='冷启动、热启动或两者（默认：both）')
+        bench_parser.add_argument('--scenario', nargs='+', help='只运行指定场景（startup: root, list, info, module, module_config, pipeline；discovery: list, info, module）')
+        bench_parser.add_argument('--sizes', nargs='+', help='discovery 套件生成的功能包数量（默认：10 100 1000 5000）；transport 套件的载荷大小（默认：10M 100M 1G 2G）')
+        bench_parser.add_argument('--json', dest='json_path', help='将结果保存为 JSON 文件')
+        bench_parser.add_argument('--compare', help='与之前保存的 JSON 结果对比 p50')
         
         return parser
     
@@ -83,11 +188,8 @@ class CLI:
         print("已注册的模块:")
         print("-" * 70)
         
-        # 创建美化表格
-        table = BeautifulTable()
-        table.columns.header = ["模块名", "注册状态", "start.sh", "skill.md"]
-        
-        # 添加表格数据
+        headers = ["模块名", "注册状态", "start.sh", "skill.md"]
+        rows = []
         for module in modules:
             is_complete = validate_module(module)
             has_start_sh = get_module_start_sh_path(module) is not None
@@ -96,17 +198,28 @@ class CLI:
             status = "✓ 完整" if is_complete else "✗ 不完整"
             start_sh_status = "✓ 有" if has_start_sh else "✗ 无"
             skill_md_status = "✓ 有" if has_skill_md else "✗ 无"
-            
-            table.rows.append([module, status, start_sh_status, skill_md_status])
-        
-        # 设置表格样式
-        table.set_style(BeautifulTable.STYLE_GRID)
-        table.columns.alignment['模块名'] = BeautifulTable.ALIGN_LEFT
-        table.columns.alignment['注册状态'] = BeautifulTable.ALIGN_CENTER
-        table.columns.alignment['start.sh'] = BeautifulTable.ALIGN_CENTER
-        table.columns.alignment['skill.md'] = BeautifulTable.ALIGN_CENTER
+            rows.append([module, status, start_sh_status, skill_md_status])
         
-        print(table)
+        if len(rows) > LIST_TABLE_LIMIT:
+            # 模块很多时表格渲染耗时与行数成正比且代价很高，改为逐行输出
+            widths = [max(display_width(row[i]) for row in rows + [headers]) for i in range(3)]
+            for row in [headers] + rows:
+                print("  ".join(_ljust_display(cell, width) for cell, width in zip(row, widths)) + "  " + row[3])
+        else:
+            # 创建美化表格
+            table = BeautifulTable()
+            table.columns.header = headers
+            for row in rows:
+                table.rows.append(row)
+            
+            # 设置表格样式
+            table.set_style(BeautifulTable.STYLE_GRID)
+            table.columns.alignment['模块名'] = BeautifulTable.ALIGN_LEFT
+            table.columns.alignment['注册状态'] = BeautifulTable.ALIGN_CENTER
+            table.columns.alignment['start.sh'] = BeautifulTable.ALIGN_CENTER
+            table.columns.alignment['skill.md'] = BeautifulTable.ALIGN_CENTER
+            
+            print(table)
         print(f"\n总计: {len(modules)} 个模块")
         print("说明:")
         print("  • 注册状态: ✓ 表示模块完整注册（有函数和参数解析器），✗ 表示注册不完整")
@@ -116,7 +229,7 @@ class CLI:
     
     def handle_info_command(self, module_name: str):
         """处理 info 命令"""
-        info = get_module_info(module_name)
+        info = get_module_info(module_name, load=False)
         
         print(f"模块信息: {module_name}")
         print("-" * 50)
@@ -133,10 +246,24 @@ class CLI:
         
         # 配置文件信息
         config_path = self.config_handler.get_default_config_path(module_name)
-        config_exists = os.path.exists(config_path)
+        config_exists = has_default_config(module_name)
         table.rows.append(["配置文件存在", "✓ 是" if config_exists else "✗ 否"])
         table.rows.append(["skill.md 存在", "✓ 是" if info.get("has_skill_md") else "✗ 否"])
         
+        # 执行特性
+        capabilities = info['capabilities']
+        if capabilities['io_bound']:
+            workload = "I/O 密集"
+        elif capabilities['cpu_bound']:
+            workload = "CPU 密集"
+        else:
+            workload = "未声明"
+        table.rows.append(["纯函数（可缓存）", "✓ 是" if capabilities['pure'] else "✗ 否"])
+        table.rows.append(["线程安全", "✓ 是" if capabilities['thread_safe'] else "✗ 否"])
+        table.rows.append(["负载类型", workload])
+        table.rows.append(["预估内存", f"{capabilities['est_memory_mb']} MB" if capabilities['est_memory_mb'] is not None else "未声明"])
+        table.rows.append(["最大并行数", capabilities['max_parallel'] if capabilities['max_parallel'] is not None else "不限"])
+        
         # 设置表格样式
         table.set_style(BeautifulTable.STYLE_GRID)
         table.columns.alignment['属性'] = BeautifulTable.ALIGN_LEFT
@@ -160,53 +287,10 @@ class CLI:
         else:
             print("提示：新创建的模块默认包含 skill.md，此模块可能是手动创建的")
     
-    def build_execution_order(self, modules: List[dict]) -> List[str]:
-        """构建模块执行顺序，支持依赖关系"""
-        from collections import defaultdict, deque
-        
-        # 检查是否有依赖
-        has_dependencies = any('depends_on' in module for module in modules)
-        if not has_dependencies:
-            # 无依赖，按配置顺序执行
-            return [m['name'] for m in modules]
-        
-        # 构建图
-        graph = defaultdict(list)  # module -> list of modules that depend on it
-        in_degree = defaultdict(int)
-        module_names = [m['name'] for m in modules]
-        
-        for module in modules:
-            name = module['name']
-            in_degree[name] = 0  # 初始化
-        
-        for module in modules:
-            name = module['name']
-            if 'depends_on' in module:
-                for dep in module['depends_on']:
-                    if dep not in module_names:
-                        raise ValueError(f"模块 '{name}' 的依赖 '{dep}' 不存在")
-                    graph[dep].append(name)
-                    in_degree[name] += 1
-        
-        # 拓扑排序
-        queue = deque([name for name in module_names if in_degree[name] == 0])
-        execution_order = []
-        
-        while queue:
-            current = queue.popleft()
-            execution_order.append(current)
-            
-            for dependent in graph[current]:
-                in_degree[dependent] -= 1
-                if in_degree[dependent] == 0:
-                    queue.append(dependent)
-        
-        if len(execution_order) != len(module_names):
-            raise ValueError("模块依赖关系存在环，无法确定执行顺序")
-        
-        return execution_order
-
-    def handle_run_command(self, config_path: str = None, module_config_path: str = None, options: List[str] = None):
+    def handle_run_command(self, config_path: str = None, module_config_path: str = None, options: List[str] = None,
+                           max_workers: int = 1, executor: str = 'thread', on_error: str = 'fail-fast',
+                           isolate: bool = False, incremental: bool = False, force: bool = False,
+                           force_nodes: Optional[List[str]] = None, explain: bool = False):
         """处理 run 命令"""
         # 参数验证
         if config_path and module_config_path:
@@ -225,7 +309,9 @@ class CLI:
         if module_config_path:
             self.handle_module_config_command(module_config_path, options)
         else:
-            self.handle_pipeline_command(config_path)
+            self.handle_pipeline_command(config_path, max_workers, executor, on_error, isolate,
+                                         incremental=incremental, force=force, force_nodes=force_nodes,
+                                         explain=explain)
 
     def parse_options(self, options: List[str]) -> Dict[str, Any]:
         """解析 --option 参数，返回参数字典
@@ -332,6 +418,13 @@ class CLI:
         
         return result
 
+    def compile_args(self, module_name: str, config: Dict[str, Any]) -> argparse.Namespace:
+        """把配置字典编译为模块参数；配置不合法时与 argparse 一样打印用法并退出"""
+        try:
+            return compile_module_args(module_name, config)
+        except ConfigCompileError as e:
+            get_module_parser(module_name).error(str(e))
+
     def handle_module_config_command(self, config_path: str, options: List[str] = None):
         """处理单模块配置启动命令"""
         if not os.path.exists(config_path):
@@ -373,49 +466,31 @@ class CLI:
             print(f"错误: 模块 '{module_name}' 缺少参数解析器")
             sys.exit(1)
         
+        # 配置中包含 sweep 段时执行参数扫描
+        grid = config.pop('sweep', None)
+        if grid:
+            if not isinstance(grid, dict):
+                print("错误: sweep 段必须是 {参数: [候选值, ...]} 形式的对象")
+                sys.exit(1)
+            print(f"配置文件: {config_path}")
+            self.run_sweep(module_name, config, grid)
+            return
+        
         print(f"运行模块: {module_name}")
         print(f"配置文件: {config_path}")
         
         # 获取模块函数和参数解析器
         main_func = FUNCTION.get(module_name)
-        args_parser_func = ARGS.get(module_name)
         
         try:
-            temp_parser = args_parser_func()
-            
-            # 构建参数
-            synthetic_args = []
+            # 直接把配置编译为参数
+            parsed_args = self.compile_args(module_name, config)
             
-            # 处理位置参数
-            positional_config = config.get('_positional_args', {})
-            for param_name, param_value in positional_config.items():
-                if isinstance(param_value, list):
-                    synthetic_args.extend(map(str, param_value))
-                else:
-                    synthetic_args.append(str(param_value))
-            
-            # 处理可选参数
-            for key, value in config.items():
-                if key == '_positional_args':
-                    continue
-                
-                # 查找对应的 action 来确定如何构建参数
-                for action in temp_parser._actions:
-                    if action.dest == key and action.option_strings:
-                        if isinstance(action, argparse._StoreTrueAction) and value:
-                            synthetic_args.append(action.option_strings[0])
-                        elif not isinstance(action, argparse._StoreTrueAction):
-                            synthetic_args.extend([action.option_strings[0], str(value)])
-                        break
-            
-            # 解析参数
-            if synthetic_args:
-                parsed_args = temp_parser.parse_args(synthetic_args)
-            else:
-                parsed_args = temp_parser.parse_args([])
-            
-            # 执行模块
-            main_func(parsed_args)
+            # 执行模块（纯模块可命中结果缓存）
+            with trace.span(f"execute {module_name}", "module"), stats.measure(module_name), \
+                    events.scope(module_name):
+                run_cached(module_name, main_func, parsed_args,
+                           FUNCTION.get_capabilities(module_name), self.no_cache)
             print(f"✅ 模块 '{module_name}' 执行完成")
             
         except Exception as e:
@@ -431,8 +506,16 @@ class CLI:
 
 
     
-    def handle_pipeline_command(self, config_path: str):
-        """处理管道配置文件命令（原有逻辑）"""
+    def handle_pipeline_command(self, config_path: str, max_workers: int = 1, executor: str = 'thread',
+                                on_error: str = 'fail-fast', isolate: bool = False, incremental: bool = False,
+                                force: bool = False, force_nodes: Optional[List[str]] = None, explain: bool = False):
+        """处理管道配置文件命令：按依赖关系调度节点，最后输出每个节点的耗时
+
+        增量执行（--incremental 或配置中 "incremental": true）时跳过指纹未变化的节点；
+        --force / --force-node / --explain 隐含增量执行
+        """
+        from .pipeline import DagExecutor, PipelineError, check_env, load_nodes
+        
         if not os.path.exists(config_path):
             print(f"错误: 配置文件 '{config_path}' 不存在")
             sys.exit(1)
@@ -458,95 +541,237 @@ class CLI:
             print("错误: 配置中缺少 'modules' 列表")
             sys.exit(1)
         
-        modules = config['modules']
-        if not modules:
+        if not config['modules']:
             print("错误: modules 列表为空")
             sys.exit(1)
         
-        # 验证模块
-        for module in modules:
-            if 'name' not in module:
-                print(f"错误: 模块配置缺少 'name': {module}")
+        if max_workers < 1:
+            print("错误: --max-workers 必须大于 0")
+            sys.exit(1)
+        
+        # 解析节点并检查依赖（节点名唯一、依赖存在、无环）
+        try:
+            nodes = load_nodes(config['modules'])
+            check_env(config.get('env', {}), "管道的 env")
+        except PipelineError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        
+        # 验证模块：module_name 指定要执行的模块，省略时与节点名相同
+        for node in nodes:
+            if not FUNCTION.has(node.module):
+                print(f"错误: 模块 '{node.module}' 未注册（节点 '{node.name}'）")
                 sys.exit(1)
-            name = module['name']
-            if not FUNCTION.has(name):
-                print(f"错误: 模块 '{name}' 未注册")
+        
+        planner = None
+        if incremental or force or force_nodes or explain or config.get('incremental'):
+            from .incremental import IncrementalPlanner, get_state_path
+            
+            unknown = sorted(set(force_nodes or ()) - {node.name for node in nodes})
+            if unknown:
+                print(f"错误: --force-node 指定的节点不存在: {', '.join(unknown)}")
                 sys.exit(1)
+            planner = IncrementalPlanner(get_state_path(config_path), force=force, force_nodes=set(force_nodes or ()),
+                                         explain=explain)
         
-        # 检查依赖（简单检查，无环）
-        module_names = [m['name'] for m in modules]
-        for module in modules:
-            if 'depends_on' in module:
-                for dep in module['depends_on']:
-                    if dep not in module_names:
-                        print(f"错误: 模块 '{module['name']}' 的依赖 '{dep}' 不存在")
-                        sys.exit(1)
+        print(f"工作目录: {working_dir}")
+        print("开始执行模块管道...")
+        
+        # 工作目录和环境变量按节点切换，节点对它们的修改不会影响其他节点
+        pipeline_executor = DagExecutor(max_workers, executor, on_error, working_directory=working_dir,
+                                        env=config.get('env'), isolate=isolate, planner=planner)
+        try:
+            results = pipeline_executor.run(nodes)
+        except PipelineError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        print()
+        print(pipeline_executor.format_summary(results))
+        
+        if all(result['ok'] for result in results):
+            print("\n✅ 所有模块执行完成")
+        else:
+            print("\n❌ 管道执行失败")
+            sys.exit(1)
+    
+    def handle_serve_command(self, socket_path: Optional[str] = None):
+        """处理 serve 命令 - 启动常驻服务"""
+        from .server import serve
+        serve(socket_path)
+    
+    def parse_grid(self, specs: List[str]) -> Dict[str, List[Any]]:
+        """解析 --grid key=v1,v2，候选值的类型规则与 --option 相同"""
+        from .sweep import split_grid_values
+        
+        grid = {}
+        for spec in specs:
+            if '=' not in spec:
+                print(f"错误: 扫描参数 '{spec}' 格式错误，应为 key=v1,v2")
+                sys.exit(1)
+            key, values = spec.split('=', 1)
+            grid[key.strip()] = [self._parse_option_value(value) for value in split_grid_values(values)]
+        return grid
+    
+    def handle_sweep_command(self, args: argparse.Namespace):
+        """处理 sweep 命令 - 在模块配置基础上扫描参数组合"""
+        if not validate_module(args.module):
+            print(f"错误: 模块 '{args.module}' 未注册或注册不完整")
+            sys.exit(1)
         
-        # 检查依赖（构建DAG并拓扑排序）
-        execution_order = self.build_execution_order(modules)
+        base_config = {}
+        if args.module_config:
+            if not os.path.exists(args.module_config):
+                print(f"错误: 配置文件 '{args.module_config}' 不存在")
+                sys.exit(1)
+            base_config = self.config_handler.load_config(args.module_config)
+            base_config.pop('sweep', None)
         
-        # 切换到工作目录
-        original_dir = os.getcwd()
-        os.chdir(working_dir)
+        self.run_sweep(args.module, base_config, self.parse_grid(args.grid),
+                       args.workers, args.executor, args.output)
+    
+    def run_sweep(self, module_name: str, base_config: Dict[str, Any], grid: Dict[str, List[Any]],
+                  workers: Optional[int] = None, executor: str = 'process', output: Optional[str] = None):
+        """执行参数扫描并打印结果表，有失败的组合时以退出码 1 结束"""
+        from .sweep import SweepRunner, expand_grid
         
         try:
-            print(f"切换到工作目录: {working_dir}")
-            print("开始执行模块管道...")
-            
-            for i, module_name in enumerate(execution_order, 1):
-                module = next(m for m in modules if m['name'] == module_name)
-                params = module.get('params', {})
-                
-                print(f"\n[{i}/{len(execution_order)}] 执行模块: {module_name}")
-                
-                # 构建参数
-                main_func = FUNCTION.get(module_name)
-                args_parser_func = ARGS.get(module_name)
-                
-                temp_parser = args_parser_func()
-                synthetic_args = []
-                
-                # 处理位置参数
-                positional_config = params.get('_positional_args', {})
-                for param_name, param_value in positional_config.items():
-                    if isinstance(param_value, list):
-                        synthetic_args.extend(map(str, param_value))
-                    else:
-                        synthetic_args.append(str(param_value))
-                
-                # 处理可选参数
-                for key, value in params.items():
-                    if key == '_positional_args':
-                        continue
-                    
-                    # 查找对应的 action 来确定如何构建参数
-                    for action in temp_parser._actions:
-                        if action.dest == key and action.option_strings:
-                            if isinstance(action, argparse._StoreTrueAction) and value:
-                                synthetic_args.append(action.option_strings[0])
-                            elif not isinstance(action, argparse._StoreTrueAction):
-                                synthetic_args.extend([action.option_strings[0], str(value)])
-                            break
-                
-                # 解析参数
-                if synthetic_args:
-                    parsed_args = temp_parser.parse_args(synthetic_args)
-                else:
-                    parsed_args = temp_parser.parse_args([])
-                
-                # 执行模块
-                main_func(parsed_args)
-                
-                print(f"模块 '{module_name}' 执行完成")
-            
-            print("\n✅ 所有模块执行完成")
-            
-        except Exception as e:
-            print(f"\n❌ 执行过程中出错: {e}")
-            traceback.print_exc()
+            total = len(expand_grid(grid))
+        except ValueError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        
+        runner = SweepRunner(workers=workers, executor=executor)
+        print(f"参数扫描: {module_name}，{total} 个组合，{runner.runner.workers} 个{'进程' if executor == 'process' else '线程'}")
+        start = time.perf_counter()
+        results = runner.run(module_name, base_config, grid)
+        elapsed = time.perf_counter() - start
+        print(runner.format_table(results))
+        
+        failed = sum(1 for result in results if not result["ok"])
+        print(f"sweep: 共 {len(results)} 个组合，成功 {len(results) - failed}，失败 {failed}，耗时 {elapsed:.2f}s")
+        if output:
+            runner.write_results(results, output)
+            print(f"完整结果已保存到: {output}")
+        if failed:
             sys.exit(1)
+    
+    def handle_completion_command(self, shell: str):
+        """处理 completion 命令 - 生成补全索引并输出补全脚本"""
+        from .completion import write_index, bash_script, zsh_script
+        
+        try:
+            index_path = write_index()
+        except OSError as e:
+            print(f"错误: 无法写入补全索引: {e}", file=sys.stderr)
+            sys.exit(1)
+        if shell == 'refresh':
+            print(f"补全索引已更新: {index_path}")
+        elif shell == 'bash':
+            print(bash_script(index_path))
+        else:
+            print(zsh_script(index_path))
+    
+    def handle_cache_command(self, action: str, as_json: bool = False):
+        """处理 cache 命令 - 查看或清空结果缓存"""
+        from .cache import ResultCache
+        
+        cache = ResultCache()
+        if action == 'clear':
+            removed = cache.clear()
+            print(f"已清空结果缓存: 删除 {removed} 条记录")
+            return
+        
+        stats = cache.stats()
+        if as_json:
+            print(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = f"{stats['hits'] / lookups * 100:.1f}%" if lookups else "-"
+        print(f"缓存目录: {stats['cache_dir']}")
+        print(f"记录数:   {stats['entries']}")
+        print(f"占用:     {stats['size_bytes'] / 1024:.1f} KB / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        print(f"命中:     {stats['hits']}，未命中: {stats['misses']}，命中率: {hit_rate}")
+        print(f"淘汰:     {stats['evictions']}")
+    
+    def handle_watch_command(self, args: argparse.Namespace):
+        """处理 watch 命令 - 执行模块并在文件变化后重新执行"""
+        if not (FUNCTION.has(args.module) or ARGS.has(args.module)):
+            print(f"错误: 模块 '{args.module}' 不存在")
+            print("使用 'gtools list' 查看可用模块")
+            sys.exit(1)
+        if args.interval <= 0 or args.debounce < 0:
+            print("错误: --interval 必须大于 0，--debounce 不能为负数")
+            sys.exit(1)
+        if args.paths:
+            missing = [path for path in args.paths if not os.path.exists(path)]
+            if missing:
+                print(f"警告: 监听路径不存在（创建后开始监听）: {', '.join(missing)}")
+        
+        watcher = Watcher(self, args.module, args.module_args, paths=args.paths,
+                          interval=args.interval, debounce=args.debounce)
+        watcher.loop()
+    
+    def handle_batch_command(self, input_path: str, workers: Optional[int], executor: str, ordered: bool):
+        """处理 batch 命令 - 批量执行 JSONL 任务，每个任务输出一行 JSON 结果"""
+        from .runner import BatchRunner
+        
+        if input_path != '-' and not os.path.exists(input_path):
+            print(f"错误: 任务文件 '{input_path}' 不存在")
+            sys.exit(1)
+        
+        runner = BatchRunner(workers=workers, executor=executor, ordered=ordered)
+        stream = sys.stdin if input_path == '-' else open(input_path, 'r', encoding='utf-8')
+        try:
+            failures = runner.run(stream, sys.stdout)
         finally:
-            os.chdir(original_dir)
+            if stream is not sys.stdin:
+                stream.close()
+        
+        summary = runner.summary
+        print(f"batch: 共 {summary['total']} 个任务，成功 {summary['ok']}，失败 {summary['failed']}，"
+              f"耗时 {summary['wall_ms'] / 1000:.2f}s", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+    
+    def handle_bench_command(self, args: argparse.Namespace):
+        """处理 bench 命令 - 运行启动基准测试"""
+        from .bench import StartupBenchmark, DiscoveryBenchmark, TransportBenchmark
+        
+        baseline = None
+        if args.compare:
+            try:
+                with open(args.compare, 'r', encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"错误: 无法读取对比结果 '{args.compare}': {e}")
+                sys.exit(1)
+        
+        modes = ['cold', 'warm'] if args.mode == 'both' else [args.mode]
+        try:
+            # discovery 的大小为功能包数量，transport 的大小支持 10M / 1G 等单位
+            sizes = [parse_size(size) if args.suite == 'transport' else int(size) for size in args.sizes or ()]
+        except ValueError:
+            print(f"错误: --sizes 格式不正确: {' '.join(args.sizes)}")
+            sys.exit(1)
+        if args.suite == 'transport':
+            bench = TransportBenchmark(sizes=sizes, repeat=args.repeat or 3)
+        elif args.suite == 'discovery':
+            bench = DiscoveryBenchmark(sizes=sizes, repeat=args.repeat or 10, warmup=args.warmup,
+                                       modes=modes, scenarios=args.scenario)
+        else:
+            bench = StartupBenchmark(repeat=args.repeat or 10, warmup=args.warmup, modes=modes,
+                                     scenarios=args.scenario)
+        try:
+            report = bench.run()
+        except (RuntimeError, ValueError) as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        
+        print(bench.format_table(report, baseline))
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"\n结果已保存: {args.json_path}")
     
     def handle_module_start(self, module_name: str, args: List[str] = None):
         """处理模块的 start 命令"""
@@ -567,50 +792,19 @@ class CLI:
             sys.exit(1)
         
         main_func = FUNCTION.get(module_name)
-        args_parser_func = ARGS.get(module_name)
         
         try:
             config_path = self.config_handler.get_default_config_path(module_name)
             default_config = self.config_handler.load_config(config_path)
             
-            temp_parser = args_parser_func()
-            parsed_args = None
-            
             # 如果没有提供命令行参数但有默认配置，直接使用配置构建参数
             if not args and default_config:
-                synthetic_args = []
-                
-                # 处理位置参数 - 从 _positional_args 中获取（如果存在）
-                positional_config = default_config.get('_positional_args', {})
-                for param_name, param_value in positional_config.items():
-                    if isinstance(param_value, list):
-                        synthetic_args.extend(map(str, param_value))
-                    else:
-                        synthetic_args.append(str(param_value))
-                
-                # 处理可选参数 - 除了 _positional_args 外的其他键
-                for key, value in default_config.items():
-                    if key == '_positional_args':
-                        continue
-                    
-                    # 查找对应的 action 来确定如何构建参数
-                    for action in temp_parser._actions:
-                        if action.dest == key and action.option_strings:
-                            if isinstance(action, argparse._StoreTrueAction) and value:
-                                synthetic_args.append(action.option_strings[0])
-                            elif not isinstance(action, argparse._StoreTrueAction):
-                                synthetic_args.extend([action.option_strings[0], str(value)])
-                            break
-                
-                # 使用合成的参数进行解析
-                if synthetic_args:
-                    parsed_args = temp_parser.parse_args(synthetic_args)
-                else:
-                    # 如果没有合成参数，尝试正常解析
-                    parsed_args = temp_parser.parse_args(args)
+                parsed_args = self.compile_args(module_name, default_config)
             else:
                 # 有命令行参数或没有默认配置，正常解析
-                parsed_args = temp_parser.parse_args(args)
+                parser = get_module_parser(module_name)
+                with trace.span(f"parse argv {module_name}", "args"):
+                    parsed_args = parser.parse_args(args)
             
             # 合并配置时需要处理新的配置结构
             final_config = {}
@@ -626,7 +820,10 @@ class CLI:
             final_args = self.config_handler.merge_configs(final_config, parsed_args)
             
             print(f"运行模块: {module_name}")
-            main_func(final_args)
+            with trace.span(f"execute {module_name}", "module"), stats.measure(module_name), \
+                    events.scope(module_name):
+                run_cached(module_name, main_func, final_args,
+                           FUNCTION.get_capabilities(module_name), self.no_cache)
             
         except Exception as e:
             print(f"\n❌ 运行模块 '{module_name}' 时出错:")
@@ -637,17 +834,192 @@ class CLI:
             print("-" * 50)
             sys.exit(1)
     
-    def auto_import_modules(self):
-        """自动导入可能包含注册函数的模块"""
-        auto_import_functions_modules()
+    def auto_import_modules(self, module_name: Optional[str] = None):
+        """自动导入可能包含注册函数的模块；指定 module_name 时只注册该模块所在的功能包"""
+        with trace.span("module discovery", "discovery", module=module_name or "*"):
+            if module_name is None:
+                auto_import_functions_modules()
+            else:
+                auto_import_module(module_name)
+    
+    def parse_global_options(self, argv: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """解析位于子命令/模块名之前的全局选项，返回 (选项字典, 剩余参数)
+        
+        支持：
+        - --import-profile / --import-profile=json    导入耗时分析（也可用环境变量 GTOOLS_IMPORT_PROFILE）
+        - --no-cache                                  不使用纯模块的结果缓存（声明 pure=True 即默认启用；也可用环境变量 GTOOLS_NO_CACHE=1）
+        - --trace out.json / --trace=out.json         记录各阶段耗时为 Chrome trace（也可用环境变量 GTOOLS_TRACE）
+        - --stats / --stats=json                      模块执行后报告资源消耗（也可用环境变量 GTOOLS_STATS）
+        - --output-buffer / --output-buffer=4M        模块输出经大缓冲区写出（也可用环境变量 GTOOLS_OUTPUT_BUFFER）
+        - --quiet / --quiet=run.log                   模块输出写入日志文件，终端只显示 stderr
+        - --events out.jsonl / --events=-             结构化事件写入 JSONL（也可用环境变量 GTOOLS_EVENTS）
+        """
+        options: Dict[str, Any] = {}
+        env_profile = os.environ.get("GTOOLS_IMPORT_PROFILE")
+        if env_profile:
+            options['import_profile'] = 'json' if env_profile == 'json' else 'table'
+        if os.environ.get("GTOOLS_TRACE"):
+            options['trace'] = os.environ["GTOOLS_TRACE"]
+        env_stats = os.environ.get("GTOOLS_STATS")
+        if env_stats:
+            options['stats'] = 'json' if env_stats == 'json' else 'table'
+        if os.environ.get("GTOOLS_OUTPUT_BUFFER"):
+            options['output_buffer'] = os.environ["GTOOLS_OUTPUT_BUFFER"]
+        if os.environ.get("GTOOLS_EVENTS"):
+            options['events'] = os.environ["GTOOLS_EVENTS"]
+        
+        index = 0
+        while index < len(argv):
+            arg = argv[index]
+            if arg == '--import-profile':
+                options['import_profile'] = 'table'
+            elif arg.startswith('--import-profile='):
+                options['import_profile'] = 'json' if arg.split('=', 1)[1] == 'json' else 'table'
+            elif arg == '--no-cache':
+                options['no_cache'] = True
+            elif arg == '--trace' and index + 1 < len(argv):
+                index += 1
+                options['trace'] = argv[index]
+            elif arg.startswith('--trace='):
+                options['trace'] = arg.split('=', 1)[1]
+            elif arg == '--stats':
+                options['stats'] = 'table'
+            elif arg.startswith('--stats='):
+                options['stats'] = 'json' if arg.split('=', 1)[1] == 'json' else 'table'
+            elif arg == '--output-buffer':
+                options['output_buffer'] = '1M'
+            elif arg.startswith('--output-buffer='):
+                options['output_buffer'] = arg.split('=', 1)[1]
+            elif arg == '--quiet':
+                options['quiet'] = ''
+            elif arg.startswith('--quiet='):
+                options['quiet'] = arg.split('=', 1)[1]
+            elif arg == '--events' and index + 1 < len(argv):
+                index += 1
+                options['events'] = argv[index]
+            elif arg.startswith('--events='):
+                options['events'] = arg.split('=', 1)[1]
+            else:
+                break
+            index += 1
+        
+        return options, argv[index:]
+    
+    def run_with_import_profile(self, argv: List[str], fmt: str):
+        """在导入耗时分析下执行：先立即导入全部功能模块，再执行剩余命令，最后输出报告"""
+        from .utils.import_profile import ImportProfiler
+        
+        profiler = ImportProfiler()
+        try:
+            with profiler:
+                auto_import_functions_modules(lazy=False, profiler=profiler)
+            if argv:
+                self.dispatch(argv)
+        finally:
+            # 有后续命令时报告输出到 stderr，避免与模块输出混在一起
+            stream = sys.stderr if argv else sys.stdout
+            print(profiler.report(fmt), file=stream)
     
     def main(self, argv: Optional[List[str]] = None):
         """主入口函数"""
         if argv is None:
             argv = sys.argv[1:]
         
-        self.auto_import_modules()
+        options, argv = self.parse_global_options(argv)
+        self.no_cache = options.get('no_cache', False)
+        self.main_with_options(argv, options)
+    
+    def run_with_stats(self, argv: List[str], options: Dict[str, Any]):
+        """统计每次模块执行的资源消耗，结束时（包括出错退出）把报告输出到 stderr"""
+        fmt = options.pop('stats')
+        stats.start()
+        try:
+            self.main_with_options(argv, options)
+        finally:
+            print(stats.report(stats.stop(), fmt), file=sys.stderr)
+    
+    def main_with_options(self, argv: List[str], options: Dict[str, Any]):
+        """按全局选项执行：资源统计、trace、导入耗时分析可以叠加，每一层处理后移除自己的选项"""
+        if options.get('stats'):
+            self.run_with_stats(argv, options)
+        elif options.get('trace'):
+            self.run_with_trace(argv, options)
+        elif options.get('events'):
+            self.run_with_events(argv, options)
+        elif 'quiet' in options or options.get('output_buffer'):
+            self.run_with_output(argv, options)
+        elif options.get('import_profile'):
+            self.run_with_import_profile(argv, options['import_profile'])
+        else:
+            self.dispatch(argv)
+    
+    def run_with_events(self, argv: List[str], options: Dict[str, Any]):
+        """把模块发出的结构化事件写入 JSONL 文件"""
+        path = options.pop('events')
+        try:
+            sink = events.start(path)
+        except OSError as e:
+            print(f"错误: 无法写入事件文件 {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            self.main_with_options(argv, options)
+        finally:
+            events.stop()
+            if path != '-':
+                print(f"📨 {sink.count} 条事件已写入: {path}", file=sys.stderr)
+    
+    def run_with_output(self, argv: List[str], options: Dict[str, Any]):
+        """--output-buffer / --quiet：模块输出经大缓冲区写出到终端或日志文件，结束时（包括出错退出）刷新"""
+        quiet = options.pop('quiet', None)
+        size_text = options.pop('output_buffer', None)
+        try:
+            buffer_size = parse_size(size_text) if size_text else DEFAULT_BUFFER_SIZE
+        except ValueError:
+            print(f"错误: 无效的缓冲区大小 '{size_text}'，示例: 64K、4M", file=sys.stderr)
+            sys.exit(1)
+        path = None
+        if quiet is not None:
+            path = quiet or default_log_path(argv[0] if argv else 'gtools')
+        
+        output = BufferedStdout(path, buffer_size)
+        try:
+            output.open()
+        except OSError as e:
+            print(f"错误: 无法写入日志文件 {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        ok = False
+        try:
+            self.main_with_options(argv, options)
+            ok = True
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+            raise
+        finally:
+            output.close()
+            if path is not None:
+                status = "" if ok else "，执行失败，详见日志"
+                print(f"📝 输出已写入: {path}（{output.bytes_written / 1024:.1f} KB{status}）", file=sys.stderr)
+    
+    def run_with_trace(self, argv: List[str], options: Dict[str, Any]):
+        """记录执行过程的 Chrome trace，结束时（包括出错退出）写入文件"""
+        from . import client
         
+        path = options.pop('trace')
+        trace.start(client.ENTRY_TIME)
+        try:
+            with trace.span("gtools " + " ".join(argv[:1]), "cli"):
+                self.main_with_options(argv, options)
+        finally:
+            tracer = trace.stop()
+            try:
+                tracer.write(path)
+                print(f"📈 trace 已写入: {path}（可在 https://ui.perfetto.dev 中打开）", file=sys.stderr)
+            except OSError as e:
+                print(f"警告: 无法写入 trace 文件 {path}: {e}", file=sys.stderr)
+    
+    def dispatch(self, argv: List[str]):
+        """分发子命令或模块调用"""
+        # list / info / root / 帮助 只依赖静态清单，无需导入功能模块
         if not argv:
             parser = self.create_main_parser()
             parser.print_help()
@@ -659,11 +1031,17 @@ class CLI:
             parser.print_help()
             return
         
-        # 检查是否是子命令格式 (list, info, root, run)
-        if len(argv) >= 1 and argv[0] in ['list', 'info', 'root', 'run']:
+        # 检查是否是子命令格式 (list, info, root, run, serve, sweep, cache, completion, batch, bench, watch)
+        if len(argv) >= 1 and argv[0] in ['list', 'info', 'root', 'run', 'serve', 'sweep', 'cache', 'completion',
+                                          'batch', 'bench', 'watch']:
             parser = self.create_main_parser()
             try:
-                args = parser.parse_args(argv)
+                if argv[0] == 'watch':
+                    watch_argv, module_args = split_watch_argv(argv[1:])
+                    args = parser.parse_args(['watch'] + watch_argv)
+                    args.module_args = module_args
+                else:
+                    args = parser.parse_args(argv)
                 
                 if args.command == 'list':
                     self.handle_list_command()
@@ -678,7 +1056,44 @@ class CLI:
                     return
                 
                 if args.command == 'run':
-                    self.handle_run_command(args.config, args.module_config, args.option)
+                    self.no_cache = self.no_cache or args.no_cache
+                    self.auto_import_modules()
+                    self.handle_run_command(args.config, args.module_config, args.option,
+                                            max_workers=args.max_workers, executor=args.executor,
+                                            on_error=args.on_error, isolate=args.isolate,
+                                            incremental=args.incremental, force=args.force,
+                                            force_nodes=args.force_node, explain=args.explain)
+                    return
+                
+                if args.command == 'serve':
+                    self.handle_serve_command(args.socket)
+                    return
+                
+                if args.command == 'sweep':
+                    self.auto_import_modules(args.module)
+                    self.handle_sweep_command(args)
+                    return
+                
+                if args.command == 'completion':
+                    self.handle_completion_command(args.shell)
+                    return
+                
+                if args.command == 'cache':
+                    self.handle_cache_command(args.action, args.json)
+                    return
+                
+                if args.command == 'batch':
+                    self.auto_import_modules()
+                    self.handle_batch_command(args.input, args.workers, args.executor, args.ordered)
+                    return
+                
+                if args.command == 'bench':
+                    self.handle_bench_command(args)
+                    return
+                
+                if args.command == 'watch':
+                    self.auto_import_modules(args.module)
+                    self.handle_watch_command(args)
                     return
             except SystemExit:
                 # argparse 会在遇到错误时调用 sys.exit，我们需要捕获它
@@ -695,6 +1110,8 @@ class CLI:
         module_name = argv[0]
         module_args = argv[1:]
         
+        self.auto_import_modules(module_name)
+        
         if FUNCTION.has(module_name) or ARGS.has(module_name):
             self.run_module(module_name, module_args)
             return
@@ -0,0 +1,125 @@
+"""
+gtools 瘦客户端
+设置环境变量 GTOOLS_SERVER 后，命令行入口会把 argv、工作目录、环境变量以及
+标准输入/输出/错误的文件描述符通过 Unix 域套接字交给常驻的 `gtools serve` 进程，
+输出由服务端直接写入这些文件描述符，客户端只等待退出码。
+未设置 GTOOLS_SERVER、服务未运行或 argv 为 serve 命令时回退到本地执行。
+
+本模块只依赖标准库，避免在转发路径上导入 registry 和功能模块。
+"""
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+# 命令行入口开始执行的时刻（perf_counter），--trace 用它区分解释器启动和 gtools 导入
+ENTRY_TIME = None
+
+# 长度/进程号/退出码统一使用 4 字节网络序整数
+_INT = struct.Struct("!i")
+_STDIO_FDS = (0, 1, 2)
+
+
+def get_socket_path() -> str:
+    """获取服务套接字路径
+
+    GTOOLS_SERVER 为路径时直接使用；为 1/auto 或未设置时使用缓存目录下的 serve.sock
+    """
+    path = os.environ.get("GTOOLS_SERVER", "")
+    if path and path not in ("1", "auto"):
+        return path
+    cache_dir = os.environ.get("GTOOLS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "gtools")
+    return os.path.join(cache_dir, "serve.sock")
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """从套接字读取恰好 size 字节，连接提前关闭时抛出 ConnectionError"""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("连接已关闭")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_request(sock: socket.socket, argv, cwd: str, env: dict, fds=_STDIO_FDS):
+    """发送请求：长度前缀随文件描述符一起发送，JSON 请求体随后发送"""
+    payload = json.dumps({"argv": list(argv), "cwd": cwd, "env": dict(env)}).encode("utf-8")
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+    sock.sendmsg([_INT.pack(len(payload))], ancillary)
+    sock.sendall(payload)
+
+
+def receive_request(sock: socket.socket):
+    """接收请求，返回 (argv, cwd, env, fds)"""
+    fd_size = array.array("i").itemsize
+    data, ancdata, _, _ = sock.recvmsg(_INT.size, socket.CMSG_SPACE(len(_STDIO_FDS) * fd_size))
+    if not data:
+        raise ConnectionError("连接已关闭")
+    if len(data) < _INT.size:
+        data += recv_exact(sock, _INT.size - len(data))
+    fds = array.array("i")
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fd_size)])
+    (length,) = _INT.unpack(data)
+    request = json.loads(recv_exact(sock, length).decode("utf-8"))
+    return request["argv"], request["cwd"], request["env"], list(fds)
+
+
+def forward(argv, socket_path: str = None):
+    """把一次调用转交给服务端执行
+
+    Returns:
+        退出码；服务不可用时返回 None，调用方应回退到本地执行
+    """
+    socket_path = socket_path or get_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    with sock:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            send_request(sock, argv, os.getcwd(), os.environ)
+            (pid,) = _INT.unpack(recv_exact(sock, _INT.size))
+        except OSError:
+            # 服务端在接受连接后立即关闭（崩溃，或监听的是旧版本的服务），命令尚未开始执行
+            return None
+        while True:
+            try:
+                (code,) = _INT.unpack(recv_exact(sock, _INT.size))
+                return code
+            except KeyboardInterrupt:
+                # Ctrl-C 只会发给前台的客户端，转发给服务端的执行进程
+                try:
+                    os.kill(pid, signal.SIGINT)
+                except OSError:
+                    return 130
+            except ConnectionError:
+                print("错误: gtools 服务端在执行过程中断开连接", file=sys.stderr)
+                return 1
+
+
+def main():
+    """命令行入口点：优先转发给常驻服务，否则本地执行"""
+    global ENTRY_TIME
+    ENTRY_TIME = time.perf_counter()
+    argv = sys.argv[1:]
+    if os.environ.get("GTOOLS_SERVER") and argv[:1] != ["serve"]:
+        code = forward(argv)
+        if code is not None:
+            sys.exit(code)
+
+    from .cli import main as cli_main
+    cli_main()
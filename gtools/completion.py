@@ -0,0 +1,163 @@
+"""
+命令行补全（gtools completion bash|zsh）
+补全函数只读取预先生成的索引文件（清单缓存目录下的 completion.tsv），按 TAB 时不启动 Python、
+不导入任何功能模块。索引内容来自静态清单：模块名、子命令，以及每个模块 add_argument 的
+选项字符串和字面量 choices。功能包变化导致清单重写时索引会同步更新。
+
+索引为制表符分隔的文本，每行一条：
+    cmd  <子命令>
+    mod  <模块名>
+    opt  <所属>  <选项>  <是否带值 0/1>  <空格分隔的 choices>
+    arg  <所属>  <空格分隔的候选值，@modules 表示模块名>
+所属为模块名；子命令为 @<子命令>；全局选项为 @
+"""
+import argparse
+import os
+from typing import Iterator, List, Optional
+
+from .manifest import COMPLETION_INDEX, ModuleManifest, get_manifest
+
+# 位于子命令/模块名之前的全局选项：(选项, 是否带值)
+GLOBAL_OPTIONS = [("--no-cache", False), ("--trace", True), ("--stats", False), ("--events", True),
+                  ("--quiet", False), ("--output-buffer", False), ("--import-profile", False),
+                  ("-h", False), ("--help", False)]
+
+# 第一个位置参数为模块名的子命令参数 dest
+_MODULE_DESTS = ("module", "module_name")
+
+
+def get_index_path(manifest: Optional[ModuleManifest] = None) -> str:
+    """补全索引文件路径"""
+    manifest = manifest or ModuleManifest()
+    return os.path.join(manifest.cache_dir, COMPLETION_INDEX)
+
+
+def _clean(text: str) -> str:
+    return text.replace("\t", " ").replace("\n", " ")
+
+
+def _command_lines() -> Iterator[str]:
+    """子命令及其选项，来自 CLI 的 argparse 定义"""
+    from .cli import CLI
+
+    parser = CLI().create_main_parser()
+    for action in parser._actions:
+        if not isinstance(action, argparse._SubParsersAction):
+            continue
+        for name, subparser in action.choices.items():
+            yield f"cmd\t{name}"
+            positional_done = False
+            for sub_action in subparser._actions:
+                if sub_action.option_strings:
+                    takes_value = sub_action.nargs != 0
+                    choices = " ".join(_clean(str(c)) for c in sub_action.choices or ())
+                    for flag in sub_action.option_strings:
+                        yield f"opt\t@{name}\t{flag}\t{int(takes_value)}\t{choices}"
+                elif not positional_done:
+                    positional_done = True
+                    if sub_action.dest in _MODULE_DESTS:
+                        yield f"arg\t@{name}\t@modules"
+                    elif sub_action.choices:
+                        yield f"arg\t@{name}\t" + " ".join(_clean(str(c)) for c in sub_action.choices)
+
+
+def build_index(manifest: ModuleManifest) -> List[str]:
+    """生成索引行"""
+    lines = [f"opt\t@\t{flag}\t{int(takes_value)}\t" for flag, takes_value in GLOBAL_OPTIONS]
+    lines.extend(_command_lines())
+
+    module_names = set()
+    for entry in manifest.entries.values():
+        module_names.update(entry.get("FUNCTION", {}))
+        for module_name, options in entry.get("options", {}).items():
+            for option in options:
+                choices = " ".join(_clean(choice) for choice in option.get("choices", ()))
+                if not option["flags"]:
+                    lines.append(f"arg\t{module_name}\t{choices}")
+                for flag in option["flags"]:
+                    lines.append(f"opt\t{module_name}\t{flag}\t{int(option['value'])}\t{choices}")
+    lines.extend(f"mod\t{module_name}" for module_name in sorted(module_names))
+    return lines
+
+
+def write_index(manifest: Optional[ModuleManifest] = None) -> str:
+    """写入补全索引（原子替换），返回文件路径"""
+    manifest = manifest or get_manifest()
+    path = get_index_path(manifest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(build_index(manifest)) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+_BASH_FUNCTION = r'''
+_gtools_complete() {
+    local index="__INDEX__"
+    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"
+    [ -r "$index" ] || command gtools completion refresh >/dev/null 2>&1
+
+    # 跳过全局选项，找到子命令或模块名
+    local i=1
+    while [ "$i" -lt "$COMP_CWORD" ] && [[ "${COMP_WORDS[i]}" == -* ]]; do
+        case "${COMP_WORDS[i]}" in --trace|--events) i=$((i + 1)) ;; esac
+        i=$((i + 1))
+    done
+
+    # 正在补全 --trace / --events 的文件名
+    if [ "$i" -gt "$COMP_CWORD" ]; then
+        COMPREPLY=($(compgen -f -- "$cur"))
+        return
+    fi
+
+    local owner="@" first=0
+    if [ "$i" -eq "$COMP_CWORD" ]; then
+        first=1
+    else
+        owner="${COMP_WORDS[i]}"
+        awk -F'\t' -v c="$owner" '$1 == "cmd" && $2 == c { found = 1; exit } END { exit !found }' "$index" \
+            && owner="@$owner"
+        # 紧跟在子命令/模块名之后时没有前一个选项
+        [ "$((COMP_CWORD - 1))" -eq "$i" ] && prev=""
+    fi
+
+    local words
+    words=$(awk -F'\t' -v owner="$owner" -v prev="$prev" -v cur="$cur" -v first="$first" '
+        $1 == "opt" && $2 == owner {
+            opts = opts " " $3
+            if ($3 == prev && $4 == 1) { valued = 1; choices = $5 }
+        }
+        $1 == "arg" && $2 == owner { args = $3 }
+        $1 == "cmd" { cmds = cmds " " $2 }
+        $1 == "mod" { mods = mods " " $2 }
+        END {
+            if (valued) { print (choices != "" ? choices : "__FILES__"); exit }
+            if (substr(cur, 1, 1) == "-") { print opts; exit }
+            if (first) { print cmds " " mods; exit }
+            if (args == "@modules") print mods
+            else if (args != "") print args
+            else print "__FILES__"
+        }' "$index")
+
+    if [ "$words" = "__FILES__" ]; then
+        COMPREPLY=($(compgen -f -- "$cur"))
+    else
+        COMPREPLY=($(compgen -W "$words" -- "$cur"))
+    fi
+}
+complete -o filenames -F _gtools_complete gtools
+'''
+
+
+def bash_script(index_path: str) -> str:
+    """bash 补全脚本"""
+    return "# gtools bash completion" + _BASH_FUNCTION.replace("__INDEX__", index_path)
+
+
+def zsh_script(index_path: str) -> str:
+    """zsh 补全脚本（通过 bashcompinit 复用 bash 补全函数）"""
+    return ("# gtools zsh completion\n"
+            "autoload -U +X compinit && compinit\n"
+            "autoload -U +X bashcompinit && bashcompinit\n"
+            + _BASH_FUNCTION.replace("__INDEX__", index_path))
@@ -0,0 +1,136 @@
+"""
+结构化事件（gtools.emit）
+模块在 print 给人看的文本之外，可以单独发出结构化事件（每个文件的处理结果、进度等），
+调用方不必解析 stdout：
+
+    from gtools.events import emit
+    emit("file_formatted", path=file_path, changed=True)
+
+没有接收方时 emit 只做一次全局变量判断。接收方式：
+- 命令行：gtools --events events.jsonl format ...（也可用环境变量 GTOOLS_EVENTS，- 表示 stderr）
+- Python：with events.collect() as records: gtools.run("format", ...)
+
+每条事件为 {"ts": 时间戳, "event": 事件名, "module": 当前模块, **fields}。
+"""
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_NULL_SCOPE = nullcontext()
+
+# 当前的事件接收函数，None 表示没有接收方
+_SINK: Optional[Callable[[Dict[str, Any]], None]] = None
+
+# 正在执行的模块名，由 CLI / gtools.run 在调用模块时设置
+_MODULE: contextvars.ContextVar = contextvars.ContextVar("gtools_event_module", default=None)
+
+
+def emit(event: str, **fields: Any):
+    """发出一条结构化事件；没有接收方时直接返回"""
+    sink = _SINK
+    if sink is None:
+        return
+    record = {"ts": round(time.time(), 6), "event": event, "module": _MODULE.get()}
+    record.update(fields)
+    sink(record)
+
+
+def enabled() -> bool:
+    return _SINK is not None
+
+
+class _Scope:
+    """在代码块内把事件归属到指定模块"""
+
+    __slots__ = ("module_name", "_token")
+
+    def __init__(self, module_name: str):
+        self.module_name = module_name
+        self._token = None
+
+    def __enter__(self):
+        self._token = _MODULE.set(self.module_name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _MODULE.reset(self._token)
+
+
+def scope(module_name: str):
+    """模块执行期间的事件归属；没有接收方时返回共享的空上下文"""
+    if _SINK is None:
+        return _NULL_SCOPE
+    return _Scope(module_name)
+
+
+class JsonlSink:
+    """把事件逐行写入 JSONL 文件（path 为 - 时写 stderr），多线程写入互不交错"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = sys.stderr if path == "-" else open(path, "w", encoding="utf-8")
+
+    def __call__(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=repr) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is sys.stderr:
+                self._file.flush()
+            else:
+                self._file.close()
+
+
+def start(path: str) -> JsonlSink:
+    """开始把事件写入 JSONL 文件
+
+    Raises:
+        OSError: 文件无法打开
+    """
+    global _SINK
+    sink = JsonlSink(path)
+    _SINK = sink
+    return sink
+
+
+def stop():
+    """停止接收事件并关闭文件"""
+    global _SINK
+    sink, _SINK = _SINK, None
+    if isinstance(sink, JsonlSink):
+        sink.close()
+
+
+@contextmanager
+def collect() -> Iterator[List[Dict[str, Any]]]:
+    """在代码块内把事件收集到列表中；外层已有接收方时事件同时转发给它
+
+    Usage:
+    ---
+    >>> with collect() as records:
+    >>>     gtools.run("format", path="src")
+    >>> [r["path"] for r in records if r["event"] == "file_formatted"]
+    """
+    global _SINK
+    records: List[Dict[str, Any]] = []
+    previous = _SINK
+
+    def sink(record: Dict[str, Any]):
+        records.append(record)
+        if previous is not None:
+            previous(record)
+
+    _SINK = sink
+    try:
+        yield records
+    finally:
+        _SINK = previous
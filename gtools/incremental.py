@@ -0,0 +1,236 @@
+"""
+增量执行（gtools run --config ... --incremental，或管道配置 "incremental": true）
+类似 make：为每个节点计算指纹，与上次成功执行时记录的指纹相同的节点直接跳过。
+
+指纹由以下部分组成：
+- 模块源码：模块函数所在源文件（functions/<模块>/main.py）的 sha1
+- 参数：params 经模块解析器补全默认值后的 JSON，以及 inputs 中的引用
+- 执行环境：节点的工作目录和环境变量覆盖
+- 输入文件：节点 "input_files" 声明的文件 / 目录 / glob（相对路径基于节点工作目录）的内容 sha1
+- 上游指纹：depends_on 中每个节点的指纹
+
+输入文件在节点即将启动时才计算指纹，上游节点刚写出的文件也能被正确识别。
+任何一个上游节点在本次重新执行后，下游节点总是重新执行。
+
+状态按管道配置文件保存在 <缓存目录>/pipelines/ 下，失败的节点会清除记录。
+--force 重新执行全部节点，--force-node NAME 重新执行指定节点（及其下游）；
+--explain 打印每个节点执行或跳过的原因。
+"""
+import glob
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .cache import _source_digest
+from .manifest import get_cache_dir, get_module_files
+from .registry import FUNCTION, ConfigCompileError, compile_module_args
+
+# 2: replayable 只标记能经 JSON 原样还原的结果；旧版本可能把 tuple 等记录为可还原，直接丢弃
+STATE_VERSION = 2
+
+# 指纹组成部分及其在 --explain 中的名称
+COMPONENTS = {"source": "模块源码", "params": "参数", "environment": "工作目录/环境变量",
+              "inputs": "输入文件", "upstream": "上游指纹"}
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _json_digest(value: Any) -> str:
+    return _sha1(json.dumps(value, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8"))
+
+
+def get_state_path(config_path: str) -> str:
+    """管道配置对应的状态文件：<缓存目录>/pipelines/<配置文件绝对路径的 sha1>.json"""
+    key = _sha1(os.path.abspath(config_path).encode("utf-8"))[:16]
+    return os.path.join(get_cache_dir(), "pipelines", f"{key}.json")
+
+
+def module_source_digest(module_name: str) -> Optional[str]:
+    """模块源文件的 sha1；已注册时使用函数所在文件，否则按清单定位 main.py"""
+    if FUNCTION.has(module_name):
+        digest = _source_digest(FUNCTION.get(module_name))
+        if digest is not None:
+            return digest
+    files = get_module_files(module_name)
+    if files is None or not files.main_py:
+        return None
+    try:
+        with open(files.main_py, "rb") as f:
+            return _sha1(f.read())
+    except OSError:
+        return None
+
+
+class FileHasher:
+    """文件内容 sha1，(mtime_ns, size) 未变化时复用上次的结果，不重新读取文件"""
+
+    def __init__(self, known: Optional[Dict[str, List[Any]]] = None):
+        self.known = known or {}
+        self.seen: Dict[str, List[Any]] = {}
+
+    def digest(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self.known.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            digest = cached[2]
+        else:
+            hasher = hashlib.sha1()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+        self.seen[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+
+def expand_inputs(patterns: List[str], cwd: str) -> Dict[str, Optional[str]]:
+    """展开输入声明，返回 {显示路径: 绝对路径}；没有匹配到文件的声明对应 None"""
+    files: Dict[str, Optional[str]] = {}
+    for pattern in patterns:
+        full = os.path.join(cwd, pattern)
+        matches = sorted(glob.glob(full, recursive=True)) if glob.has_magic(pattern) else \
+            ([full] if os.path.exists(full) else [])
+        found = False
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+                    for name in sorted(names):
+                        path = os.path.join(root, name)
+                        files[os.path.relpath(path, cwd)] = path
+                        found = True
+            else:
+                files[os.path.relpath(match, cwd)] = match
+                found = True
+        if not found:
+            files[pattern] = None
+    return files
+
+
+class IncrementalPlanner:
+    """决定管道节点是否需要执行，并在执行成功后记录指纹
+
+    Usage:
+    ---
+    >>> planner = IncrementalPlanner(get_state_path("pipeline.json"), force_nodes={"clean"})
+    >>> run, reason = planner.plan(node, cwd, env, results)
+    >>> planner.record(result)
+    >>> planner.save()
+    """
+
+    def __init__(self, state_path: str, force: bool = False, force_nodes: Optional[Set[str]] = None,
+                 explain: bool = False):
+        self.state_path = state_path
+        self.force = force
+        self.force_nodes = set(force_nodes or ())
+        self.explain = explain
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._hashes: Dict[str, List[Any]] = {}
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == STATE_VERSION:
+                self.state = data.get("nodes", {})
+                self._hashes = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        self._hasher = FileHasher(self._hashes)
+
+    def fingerprint(self, node, cwd: Optional[str], env: Optional[Dict[str, Optional[str]]]) -> Dict[str, Any]:
+        """计算节点指纹，返回 {"fingerprint", "components", "files"}"""
+        try:
+            params = vars(compile_module_args(node.module, node.params))
+        except (ConfigCompileError, KeyError, ValueError):
+            # 参数无法编译时节点执行必然失败，使用原始参数即可
+            params = node.params
+        files = {shown: (self._hasher.digest(path) if path else None)
+                 for shown, path in expand_inputs(node.input_files, cwd or os.getcwd()).items()}
+        components = {
+            "source": module_source_digest(node.module) or "",
+            "params": _json_digest({"args": params, "inputs": node.inputs}),
+            "environment": _json_digest({"cwd": cwd, "env": env}),
+            "inputs": _json_digest(files),
+            "upstream": {dep: self.fingerprints.get(dep, "") for dep in node.depends_on},
+        }
+        return {"fingerprint": _json_digest([node.module, components]), "components": components, "files": files}
+
+    def plan(self, node, cwd: Optional[str], env: Optional[Dict[str, Optional[str]]],
+             results: Dict[str, Dict[str, Any]], publish: bool = False) -> Tuple[bool, str]:
+        """返回 (是否执行, 原因)；跳过的节点沿用上次记录的结果
+
+        publish 为 True 表示返回值被下游 inputs 引用，上次的返回值无法从 JSON 还原时必须重新执行
+        """
+        current = self.fingerprint(node, cwd, env)
+        self.fingerprints[node.name] = current["fingerprint"]
+        self._pending[node.name] = current
+        if self.force:
+            return True, "--force"
+        if node.name in self.force_nodes:
+            return True, "--force-node"
+        rerun = [dep for dep in node.depends_on if results.get(dep, {}).get("status") == "ok"]
+        if rerun:
+            return True, f"上游节点已重新执行: {', '.join(rerun)}"
+        previous = self.state.get(node.name)
+        if previous is None:
+            return True, "没有成功执行的记录"
+        if previous["fingerprint"] == current["fingerprint"]:
+            if publish and not previous.get("replayable", True):
+                return True, "返回值被下游节点引用，上次的返回值无法从 JSON 还原"
+            finished = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(previous["finished"]))
+            return False, f"指纹未变化，上次成功于 {finished}"
+        return True, self.describe_change(previous, current)
+
+    @staticmethod
+    def describe_change(previous: Dict[str, Any], current: Dict[str, Any]) -> str:
+        """说明指纹中哪些部分发生了变化"""
+        changes = []
+        old_components, new_components = previous.get("components", {}), current["components"]
+        for key, label in COMPONENTS.items():
+            if old_components.get(key) == new_components[key]:
+                continue
+            if key == "inputs":
+                old_files, new_files = previous.get("files", {}), current["files"]
+                changed = sorted(path for path in old_files.keys() | new_files.keys()
+                                 if old_files.get(path) != new_files.get(path))
+                shown = ", ".join(changed[:3]) + (f" 等 {len(changed)} 个" if len(changed) > 3 else "")
+                label = f"{label}（{shown}）" if shown else label
+            elif key == "upstream":
+                old_upstream = old_components.get(key) or {}
+                changed = [dep for dep, fp in new_components[key].items() if old_upstream.get(dep) != fp]
+                label = f"{label}（{', '.join(changed)}）" if changed else label
+            changes.append(label)
+        return "变化: " + "、".join(changes) if changes else "指纹变化"
+
+    def previous_result(self, name: str) -> Any:
+        return self.state.get(name, {}).get("result")
+
+    def record(self, result: Dict[str, Any]):
+        """执行成功的节点记录指纹，失败的节点清除记录（下次必定重新执行）"""
+        name = result["name"]
+        current = self._pending.pop(name, None)
+        if result["status"] == "ok" and current is not None:
+            self.state[name] = {"fingerprint": current["fingerprint"], "components": current["components"],
+                                "files": current["files"], "finished": time.time(),
+                                "wall_ms": result["wall_ms"], "result": result["result"],
+                                "replayable": result.get("replayable", True)}
+        elif result["status"] == "failed":
+            self.state.pop(name, None)
+
+    def save(self):
+        """原子写入状态文件"""
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        # 只保留本次计算过的文件，删除或不再声明的文件不会一直留在状态中
+        data = {"version": STATE_VERSION, "nodes": self.state, "files": self._hasher.seen}
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=repr)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,632 @@
+"""
+模块清单（manifest）实现
+- ModuleIndex: 一次 os.scandir 遍历 functions/ 与 configs/，记录 main.py、start.sh、
+  skill.md/SKILL.md、default.json 是否存在，供整个 CLI 进程复用。
+  支持嵌套命名空间：不含 main.py 的目录（如 functions/vision/）会继续向下查找功能包，
+  功能包以相对路径（如 vision/mark_imgs）标识
+- ModuleManifest: 静态扫描 functions/**/main.py 中的 @FUNCTION.regist / @ARGS.regist 装饰器，
+  无需导入模块即可回答 list / info / root 等查询。
+  扫描结果按功能包路径哈希分片持久化到缓存目录，按文件 mtime/size/哈希 失效；
+  另有一个 模块名 -> 功能包 的名称索引，单模块调用只需读取名称索引和一个分片
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional, List, Tuple
+
+from . import trace
+
+MANIFEST_VERSION = 6
+
+# 命令行补全索引文件名（位于清单缓存目录下）
+COMPLETION_INDEX = "completion.tsv"
+
+# 清单分片数量（按功能包路径 sha1 的首个十六进制字符分片）
+SHARD_COUNT = 16
+
+# 命名空间目录的最大嵌套深度
+MAX_NAMESPACE_DEPTH = 4
+
+# 只识别这两个注册器的装饰器
+REGISTRY_NAMES = ("FUNCTION", "ARGS")
+
+
+def get_cache_dir() -> str:
+    """获取 gtools 缓存目录，可通过环境变量 GTOOLS_CACHE_DIR 覆盖"""
+    cache_dir = os.environ.get("GTOOLS_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    return os.path.join(os.path.expanduser("~"), ".cache", "gtools")
+
+
+def get_functions_dir() -> str:
+    """获取 functions 目录路径"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, "functions")
+
+
+def module_import_path(item: str) -> str:
+    """功能包路径（如 vision/mark_imgs）对应的导入路径"""
+    return "functions." + item.replace("/", ".") + ".main"
+
+
+class ModuleFiles:
+    """单个功能包目录下与 CLI 相关的文件"""
+
+    __slots__ = ("item", "path", "main_py", "main_mtime_ns", "main_size", "start_sh", "skill_md")
+
+    def __init__(self, item: str, path: str):
+        self.item = item
+        self.path = path
+        self.main_py: Optional[str] = None
+        self.main_mtime_ns = 0
+        self.main_size = 0
+        self.start_sh: Optional[str] = None
+        self.skill_md: Optional[str] = None
+
+    @classmethod
+    def from_entries(cls, item: str, path: str, entries) -> "ModuleFiles":
+        """根据功能包目录的 scandir 结果构建"""
+        files = cls(item, path)
+        children = {child.name: child for child in entries}
+        main_entry = children.get("main.py")
+        if main_entry is not None and main_entry.is_file():
+            stat = main_entry.stat()
+            files.main_py = main_entry.path
+            files.main_mtime_ns = stat.st_mtime_ns
+            files.main_size = stat.st_size
+        if "start.sh" in children:
+            files.start_sh = children["start.sh"].path
+        # 优先使用 skill.md（小写），其次 SKILL.md（大写）
+        for skill_name in ("skill.md", "SKILL.md"):
+            if skill_name in children:
+                files.skill_md = children[skill_name].path
+                break
+        return files
+
+
+class ModuleIndex:
+    """模块文件系统元数据索引：functions/ 与 configs/ 各遍历一次"""
+
+    def __init__(self, functions_dir: Optional[str] = None, configs_dir: Optional[str] = None):
+        self.functions_dir = functions_dir or get_functions_dir()
+        self.configs_dir = configs_dir or os.path.join(os.path.dirname(self.functions_dir), "configs")
+        # item（functions 下的功能包路径）-> ModuleFiles
+        self.modules: Dict[str, ModuleFiles] = {}
+        # 拥有 configs/<name>/default.json 的模块名
+        self.default_configs = set()
+        # 目录名 -> item，用于按模块名查找嵌套的功能包
+        self._by_name: Dict[str, str] = {}
+        # 命名空间目录（functions 本身为 ""）-> 遍历前的 mtime_ns，新增功能包会改变所在目录的 mtime
+        self.namespaces: Dict[str, int] = {}
+
+    def scan(self) -> "ModuleIndex":
+        """遍历目录，构建索引"""
+        self.modules = {}
+        self.default_configs = set()
+        self._by_name = {}
+        self.namespaces = {}
+
+        mtime_ns = _mtime_ns(self.functions_dir)
+        if mtime_ns is not None:
+            self.namespaces[""] = mtime_ns
+        self._scan_dir(_scandir(self.functions_dir), "", 0)
+
+        for entry in _scandir(self.configs_dir):
+            if entry.is_dir() and any(child.name == "default.json" for child in _scandir(entry.path)):
+                self.default_configs.add(entry.name)
+
+        return self
+
+    def _scan_dir(self, entries, prefix: str, depth: int):
+        """记录目录下的功能包；不含 main.py 的目录视为命名空间继续向下查找"""
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.name.startswith(('_', '.')) or not entry.is_dir():
+                continue
+            item = prefix + entry.name
+            # 在列出子项之前取 mtime，遍历期间新增的功能包会在下次查询时被发现
+            mtime_ns = _mtime_ns(entry.path)
+            children_list = _scandir(entry.path)
+            files = ModuleFiles.from_entries(item, entry.path, children_list)
+            self.modules[item] = files
+            # 同名目录以先遍历到的为准
+            self._by_name.setdefault(entry.name, item)
+
+            if files.main_py is None and depth + 1 < MAX_NAMESPACE_DEPTH:
+                if mtime_ns is not None:
+                    self.namespaces[item] = mtime_ns
+                self._scan_dir(children_list, item + "/", depth + 1)
+
+    def get(self, item: str) -> Optional[ModuleFiles]:
+        """按功能包路径获取模块文件信息"""
+        return self.modules.get(item)
+
+    def find(self, module_name: str) -> Optional[ModuleFiles]:
+        """按模块名获取模块文件信息：优先使用清单中的注册位置，其次按目录名匹配"""
+        item = None
+        if _MANIFEST is not None:
+            item = _MANIFEST.find_item(module_name)
+        if item is None:
+            item = module_name if module_name in self.modules else self._by_name.get(module_name)
+        return self.modules.get(item) if item is not None else None
+
+    def items_with_main(self) -> List[str]:
+        """包含 main.py 的功能包路径（已排序）"""
+        return sorted(item for item, files in self.modules.items() if files.main_py)
+
+    def has_default_config(self, module_name: str) -> bool:
+        """configs/<module_name>/default.json 是否存在"""
+        return module_name in self.default_configs
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scandir(path: str):
+    """os.scandir 的容错包装：目录不存在时返回空列表"""
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+_INDEX: Optional[ModuleIndex] = None
+
+
+def has_default_config(module_name: str) -> bool:
+    """configs/<module_name>/default.json 是否存在；尚未建立索引时直接检查文件"""
+    if _INDEX is None:
+        configs_dir = os.path.join(os.path.dirname(get_functions_dir()), "configs")
+        return os.path.isfile(os.path.join(configs_dir, module_name, "default.json"))
+    return _INDEX.has_default_config(module_name)
+
+
+def get_module_index(refresh: bool = False) -> ModuleIndex:
+    """获取进程内共享的文件系统索引"""
+    global _INDEX
+    if _INDEX is None or refresh:
+        with trace.span("scan functions dir", "discovery"):
+            _INDEX = ModuleIndex().scan()
+    return _INDEX
+
+
+def _file_digest(path: str) -> str:
+    """计算文件内容的 sha1"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _registry_of_decorator(decorator) -> Optional[str]:
+    """判断装饰器是否为 FUNCTION.regist(...) / ARGS.regist(...)，返回注册器名"""
+    import ast
+
+    if not isinstance(decorator, ast.Call):
+        return None
+    func = decorator.func
+    if not isinstance(func, ast.Attribute) or func.attr != "regist":
+        return None
+    owner = func.value
+    # 支持 FUNCTION.regist 与 registry.FUNCTION.regist 两种写法
+    if isinstance(owner, ast.Name) and owner.id in REGISTRY_NAMES:
+        return owner.id
+    if isinstance(owner, ast.Attribute) and owner.attr in REGISTRY_NAMES:
+        return owner.attr
+    return None
+
+
+def _module_name_of_decorator(decorator, constants: Dict[str, str]) -> Optional[str]:
+    """从装饰器参数中提取 module_name，无法静态确定时返回 None"""
+    import ast
+
+    node = None
+    for keyword in decorator.keywords:
+        if keyword.arg == "module_name":
+            node = keyword.value
+            break
+    if node is None and decorator.args:
+        node = decorator.args[0]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name) and node.id in constants:
+        return constants[node.id]
+    # 模板生成的 f"xxx"（无插值或只引用模块级常量）
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                parts.append(value.value)
+            elif isinstance(value, ast.FormattedValue) and isinstance(value.value, ast.Name) \
+                    and value.value.id in constants and value.conversion == -1 \
+                    and value.format_spec is None:
+                parts.append(constants[value.value.id])
+            else:
+                return None
+        return "".join(parts)
+    return None
+
+
+def _capabilities_of_decorator(decorator, module_name: str) -> Dict[str, Any]:
+    """提取装饰器中以字面量声明的执行特性（pure=True 等），非字面量的声明留给真实导入
+
+    声明无效（未知特性、取值不合法）时注册会失败，静态结果同样不声明任何特性
+    """
+    import ast
+    from .registry import CAPABILITY_DEFAULTS, validate_capabilities
+
+    capabilities = {}
+    for keyword in decorator.keywords:
+        if keyword.arg is None or keyword.arg == "module_name":
+            continue
+        if keyword.arg not in CAPABILITY_DEFAULTS:
+            return {}
+        try:
+            capabilities[keyword.arg] = ast.literal_eval(keyword.value)
+        except (ValueError, TypeError, SyntaxError):
+            continue
+    try:
+        return validate_capabilities(module_name, capabilities)
+    except ValueError:
+        return {}
+
+
+# 不消费参数值的 argparse action
+_FLAG_ACTIONS = ("store_true", "store_false", "store_const", "append_const", "count", "help", "version")
+
+
+def _options_of_parser_function(node) -> List[Dict[str, Any]]:
+    """提取参数解析函数中 add_argument 调用的选项字符串、是否带值以及字面量 choices（用于命令行补全）"""
+    import ast
+
+    options = []
+    for call in ast.walk(node):
+        if not isinstance(call, ast.Call) or not isinstance(call.func, ast.Attribute) \
+                or call.func.attr != "add_argument":
+            continue
+        flags = [arg.value for arg in call.args
+                 if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+        if not flags or len(flags) != len(call.args):
+            continue
+        option: Dict[str, Any] = {"flags": [flag for flag in flags if flag.startswith("-")], "value": True}
+        for keyword in call.keywords:
+            try:
+                value = ast.literal_eval(keyword.value)
+            except (ValueError, TypeError, SyntaxError):
+                continue
+            if keyword.arg == "action" and value in _FLAG_ACTIONS:
+                option["value"] = False
+            elif keyword.arg == "nargs" and value == 0:
+                option["value"] = False
+            elif keyword.arg == "choices" and isinstance(value, (list, tuple, set, range)):
+                option["choices"] = [str(choice) for choice in value]
+        # 位置参数只有带 choices 时才对补全有用
+        if option["flags"] or "choices" in option:
+            options.append(option)
+    return options
+
+
+def scan_module_file(path: str) -> Dict[str, Any]:
+    """静态解析模块文件，提取注册信息
+
+    Returns:
+        {"FUNCTION": {module_name: attr}, "ARGS": {module_name: attr},
+         "capabilities": {module_name: {特性: 值}},
+         "options": {module_name: [{"flags": [...], "value": bool, "choices": [...]}]}, "dynamic": bool}
+        dynamic 为 True 表示存在无法静态确定名称的注册，需要导入模块才能得知
+    """
+    import ast
+
+    result = {"FUNCTION": {}, "ARGS": {}, "capabilities": {}, "options": {}, "dynamic": False}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, UnicodeDecodeError, OSError):
+        # 无法解析的文件交给真实导入去报告错误
+        result["dynamic"] = True
+        return result
+
+    # 收集模块级的字符串常量，支持 MODULE_NAME = "xxx" 的写法
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) \
+                and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for decorator in node.decorator_list:
+            registry_name = _registry_of_decorator(decorator)
+            if registry_name is None:
+                continue
+            module_name = _module_name_of_decorator(decorator, constants)
+            if module_name is None:
+                result["dynamic"] = True
+                continue
+            result[registry_name][module_name] = node.name
+            if registry_name == "FUNCTION":
+                capabilities = _capabilities_of_decorator(decorator, module_name)
+                if capabilities:
+                    result["capabilities"][module_name] = capabilities
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                options = _options_of_parser_function(node)
+                if options:
+                    result["options"][module_name] = options
+
+    return result
+
+
+def _shard_of(item: str) -> str:
+    """功能包所在的清单分片"""
+    return hashlib.sha1(item.encode("utf-8")).hexdigest()[:len(format(SHARD_COUNT - 1, "x"))]
+
+
+class ModuleManifest:
+    """模块清单：记录每个功能包注册了哪些模块名
+
+    缓存目录结构：
+        names.json        模块名 -> 功能包 的名称索引，以及需要真实导入的功能包列表
+        shard-<x>.json    按功能包路径哈希分片的扫描结果
+    """
+
+    def __init__(self, functions_dir: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.functions_dir = functions_dir or get_functions_dir()
+        if cache_dir is None:
+            key = hashlib.sha1(os.path.abspath(self.functions_dir).encode("utf-8")).hexdigest()[:12]
+            cache_dir = os.path.join(get_cache_dir(), f"manifest-{key}")
+        self.cache_dir = cache_dir
+        # item（functions 下的功能包路径）-> 条目
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # 注册器名 -> {module_name: item}
+        self._index: Dict[str, Dict[str, str]] = {name: {} for name in REGISTRY_NAMES}
+        self._dynamic: List[str] = []
+        # 命名空间目录 -> mtime_ns（见 ModuleIndex.namespaces）
+        self.namespaces: Dict[str, int] = {}
+        # lookup() 读取过的名称索引和分片
+        self._names: Optional[Dict[str, Any]] = None
+        self._shards: Dict[str, Dict[str, Any]] = {}
+
+    def _read_json(self, name: str) -> Dict[str, Any]:
+        """读取缓存文件，损坏或版本不符时视为空"""
+        try:
+            with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION \
+                or data.get("functions_dir") != os.path.abspath(self.functions_dir):
+            return {}
+        return data
+
+    def _write_json(self, name: str, data: Dict[str, Any]):
+        """原子写入缓存文件，缓存目录不可写时静默跳过"""
+        data = dict(data, version=MANIFEST_VERSION, functions_dir=os.path.abspath(self.functions_dir))
+        path = os.path.join(self.cache_dir, name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _read_shard(self, shard: str) -> Dict[str, Dict[str, Any]]:
+        return self._read_json(f"shard-{shard}.json").get("entries", {})
+
+    def _write_cache(self, cached_shards: Dict[str, Dict[str, Any]]):
+        """只重写发生变化的分片，名称索引随之更新"""
+        shards: Dict[str, Dict[str, Any]] = {}
+        for item, entry in self.entries.items():
+            shards.setdefault(_shard_of(item), {})[item] = entry
+
+        for shard in set(shards) | set(cached_shards):
+            entries = shards.get(shard)
+            if entries == cached_shards.get(shard):
+                continue
+            if entries:
+                self._write_json(f"shard-{shard}.json", {"entries": entries})
+            else:
+                try:
+                    os.unlink(os.path.join(self.cache_dir, f"shard-{shard}.json"))
+                except OSError:
+                    pass
+
+        names = {name: self._index[name] for name in REGISTRY_NAMES}
+        names["dynamic"] = self.dynamic_items()
+        names["namespaces"] = self.namespaces
+        self._write_json("names.json", names)
+
+        # 已安装命令行补全时同步更新补全索引
+        if os.path.exists(os.path.join(self.cache_dir, COMPLETION_INDEX)):
+            from .completion import write_index
+            write_index(self)
+
+    def _refresh_entry(self, files: ModuleFiles, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """根据 mtime/size 判断条目是否失效，失效时再比较哈希决定是否重新解析"""
+        if cached and cached.get("mtime_ns") == files.main_mtime_ns and cached.get("size") == files.main_size:
+            return cached
+
+        digest = _file_digest(files.main_py)
+        if cached and cached.get("sha1") == digest:
+            entry = dict(cached)
+        else:
+            entry = scan_module_file(files.main_py)
+            entry["sha1"] = digest
+        entry["mtime_ns"] = files.main_mtime_ns
+        entry["size"] = files.main_size
+        return entry
+
+    def load(self, index: Optional[ModuleIndex] = None) -> "ModuleManifest":
+        """根据文件系统索引刷新清单，复用未变化的缓存条目"""
+        if index is None:
+            index = ModuleIndex(self.functions_dir).scan()
+        cached_shards = {}
+        for entry in _scandir(self.cache_dir):
+            if entry.name.startswith("shard-") and entry.name.endswith(".json"):
+                shard = entry.name[len("shard-"):-len(".json")]
+                cached_shards[shard] = self._read_shard(shard)
+        cached_entries = {}
+        for entries in cached_shards.values():
+            cached_entries.update(entries)
+
+        entries = {}
+        for item in index.items_with_main():
+            entries[item] = self._refresh_entry(index.get(item), cached_entries.get(item))
+
+        changed = entries != cached_entries
+        self.entries = entries
+        self.namespaces = dict(index.namespaces)
+        self._build_index()
+        if changed or self._read_json("names.json").get("namespaces") != self.namespaces:
+            self._write_cache(cached_shards)
+        return self
+
+    def lookup(self, module_name: str) -> Optional[Tuple[str, Dict[str, Any], List[str]]]:
+        """不遍历 functions 目录，只读取名称索引和一个分片来定位模块
+
+        Returns:
+            (item, 条目, 需要真实导入的功能包列表)；缓存未命中、对应 main.py 已变化，
+            或 functions / 命名空间目录中新增、删除了功能包时返回 None，调用方应退回到完整的 load()
+        """
+        if self._names is None:
+            self._names = self._read_json("names.json")
+        names = self._names
+        item = None
+        for registry_name in REGISTRY_NAMES:
+            item = names.get(registry_name, {}).get(module_name)
+            if item is not None:
+                break
+        if item is None:
+            return None
+
+        shard = _shard_of(item)
+        if shard not in self._shards:
+            self._shards[shard] = self._read_shard(shard)
+        entry = self._shards[shard].get(item)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.functions_dir, *item.split("/"), "main.py"))
+        except OSError:
+            return None
+        if stat.st_mtime_ns != entry.get("mtime_ns") or stat.st_size != entry.get("size"):
+            return None
+        # 新增的功能包可能注册同名模块，或是需要真实导入的动态功能包
+        if not self._namespaces_unchanged(names.get("namespaces", {})):
+            return None
+        return item, entry, names.get("dynamic", [])
+
+    def _namespaces_unchanged(self, namespaces: Dict[str, int]) -> bool:
+        """命名空间目录的 mtime 均未变化（没有新增、删除功能包）"""
+        for namespace, mtime_ns in namespaces.items():
+            if _mtime_ns(os.path.join(self.functions_dir, *namespace.split("/"))) != mtime_ns:
+                return False
+        return True
+
+    def is_current(self) -> bool:
+        """不遍历目录，检查已加载的清单是否仍与文件系统一致
+
+        与 lookup() 相同，只比较各功能包 main.py 的 mtime/size 和命名空间目录的 mtime
+        """
+        if not self.namespaces or not self._namespaces_unchanged(self.namespaces):
+            return False
+        for item, entry in self.entries.items():
+            try:
+                stat = os.stat(os.path.join(self.functions_dir, *item.split("/"), "main.py"))
+            except OSError:
+                return False
+            if stat.st_mtime_ns != entry.get("mtime_ns") or stat.st_size != entry.get("size"):
+                return False
+        return True
+
+    def _build_index(self):
+        """构建 模块名 -> item 的反向索引"""
+        self._index = {name: {} for name in REGISTRY_NAMES}
+        self._dynamic = sorted(item for item, entry in self.entries.items() if entry.get("dynamic"))
+        for item, entry in sorted(self.entries.items()):
+            for registry_name in REGISTRY_NAMES:
+                for module_name in entry.get(registry_name, {}):
+                    self._index[registry_name].setdefault(module_name, item)
+
+    def has(self, registry_name: str, module_name: str) -> bool:
+        """检查清单中指定注册器下是否存在模块"""
+        return module_name in self._index.get(registry_name, {})
+
+    def find_item(self, module_name: str) -> Optional[str]:
+        """返回注册了该模块名的功能包路径"""
+        for registry_name in REGISTRY_NAMES:
+            item = self._index[registry_name].get(module_name)
+            if item is not None:
+                return item
+        return None
+
+    def module_names(self) -> List[str]:
+        """清单中所有模块名"""
+        names = set()
+        for registry_name in REGISTRY_NAMES:
+            names.update(self._index[registry_name])
+        return sorted(names)
+
+    def dynamic_items(self) -> List[str]:
+        """需要真实导入才能确定注册名的功能包"""
+        return self._dynamic
+
+
+_MANIFEST: Optional[ModuleManifest] = None
+# 只用于 lookup() 快速路径的实例（复用已读取的名称索引和分片）
+_LOOKUP: Optional[ModuleManifest] = None
+
+
+def get_manifest(refresh: bool = False) -> ModuleManifest:
+    """获取进程内共享的清单实例，refresh 时同时重新扫描文件系统索引"""
+    global _MANIFEST
+    if _MANIFEST is None or refresh:
+        index = get_module_index(refresh=refresh)
+        with trace.span("load manifest", "discovery"):
+            _MANIFEST = ModuleManifest().load(index)
+    return _MANIFEST
+
+
+def get_module_files(module_name: str) -> Optional[ModuleFiles]:
+    """按模块名获取模块文件信息
+
+    进程内尚未建立文件系统索引时，通过清单缓存定位功能包并只遍历该目录，
+    避免单模块的 info / start 查询遍历整个 functions 目录
+    """
+    if _INDEX is None:
+        found = lookup_module(module_name)
+        if found is not None:
+            item = found[0]
+            path = os.path.join(get_functions_dir(), *item.split("/"))
+            return ModuleFiles.from_entries(item, path, _scandir(path))
+    return get_module_index().find(module_name)
+
+
+def lookup_module(module_name: str) -> Optional[Tuple[str, Dict[str, Any], List[str]]]:
+    """定位注册了 module_name 的功能包，返回 (item, 条目, 需要真实导入的功能包列表)
+
+    进程内已加载完整清单时直接查询；否则只读取名称索引和一个分片，
+    缓存未命中时加载完整清单（新增的功能包会在这里被发现）
+    """
+    global _LOOKUP
+    if _MANIFEST is None:
+        if _LOOKUP is None:
+            _LOOKUP = ModuleManifest()
+        with trace.span("manifest lookup", "discovery", module=module_name):
+            found = _LOOKUP.lookup(module_name)
+        if found is not None:
+            return found
+    manifest = get_manifest()
+    item = manifest.find_item(module_name)
+    if item is None:
+        return None
+    return item, manifest.entries[item], manifest.dynamic_items()
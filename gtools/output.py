@@ -0,0 +1,112 @@
+"""
+输出模式（gtools --output-buffer / --quiet）
+format、mark_imgs、update 等模块逐项 print，直接写终端时每一行都是一次写系统调用，
+大量输出时终端渲染成为瓶颈；用 redirect_stdout 捕获又会在内存中拼出很大的字符串。
+
+- --output-buffer[=SIZE]：stdout 换成大缓冲区写入器（默认 1M），缓冲区写满或执行结束时才写出
+- --quiet[=PATH]：stdout 写入本次执行的日志文件（默认 <缓存目录>/logs/），终端只显示 stderr 和日志路径
+
+两种模式都直接写文件描述符，不在内存中累积输出。只替换 Python 层的 sys.stdout，
+模块启动的子进程仍写原始的标准输出。
+"""
+import os
+import sys
+import time
+from typing import Optional
+
+from .manifest import get_cache_dir
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+_SIZE_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """解析 64K / 4M / 1G 或字节数
+
+    Raises:
+        ValueError: 格式不合法或不是正数
+    """
+    text = text.strip().upper().rstrip("B")
+    multiplier = 1
+    if text and text[-1] in _SIZE_UNITS:
+        multiplier = _SIZE_UNITS[text[-1]]
+        text = text[:-1]
+    size = int(float(text) * multiplier)
+    if size <= 0:
+        raise ValueError(f"缓冲区大小必须为正数: {text}")
+    return size
+
+
+def get_log_dir() -> str:
+    """--quiet 默认的日志目录"""
+    return os.path.join(get_cache_dir(), "logs")
+
+
+def default_log_path(label: str) -> str:
+    """本次执行的日志文件路径：<日志目录>/<时间>-<命令>-<pid>.log"""
+    safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in label) or "gtools"
+    return os.path.join(get_log_dir(), f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{os.getpid()}.log")
+
+
+class BufferedStdout:
+    """把 sys.stdout 换成大缓冲区写入器（path 为 None 时写原标准输出，否则写入文件），退出时刷新并恢复
+
+    Usage:
+    ---
+    >>> with BufferedStdout(path="run.log") as output:
+    >>>     main(args)
+    >>> output.bytes_written
+    """
+
+    def __init__(self, path: Optional[str] = None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        self._stream = None
+        self._original = None
+
+    def open(self) -> "BufferedStdout":
+        """替换 sys.stdout
+
+        Raises:
+            OSError: 日志文件无法创建
+        """
+        sys.stdout.flush()
+        if self.path is not None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._stream = open(self.path, "w", buffering=self.buffer_size, encoding="utf-8")
+        else:
+            try:
+                fd = os.dup(sys.stdout.fileno())
+            except (AttributeError, OSError, ValueError):
+                # 标准输出没有文件描述符（如已被捕获），保持原样
+                return self
+            self._stream = open(fd, "w", buffering=self.buffer_size,
+                                encoding=getattr(sys.stdout, "encoding", None) or "utf-8",
+                                errors=getattr(sys.stdout, "errors", None) or "strict")
+        self._original, sys.stdout = sys.stdout, self._stream
+        return self
+
+    def close(self):
+        """刷新缓冲区并恢复 sys.stdout"""
+        if self._stream is None:
+            return
+        sys.stdout = self._original
+        try:
+            self._stream.flush()
+            if self.path is not None:
+                self.bytes_written = self._stream.tell()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self) -> "BufferedStdout":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,704 @@
+"""
+管道执行（gtools run --config）
+管道配置中的每个节点：
+    {"name": "calculator2", "module_name": "calculator", "params": {...}, "depends_on": ["calculator1"]}
+name 是节点名（depends_on 引用的名字），module_name 是要执行的模块，省略时与 name 相同。
+inputs 把上游节点的返回值注入参数（见 gtools.artifacts）：{"numbers": "loader.result"}；
+节点在子进程中执行时，较大的返回值经共享内存传递（见 gtools.transport）。
+
+DagExecutor 在节点的全部依赖完成后立即启动它，同时运行的节点数不超过 max_workers：
+- max_workers 为 1 且使用线程执行器时，节点在主线程中按拓扑顺序依次执行，输出直接显示
+- 其他情况下节点在线程池 / 进程池中执行，输出按节点捕获，节点结束时整块打印
+
+失败策略：fail-fast（默认）在第一个节点失败后不再启动新节点；continue 只跳过失败节点的下游节点。
+
+工作目录与环境变量：节点在管道的 working_directory 中执行，节点可以用 working_directory（相对路径基于
+管道目录）和 env（值为 null 表示删除该变量）覆盖。串行执行和进程池中按节点切换并在结束后恢复；
+线程池共享进程级状态，节点不能单独覆盖。
+
+进程隔离（--isolate，或节点配置 "isolate": true）：每个节点在新的子进程中执行，
+stdout/stderr 在文件描述符层面捕获（包括子进程和 C 扩展的输出），
+节点崩溃（段错误、被信号终止）只导致该节点失败，不影响管道中的其他节点。
+
+增量执行（planner 为 gtools.incremental.IncrementalPlanner）：指纹未变化的节点不执行，状态为 up-to-date。
+"""
+import os
+import importlib
+import reprlib
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import events, stats, trace, transport
+from .artifacts import ArtifactStore, parse_ref
+from .registry import FUNCTION, ConfigCompileError, auto_import_module, compile_module_args, invoke, validate_module
+from .runner import _LIMITS, _completed, _init_process_worker, build_limits
+from .utils.capture import capture_output
+from .utils.json_exact import fits_json
+from .utils.text import display_width
+
+ON_ERROR_POLICIES = ("fail-fast", "continue")
+
+
+class PipelineError(ValueError):
+    """管道配置不合法：节点名重复、依赖不存在或存在环"""
+
+
+class PipelineNode:
+    """管道中的一个节点"""
+
+    __slots__ = ("name", "module", "params", "depends_on", "working_directory", "env", "isolate", "input_files",
+                 "inputs")
+
+    def __init__(self, name: str, module: str, params: Dict[str, Any], depends_on: List[str],
+                 working_directory: Optional[str] = None, env: Optional[Dict[str, Optional[str]]] = None,
+                 isolate: bool = False, input_files: Optional[List[str]] = None,
+                 inputs: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.module = module
+        self.params = params
+        self.depends_on = depends_on
+        self.working_directory = working_directory
+        self.env = env or {}
+        self.isolate = isolate
+        self.input_files = input_files or []
+        self.inputs = inputs or {}
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "PipelineNode":
+        if "name" not in spec:
+            raise PipelineError(f"模块配置缺少 'name': {spec}")
+        name = spec["name"]
+        env = spec.get("env", {})
+        check_env(env, f"节点 '{name}' 的 env")
+        input_files = spec.get("input_files", [])
+        if isinstance(input_files, str):
+            input_files = [input_files]
+        if not isinstance(input_files, list) or not all(isinstance(p, str) for p in input_files):
+            raise PipelineError(f"节点 '{name}' 的 input_files 必须是路径列表")
+        inputs = spec.get("inputs", {})
+        if not isinstance(inputs, dict):
+            raise PipelineError(f"节点 '{name}' 的 inputs 必须是 {{参数名: 引用}} 形式的对象")
+        depends_on = list(spec.get("depends_on", []))
+        for ref in _input_refs(inputs):
+            try:
+                source, _ = parse_ref(ref)
+            except ValueError as e:
+                raise PipelineError(f"节点 '{name}' 的 {e}") from None
+            # 输入引用的节点自动成为依赖
+            if source not in depends_on:
+                depends_on.append(source)
+        return cls(name, spec.get("module_name", name), spec.get("params", {}), depends_on,
+                   working_directory=spec.get("working_directory"), env=env, isolate=bool(spec.get("isolate")),
+                   input_files=input_files, inputs=inputs)
+
+    @property
+    def overrides_environment(self) -> bool:
+        """是否单独指定了工作目录或环境变量"""
+        return bool(self.working_directory or self.env)
+
+    @property
+    def input_sources(self) -> List[str]:
+        """inputs 引用的上游节点（去重）"""
+        return list(dict.fromkeys(parse_ref(ref)[0] for ref in _input_refs(self.inputs)))
+
+    def payload(self, cwd: Optional[str] = None, env: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """传给执行器的可序列化描述"""
+        return {"name": self.name, "module": self.module, "params": self.params, "cwd": cwd, "env": env}
+
+
+def _input_refs(inputs: Dict[str, Any]) -> List[Any]:
+    """inputs 中的全部引用（值可以是单个引用或引用列表）"""
+    refs = []
+    for ref in inputs.values():
+        refs.extend(ref if isinstance(ref, list) else [ref])
+    return refs
+
+
+def check_env(env: Any, label: str):
+    """环境变量覆盖必须是 {名称: 字符串或 null}
+
+    Raises:
+        PipelineError: 格式不合法
+    """
+    if not isinstance(env, dict) or not all(isinstance(key, str) and (value is None or isinstance(value, str))
+                                            for key, value in env.items()):
+        raise PipelineError(f"{label} 必须是 {{变量名: 字符串或 null}} 形式的对象")
+
+
+def load_nodes(specs: List[Dict[str, Any]]) -> List[PipelineNode]:
+    """解析并检查管道节点
+
+    Raises:
+        PipelineError: 缺少 name、节点名重复、依赖不存在或依赖存在环
+    """
+    nodes = [PipelineNode.from_spec(spec) for spec in specs]
+    names = set()
+    for node in nodes:
+        if node.name in names:
+            raise PipelineError(f"节点名 '{node.name}' 重复")
+        names.add(node.name)
+    for node in nodes:
+        for dep in node.depends_on:
+            if dep not in names:
+                raise PipelineError(f"模块 '{node.name}' 的依赖 '{dep}' 不存在")
+    topological_order(nodes)
+    return nodes
+
+
+def topological_order(nodes: List[PipelineNode]) -> List[str]:
+    """按依赖关系排序节点名，同一层级保持配置中的顺序
+
+    Raises:
+        PipelineError: 依赖关系存在环
+    """
+    dependents: Dict[str, List[str]] = {node.name: [] for node in nodes}
+    in_degree = {node.name: len(node.depends_on) for node in nodes}
+    for node in nodes:
+        for dep in node.depends_on:
+            dependents[dep].append(node.name)
+
+    queue = deque(node.name for node in nodes if in_degree[node.name] == 0)
+    order = []
+    while queue:
+        current = queue.popleft()
+        order.append(current)
+        for dependent in dependents[current]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                queue.append(dependent)
+
+    if len(order) != len(nodes):
+        raise PipelineError("模块依赖关系存在环，无法确定执行顺序")
+    return order
+
+
+@contextmanager
+def node_environment(cwd: Optional[str], env: Optional[Dict[str, Optional[str]]]) -> Iterator[None]:
+    """在代码块内切换工作目录并覆盖环境变量，结束后恢复
+
+    工作目录和环境变量是进程级状态，只能在串行执行或独立进程中使用
+    """
+    original_cwd = os.getcwd() if cwd else None
+    saved = {key: os.environ.get(key) for key in env or {}}
+    try:
+        if cwd:
+            os.chdir(cwd)
+        for key, value in (env or {}).items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if original_cwd:
+            os.chdir(original_cwd)
+
+
+class _ResultRepr(reprlib.Repr):
+    """不可 JSON 序列化的返回值的简短表示：二进制数据只显示大小，容器和长字符串截断"""
+
+    def __init__(self):
+        super().__init__()
+        self.maxlist = self.maxtuple = self.maxdict = self.maxset = 20
+        self.maxstring = self.maxother = 200
+
+    def repr_bytes(self, value, level):
+        return f"<bytes {len(value)} bytes>"
+
+    def repr_bytearray(self, value, level):
+        return f"<bytearray {len(value)} bytes>"
+
+    def repr_memoryview(self, value, level):
+        return f"<memoryview {value.nbytes} bytes>"
+
+
+_RESULT_REPR = _ResultRepr()
+
+
+# 结果中原样记录的返回值上限（估算的 JSON 大小），更大的返回值只记录截断的 repr
+RESULT_RECORD_LIMIT = 64 * 1024
+
+
+def _result_record(value: Any) -> Any:
+    """结果中记录的返回值：能经 JSON 原样还原且不大时原样记录，否则记录截断的 repr
+
+    结果经管道回传并写入增量执行状态，大块数据只通过 value（共享内存）传递
+    """
+    return value if fits_json(value, RESULT_RECORD_LIMIT) else _RESULT_REPR.repr(value)
+
+
+def execute_node(node: Dict[str, Any], capture: bool = True) -> Dict[str, Any]:
+    """执行一个节点并返回结果；capture 为 True 时 stdout/stderr 被捕获到结果中"""
+    result = {
+        "name": node["name"],
+        "module": node["module"],
+        "ok": False,
+        "exit_code": 1,
+        "result": None,
+        "error": None,
+        "stdout": "",
+        "stderr": "",
+        "wall_ms": 0.0,
+    }
+    module_name = node["module"]
+    limit = _LIMITS.get(module_name)
+    # 资源统计在执行节点的线程 / 进程中测量，随结果交给父进程（见 gtools.stats）
+    meter = stats.ResourceMeter(node["name"], thread=node["stats"] == "thread") if node.get("stats") else None
+    start = time.perf_counter()
+    with (capture_output() if capture else nullcontext((None, None))) as (out, err):
+        if limit is not None:
+            limit.acquire()
+        if meter is not None:
+            meter.__enter__()
+        try:
+            if not validate_module(module_name):
+                result["error"] = f"模块 '{module_name}' 未注册或注册不完整"
+                return result
+            args = compile_module_args(module_name, node["params"], transport.load_inputs(node.get("inputs")))
+            with node_environment(node.get("cwd"), node.get("env")), \
+                    trace.span(f"node {node['name']}", "pipeline"), events.scope(module_name):
+                value = invoke(FUNCTION.get(module_name), args)
+            if node.get("publish"):
+                # 在子进程中执行时，较大的返回值经共享内存交给父进程
+                result["value"] = transport.share(value) if node.get("shared_memory") else value
+            # 已写入共享内存的返回值只记录摘要，不再经管道复制一份
+            shared = isinstance(result.get("value"), transport.SharedValue)
+            result["result"] = _RESULT_REPR.repr(value) if shared else _result_record(value)
+            if result["result"] is not value:
+                # 返回值只以 repr 记录，增量执行时无法还原给下游节点
+                result["replayable"] = False
+            result["ok"], result["exit_code"] = True, 0
+        except ConfigCompileError as e:
+            result["error"], result["exit_code"] = f"参数错误: {e}", 2
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            result["ok"], result["exit_code"] = code == 0, code
+            if code != 0:
+                result["error"] = f"模块退出，退出码 {code}"
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        finally:
+            if meter is not None:
+                meter.__exit__(None, None, None)
+                result["stats"] = dict(meter.stats, ok=result["ok"])
+            if limit is not None:
+                limit.release()
+            if node.get("inputs"):
+                args = value = None
+                transport.close_attached()
+            result["wall_ms"] = (time.perf_counter() - start) * 1000
+            if capture:
+                result["stdout"], result["stderr"] = out.getvalue(), err.getvalue()
+    return result
+
+
+def _mp_context():
+    """独立进程的启动方式：forkserver，不支持时使用 spawn
+
+    独立进程由线程池中的线程启动，在多线程进程中 fork 会继承其他线程持有的锁（如 stdout 缓冲区的锁）导致子进程死锁；
+    forkserver 从单线程的服务进程 fork，预先导入 gtools.pipeline，模块在子进程中按需导入
+    """
+    import multiprocessing
+
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["__main__", "gtools.pipeline"])
+    return context
+
+
+def _redirect_stdio(paths: List[str]):
+    """把文件描述符 1/2 重定向到文件，并重建 sys.stdout/sys.stderr 指向它们"""
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    for fd, path in zip((1, 2), paths):
+        target = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(target, fd)
+        os.close(target)
+    sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", errors="replace", closefd=False, buffering=1)
+    # 崩溃时的 Python 调用栈写入捕获的 stderr，随节点结果返回
+    import faulthandler
+
+    faulthandler.enable(file=sys.stderr)
+
+
+def _isolated_main(node: Dict[str, Any], conn, stdio_paths: Optional[List[str]]):
+    """隔离子进程入口：执行节点并通过管道回传结果"""
+    # 并发限制已由父进程获取
+    _LIMITS.clear()
+    if stdio_paths:
+        _redirect_stdio(stdio_paths)
+    module_name = node["module"]
+    if not FUNCTION.has(module_name) and node.get("import_path"):
+        # 导入父进程中注册该模块的 Python 模块（也适用于 functions 之外注册的模块）
+        try:
+            importlib.import_module(node["import_path"])
+        except ImportError:
+            pass
+    if not FUNCTION.has(module_name):
+        auto_import_module(module_name)
+    result = execute_node(node, capture=False)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    conn.send(result)
+    conn.close()
+
+
+def _describe_exit(exitcode: Optional[int]) -> str:
+    if exitcode is not None and exitcode < 0:
+        try:
+            name = signal.Signals(-exitcode).name
+        except ValueError:
+            name = f"信号 {-exitcode}"
+        return f"子进程被 {name} 终止"
+    return f"子进程异常退出，退出码 {exitcode}"
+
+
+def run_isolated(node: Dict[str, Any], capture: bool = True, limit=None) -> Dict[str, Any]:
+    """在新的子进程中执行节点；capture 为 True 时在文件描述符层面捕获 stdout/stderr
+
+    子进程崩溃时返回失败结果，不影响当前进程
+    """
+    context = _mp_context()
+    node = {**node, "import_path": FUNCTION.source_module(node["module"])}
+    start = time.perf_counter()
+    if limit is not None:
+        limit.acquire()
+    try:
+        with tempfile.TemporaryDirectory(prefix="gtools-node-") as tmp_dir:
+            stdio_paths = [os.path.join(tmp_dir, "stdout"), os.path.join(tmp_dir, "stderr")] if capture else None
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_isolated_main, args=(node, sender, stdio_paths),
+                                      name=f"gtools-node-{node['name']}")
+            process.start()
+            sender.close()
+            # 先读取结果再等待退出，避免结果较大时子进程阻塞在管道写入上
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = None
+            finally:
+                receiver.close()
+            process.join()
+            stdio = ["", ""]
+            for i, path in enumerate(stdio_paths or ()):
+                try:
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        stdio[i] = f.read()
+                except OSError:
+                    pass
+    finally:
+        if limit is not None:
+            limit.release()
+
+    if result is None:
+        result = {"name": node["name"], "module": node["module"], "ok": False, "exit_code": process.exitcode,
+                  "result": None, "error": _describe_exit(process.exitcode)}
+    if capture:
+        result["stdout"], result["stderr"] = stdio
+    else:
+        result.setdefault("stdout", "")
+        result.setdefault("stderr", "")
+    result["pid"] = process.pid
+    result["wall_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+class DagExecutor:
+    """按依赖关系并行执行管道节点
+
+    Usage:
+    ---
+    >>> executor = DagExecutor(max_workers=4, executor="thread", on_error="continue")
+    >>> results = executor.run(load_nodes(config["modules"]))
+    >>> print(executor.format_summary(results))
+    """
+
+    def __init__(self, max_workers: int = 1, executor: str = "thread", on_error: str = "fail-fast",
+                 working_directory: Optional[str] = None, env: Optional[Dict[str, Optional[str]]] = None,
+                 isolate: bool = False, planner=None):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"不支持的执行器: {executor}")
+        if on_error not in ON_ERROR_POLICIES:
+            raise ValueError(f"不支持的失败策略: {on_error}")
+        self.max_workers = max(1, max_workers)
+        self.executor = executor
+        self.on_error = on_error
+        self.working_directory = os.path.abspath(working_directory) if working_directory else None
+        self.env = env or {}
+        self.isolate = isolate
+        # 增量执行（gtools.incremental.IncrementalPlanner），None 表示总是执行全部节点
+        self.planner = planner
+        self.wall_ms = 0.0
+        self._isolation_pool = None
+        self._isolation_limits: Dict[str, Any] = {}
+
+    @property
+    def inline(self) -> bool:
+        """是否在主线程中依次执行（不捕获输出）"""
+        return self.max_workers == 1 and self.executor == "thread"
+
+    @property
+    def shared_process_state(self) -> bool:
+        """节点是否在当前进程的多个线程中并发执行（共享工作目录和环境变量）"""
+        return not self.inline and not self.isolate and self.executor == "thread"
+
+    def _environment(self, node: PipelineNode):
+        """节点实际使用的 (工作目录, 环境变量覆盖)"""
+        base = self.working_directory or os.getcwd()
+        cwd = os.path.join(base, node.working_directory) if node.working_directory else self.working_directory
+        return cwd, {**self.env, **node.env} or None
+
+    def _payload(self, node: PipelineNode) -> Dict[str, Any]:
+        """节点的执行描述：线程池中由整个管道统一切换目录，其他情况按节点切换"""
+        if self.shared_process_state and not node.isolate:
+            return node.payload()
+        cwd, env = self._environment(node)
+        return node.payload(cwd=cwd, env=env)
+
+    def _out_of_process(self, node: PipelineNode) -> bool:
+        """节点是否在子进程中执行（返回值需要跨进程传递）"""
+        return self.isolate or node.isolate or self.executor == "process"
+
+    def _create_pool(self, limits: Dict[str, Any]):
+        if self.inline:
+            return nullcontext()
+        if self.executor == "thread" or self.isolate:
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gtools-node")
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_process_worker,
+                                   initargs=(limits,))
+
+    def _submit(self, pool, node: PipelineNode, payload: Dict[str, Any], index: int, total: int,
+                reason: Optional[str] = None):
+        label = node.name if node.module == node.name else f"{node.name} ({node.module})"
+        isolated = self.isolate or node.isolate
+        explanation = f"\n  ↳ 执行原因: {reason}" if reason else ""
+        if self.inline:
+            print(f"\n[{index}/{total}] 执行模块: {label}" + ("（独立进程）" if isolated else "") + explanation)
+            if isolated:
+                return _completed(run_isolated(payload, capture=False))
+            return _completed(execute_node(payload, capture=False))
+        print(f"▶ [{index}/{total}] 启动节点: {label}" + ("（独立进程）" if isolated else "") + explanation)
+        if isolated:
+            # 独立进程由线程池中的线程启动并等待
+            executor = pool if self.isolate else self._isolation_pool
+            return executor.submit(run_isolated, payload, True, self._isolation_limits.get(node.module))
+        return pool.submit(execute_node, payload)
+
+    def _report(self, result: Dict[str, Any]):
+        """打印节点结果；并行执行时连同捕获的输出整块打印"""
+        if not self.inline:
+            status = "✓" if result["ok"] else "✗"
+            print(f"\n── {status} {result['name']}（{result['wall_ms']:.1f}ms）──")
+            if result["stdout"]:
+                print(result["stdout"], end="" if result["stdout"].endswith("\n") else "\n")
+            if result["stderr"]:
+                print(result["stderr"], end="" if result["stderr"].endswith("\n") else "\n")
+        if result["ok"]:
+            print(f"模块 '{result['name']}' 执行完成")
+        else:
+            print(f"❌ 模块 '{result['name']}' 执行失败: {result['error']}")
+
+    def run(self, nodes: List[PipelineNode]) -> List[Dict[str, Any]]:
+        """执行全部节点，返回按拓扑顺序排列的结果
+
+        status 为 ok / failed；未执行的节点为 skipped；增量执行时指纹未变化的节点为 up-to-date（视为成功）
+        """
+        order = topological_order(nodes)
+        by_name = {node.name: node for node in nodes}
+        dependents: Dict[str, List[str]] = {node.name: [] for node in nodes}
+        waiting = {node.name: len(node.depends_on) for node in nodes}
+        for node in nodes:
+            for dep in node.depends_on:
+                dependents[dep].append(node.name)
+        # 只有被下游 inputs 引用的节点才保留返回值，最后一个引用它的节点结束后释放
+        store = ArtifactStore()
+        consumers = {node.name: 0 for node in nodes}
+        for node in nodes:
+            for source in node.input_sources:
+                consumers[source] += 1
+
+        # 就绪节点按拓扑顺序启动
+        rank = {name: i for i, name in enumerate(order)}
+        ready = sorted((name for name, count in waiting.items() if count == 0), key=rank.get)
+        results: Dict[str, Dict[str, Any]] = {}
+        running = {}
+        stopped = False
+        launched = 0
+        if self.shared_process_state:
+            shared = [node.name for node in nodes if node.overrides_environment and not node.isolate]
+            if shared:
+                raise PipelineError(f"节点 {', '.join(shared)} 单独指定了 working_directory/env，"
+                                    "线程池中的节点共享工作目录和环境变量，请使用 --isolate 或 --executor process")
+        limits = build_limits(self.executor, self.max_workers) if not (self.inline or self.isolate) else {}
+        if not self.inline and (self.isolate or any(node.isolate for node in nodes)):
+            self._isolation_limits = build_limits("process", self.max_workers)
+            if not self.isolate:
+                self._isolation_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                          thread_name_prefix="gtools-isolate")
+        if any(consumers[node.name] and self._out_of_process(node) for node in nodes):
+            # 子进程创建的共享内存登记到父进程的 resource_tracker，须在启动子进程前运行
+            transport.prepare()
+        start = time.perf_counter()
+
+        if self.executor == "thread" and not self.isolate:
+            _LIMITS.clear()
+            _LIMITS.update(limits)
+        shared_environment = node_environment(self.working_directory, self.env) \
+            if self.shared_process_state else nullcontext()
+
+        def finish(name: str, result: Dict[str, Any]):
+            nonlocal stopped
+            value = result.pop("value", None)
+            record = result.pop("stats", None)
+            if record is not None:
+                stats.add(record)
+            results[name] = result
+            if self.planner is not None:
+                self.planner.record(result)
+            for source in by_name[name].input_sources:
+                store.release(source)
+            if not result["ok"]:
+                stopped = stopped or self.on_error == "fail-fast"
+                return
+            store.publish(name, value, consumers[name])
+            for dependent in dependents[name]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+            ready.sort(key=rank.get)
+
+        try:
+            with shared_environment, self._create_pool(limits) as pool:
+                while (ready and not stopped) or running:
+                    while ready and not stopped and len(running) < self.max_workers:
+                        name = ready.pop(0)
+                        node = by_name[name]
+                        payload = self._payload(node)
+                        offset = (time.perf_counter() - start) * 1000
+                        reason = None
+                        if self.planner is not None:
+                            # 输入文件在节点启动前才计算指纹，上游刚写出的文件也会被识别
+                            run_node, reason = self.planner.plan(node, *self._environment(node), results,
+                                                                 publish=consumers[name] > 0)
+                            if not run_node:
+                                print(f"⏭ 跳过未变化的节点: {name}"
+                                      + (f"（{reason}）" if self.planner.explain else ""))
+                                # 被下游引用的节点只在上次结果能经 JSON 原样还原（replayable）时跳过，
+                                # 否则 plan() 要求重新执行，下游不会收到有损还原的值
+                                previous = self.planner.previous_result(name)
+                                finish(name, {"name": name, "module": node.module, "ok": True,
+                                              "status": "up-to-date", "exit_code": 0, "result": previous,
+                                              "value": previous, "error": None, "stdout": "", "stderr": "",
+                                              "wall_ms": 0.0, "start_ms": offset})
+                                continue
+                            reason = reason if self.planner.explain else None
+                        try:
+                            # 同一进程中（串行 / 线程池）注入的是上游返回的同一个对象
+                            payload["inputs"] = {dest: [store.resolve(r) for r in ref] if isinstance(ref, list)
+                                                 else store.resolve(ref) for dest, ref in node.inputs.items()}
+                        except KeyError as e:
+                            result = {"name": name, "module": node.module, "ok": False, "status": "failed",
+                                      "exit_code": 1, "result": None, "error": f"输入不可用: {e.args[0]}",
+                                      "stdout": "", "stderr": "", "wall_ms": 0.0, "start_ms": offset}
+                            self._report(result)
+                            finish(name, result)
+                            continue
+                        if stats.enabled():
+                            # 线程池中并发执行的节点按线程统计
+                            in_thread = not self.inline and not self._out_of_process(node)
+                            payload["stats"] = "thread" if in_thread else "process"
+                        payload["publish"] = consumers[name] > 0
+                        payload["shared_memory"] = payload["publish"] and self._out_of_process(node)
+                        launched += 1
+                        running[self._submit(pool, node, payload, launched, len(nodes), reason)] = (name, offset)
+                    if not running:
+                        continue
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in sorted(done, key=lambda f: rank[running[f][0]]):
+                        name, offset = running.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            # 工作进程崩溃等执行器层面的失败
+                            result = {"name": name, "module": by_name[name].module, "ok": False, "exit_code": 1,
+                                      "result": None, "error": f"{type(e).__name__}: {e}", "stdout": "",
+                                      "stderr": "", "wall_ms": (time.perf_counter() - start) * 1000 - offset}
+                        result["status"] = "ok" if result["ok"] else "failed"
+                        result["start_ms"] = offset
+                        self._report(result)
+                        finish(name, result)
+        finally:
+            if self.planner is not None:
+                try:
+                    self.planner.save()
+                except OSError as e:
+                    print(f"警告: 无法保存增量执行状态: {e}", file=sys.stderr)
+            if self.executor == "thread" and not self.isolate:
+                _LIMITS.clear()
+            if self._isolation_pool is not None:
+                self._isolation_pool.shutdown()
+                self._isolation_pool = None
+            store.clear()
+            transport.close_attached()
+        self.wall_ms = (time.perf_counter() - start) * 1000
+
+        ordered = []
+        for name in order:
+            if name not in results:
+                # 拓扑顺序保证依赖节点已有结果（执行过或已标记为跳过）
+                blocked = [dep for dep in by_name[name].depends_on if not results[dep]["ok"]]
+                reason = f"依赖未成功: {', '.join(blocked)}" if blocked else "fail-fast: 已停止启动新节点"
+                results[name] = {"name": name, "module": by_name[name].module, "ok": False, "status": "skipped",
+                                 "exit_code": None, "result": None, "error": reason, "stdout": "", "stderr": "",
+                                 "wall_ms": 0.0, "start_ms": None}
+            ordered.append(results[name])
+        return ordered
+
+    def format_summary(self, results: List[Dict[str, Any]]) -> str:
+        """每个节点的状态、启动时间与耗时，以及总墙钟时间与并行加速比"""
+        columns = [("节点", 24), ("模块", 16), ("状态", 8), ("启动(ms)", 10), ("耗时(ms)", 10)]
+
+        def cell(text: str, width: int, left: bool) -> str:
+            if display_width(text) > width:
+                text = text[:width - 1] + "…"
+            padding = " " * max(0, width - display_width(text))
+            return text + padding if left else padding + text
+
+        def row(cells: List[str]) -> str:
+            return " ".join(cell(text, width, i < 3) for i, (text, (_, width)) in enumerate(zip(cells, columns)))
+
+        header = row([name for name, _ in columns])
+        lines = ["⏱️ 节点耗时", header, "-" * display_width(header)]
+        status_text = {"ok": "✓ 完成", "up-to-date": "= 未变化", "failed": "✗ 失败", "skipped": "- 跳过"}
+        for r in results:
+            lines.append(row([r["name"], r["module"], status_text[r["status"]],
+                              "" if r["start_ms"] is None else f"{r['start_ms']:.1f}",
+                              f"{r['wall_ms']:.1f}" if r["status"] in ("ok", "failed") else ""]))
+        node_ms = sum(r["wall_ms"] for r in results)
+        counts = {status: sum(1 for r in results if r["status"] == status) for status in status_text}
+        speedup = f"，并行加速 {node_ms / self.wall_ms:.2f}x" if self.wall_ms > 0 and not self.inline else ""
+        lines.append(f"总墙钟 {self.wall_ms:.1f}ms，节点耗时合计 {node_ms:.1f}ms{speedup}；"
+                     f"完成 {counts['ok']}，失败 {counts['failed']}，跳过 {counts['skipped']}"
+                     + (f"，未变化 {counts['up-to-date']}" if counts["up-to-date"] else ""))
+        for r in results:
+            if r["status"] == "skipped":
+                lines.append(f"  跳过 {r['name']}: {r['error']}")
+        return "\n".join(lines)
@@ -8,8 +8,68 @@ import sys
 import subprocess
 import importlib
 import argparse
+import threading
+import traceback
+import types
 from typing import Dict, Callable, Any, Optional, List
 
+from . import trace
+from .manifest import (
+    get_manifest,
+    get_module_index,
+    get_module_files,
+    lookup_module,
+    module_import_path,
+    has_default_config as _has_default_config,
+)
+
+
+class LazyEntry:
+    """延迟加载的注册项：记录模块路径和属性名，首次 get() 时才导入模块"""
+    
+    def __init__(self, import_path: str, attr: Optional[str] = None):
+        self.import_path = import_path
+        self.attr = attr
+    
+    def __repr__(self) -> str:
+        return f"LazyEntry({self.import_path!r}, {self.attr!r})"
+
+
+# 注册时可声明的执行特性及默认值
+# - pure: 输出只取决于参数，可缓存结果
+# - thread_safe: 可以在同一进程的多个线程中并发执行
+# - io_bound / cpu_bound: 负载类型，决定使用线程池还是进程池
+# - est_memory_mb: 单次执行的预估内存（MB）
+# - max_parallel: 同时运行的最大实例数（1 表示单实例）
+CAPABILITY_DEFAULTS: Dict[str, Any] = {
+    "pure": False,
+    "thread_safe": False,
+    "io_bound": False,
+    "cpu_bound": False,
+    "est_memory_mb": None,
+    "max_parallel": None,
+}
+
+
+def validate_capabilities(module_name: str, capabilities: Dict[str, Any]) -> Dict[str, Any]:
+    """校验执行特性声明，返回声明的特性（不含默认值）"""
+    unknown = set(capabilities) - set(CAPABILITY_DEFAULTS)
+    if unknown:
+        raise ValueError(f"模块 '{module_name}' 声明了未知的执行特性: {', '.join(sorted(unknown))}")
+    for key in ("pure", "thread_safe", "io_bound", "cpu_bound"):
+        if key in capabilities and not isinstance(capabilities[key], bool):
+            raise ValueError(f"模块 '{module_name}' 的执行特性 {key} 必须是布尔值")
+    if capabilities.get("io_bound") and capabilities.get("cpu_bound"):
+        raise ValueError(f"模块 '{module_name}' 不能同时声明 io_bound 和 cpu_bound")
+    memory = capabilities.get("est_memory_mb")
+    if memory is not None and (isinstance(memory, bool) or not isinstance(memory, (int, float)) or memory < 0):
+        raise ValueError(f"模块 '{module_name}' 的执行特性 est_memory_mb 必须是非负数")
+    max_parallel = capabilities.get("max_parallel")
+    if max_parallel is not None and (isinstance(max_parallel, bool) or not isinstance(max_parallel, int)
+                                     or max_parallel < 1):
+        raise ValueError(f"模块 '{module_name}' 的执行特性 max_parallel 必须是正整数")
+    return dict(capabilities)
+
 
 class Registry:
     """通用注册器类"""
@@ -17,19 +77,99 @@ class Registry:
     def __init__(self, name: str):
         self.name = name
         self._registry: Dict[str, Any] = {}
+        # module_name -> 注册时声明的执行特性
+        self._capabilities: Dict[str, Dict[str, Any]] = {}
+        
+    def regist(self, module_name: str, **capabilities):
+        """装饰器：注册函数到指定模块名下
+        
+        可同时声明执行特性，例如：
+        @FUNCTION.regist(module_name="calculator", pure=True, thread_safe=True)
+        """
+        declared = validate_capabilities(module_name, capabilities)
         
-    def regist(self, module_name: str):
-        """装饰器：注册函数到指定模块名下"""
         def decorator(func: Callable):
-            if module_name in self._registry:
+            existing = self._registry.get(module_name)
+            if existing is not None and not isinstance(existing, LazyEntry):
                 print(f"Warning: {module_name} already registered in {self.name}, overwriting...")
             self._registry[module_name] = func
+            self._capabilities[module_name] = declared
             return func
         return decorator
     
+    def regist_lazy(self, module_name: str, import_path: str, attr: Optional[str] = None,
+                    capabilities: Optional[Dict[str, Any]] = None):
+        """注册延迟加载项，已有真实注册时不覆盖；capabilities 为静态清单中提取的执行特性"""
+        existing = self._registry.get(module_name)
+        if existing is not None and not isinstance(existing, LazyEntry):
+            return
+        self._registry[module_name] = LazyEntry(import_path, attr)
+        self._capabilities[module_name] = dict(capabilities or {})
+    
+    def get_capabilities(self, module_name: str) -> Dict[str, Any]:
+        """获取模块的执行特性（未声明的项取默认值）"""
+        capabilities = dict(CAPABILITY_DEFAULTS)
+        capabilities.update(self._capabilities.get(module_name, {}))
+        return capabilities
+    
+    def declared_capabilities(self, module_name: str) -> Dict[str, Any]:
+        """获取模块显式声明的执行特性"""
+        return dict(self._capabilities.get(module_name, {}))
+    
+    def _resolve(self, module_name: str, entry: LazyEntry) -> Optional[Any]:
+        """导入延迟项所在模块；导入过程中的装饰器会用真实对象替换占位项"""
+        try:
+            with trace.span(f"import {entry.import_path}", "import"):
+                module = importlib.import_module(entry.import_path)
+        except ImportError as e:
+            print(f"Warning: Failed to import {entry.import_path}: {e}")
+            if self._registry.get(module_name) is entry:
+                del self._registry[module_name]
+                self._capabilities.pop(module_name, None)
+            return None
+        
+        resolved = self._registry.get(module_name)
+        if isinstance(resolved, LazyEntry):
+            # 模块未通过装饰器注册该名称时，退回到按属性名获取
+            resolved = getattr(module, entry.attr, None) if entry.attr else None
+            if resolved is None:
+                del self._registry[module_name]
+                self._capabilities.pop(module_name, None)
+            else:
+                self._registry[module_name] = resolved
+        return resolved
+    
     def get(self, module_name: str) -> Optional[Any]:
-        """获取注册的函数"""
-        return self._registry.get(module_name)
+        """获取注册的函数，延迟项在首次获取时解析"""
+        entry = self._registry.get(module_name)
+        if isinstance(entry, LazyEntry):
+            return self._resolve(module_name, entry)
+        return entry
+    
+    def unregist_module(self, import_path: str) -> Dict[str, Any]:
+        """移除由指定 Python 模块注册的所有条目，返回被移除的条目（用于重新加载）"""
+        removed = {}
+        for module_name in list(self._registry):
+            if self.source_module(module_name) == import_path:
+                removed[module_name] = self._registry.pop(module_name)
+                self._capabilities.pop(module_name, None)
+        return removed
+
+    def peek(self, module_name: str) -> Optional[Any]:
+        """获取已解析的注册对象，延迟项返回 None（不导入模块）"""
+        entry = self._registry.get(module_name)
+        return None if isinstance(entry, LazyEntry) else entry
+
+    def source_module(self, module_name: str) -> Optional[str]:
+        """注册该名称的 Python 模块（不解析延迟项）"""
+        entry = self._registry.get(module_name)
+        if isinstance(entry, LazyEntry):
+            return entry.import_path
+        return getattr(entry, "__module__", None)
+
+    def is_lazy(self, module_name: str) -> bool:
+        """检查模块是否为尚未解析的延迟项"""
+        return isinstance(self._registry.get(module_name), LazyEntry)
     
     def list_modules(self) -> list:
         """列出所有已注册的模块名"""
@@ -50,7 +190,8 @@ class ConfigHandler:
             return {}
         
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
+            with trace.span("load config", "config", path=config_file), \
+                    open(config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except (json.JSONDecodeError, IOError) as e:
             print(f"Warning: Failed to load config file {config_file}: {e}")
@@ -74,26 +215,413 @@ class ConfigHandler:
         return merged_args
 
 
-def auto_import_functions_modules():
-    """自动导入 functions 目录下的功能模块"""
+class ActionSpec:
+    """参数解析器中单个参数的预计算信息"""
+    
+    __slots__ = ("dest", "option_string", "is_flag", "nargs", "type", "action")
+    
+    def __init__(self, action: argparse.Action):
+        self.action = action
+        self.dest = action.dest
+        # 位置参数没有选项字符串
+        self.option_string = action.option_strings[0] if action.option_strings else None
+        self.is_flag = isinstance(action, argparse._StoreTrueAction)
+        self.nargs = action.nargs
+        self.type = action.type
+
+
+class ConfigCompileError(ValueError):
+    """配置值无法转换为模块参数时抛出（类型、choices、nargs 或必填校验失败）"""
+
+
+def _action_display_name(action: argparse.Action) -> str:
+    """与 argparse 报错信息一致的参数名"""
+    if action.option_strings:
+        return "/".join(action.option_strings)
+    return action.metavar if isinstance(action.metavar, str) else action.dest
+
+
+def _convert_value(action: argparse.Action, value: Any) -> Any:
+    """对单个 JSON 值应用参数的类型转换器和 choices 校验"""
+    converter = action.type
+    if value is not None and converter is not None:
+        if converter is int and isinstance(value, float) and not value.is_integer():
+            raise ConfigCompileError(f"argument {_action_display_name(action)}: invalid int value: {value!r}")
+        try:
+            # JSON 值已经带类型，先直接转换；失败时按命令行字符串的语义再试一次
+            value = converter(value)
+        except (TypeError, ValueError, argparse.ArgumentTypeError):
+            try:
+                value = converter(str(value))
+            except (TypeError, ValueError, argparse.ArgumentTypeError):
+                type_name = getattr(converter, "__name__", repr(converter))
+                raise ConfigCompileError(
+                    f"argument {_action_display_name(action)}: invalid {type_name} value: {value!r}"
+                )
+    
+    if action.choices is not None and value is not None and value not in action.choices:
+        choices = ", ".join(map(repr, action.choices))
+        raise ConfigCompileError(
+            f"argument {_action_display_name(action)}: invalid choice: {value!r} (choose from {choices})"
+        )
+    return value
+
+
+def _compile_action_value(action: argparse.Action, value: Any) -> Any:
+    """按参数的 action 类型和 nargs 把 JSON 值转换为 Namespace 中的值"""
+    if isinstance(action, (argparse._StoreTrueAction, argparse._StoreFalseAction)):
+        return bool(value)
+    if isinstance(action, argparse._StoreConstAction):
+        return value
+    if isinstance(action, argparse._CountAction):
+        return int(value)
+    
+    values = value if isinstance(value, (list, tuple)) else [value]
+    if isinstance(action, argparse._AppendAction) or action.nargs in ('+', '*') \
+            or isinstance(action.nargs, int):
+        converted = [_convert_value(action, item) for item in values]
+        if action.nargs == '+' and not converted:
+            raise ConfigCompileError(f"argument {_action_display_name(action)}: expected at least one argument")
+        if isinstance(action.nargs, int) and len(converted) != action.nargs:
+            raise ConfigCompileError(
+                f"argument {_action_display_name(action)}: expected {action.nargs} arguments"
+            )
+        return converted
+    
+    if isinstance(value, (list, tuple)):
+        if len(value) != 1:
+            raise ConfigCompileError(f"argument {_action_display_name(action)}: expected one argument")
+        value = value[0]
+    return _convert_value(action, value)
+
+
+def compile_namespace(parser: argparse.ArgumentParser, config: Dict[str, Any],
+                      index: Optional[Dict[str, "ActionSpec"]] = None,
+                      values: Optional[Dict[str, Any]] = None) -> argparse.Namespace:
+    """直接把 JSON 配置编译为 argparse.Namespace，不经过字符串 argv
+    
+    与 parse_args 语义保持一致：应用默认值（字符串默认值同样经过类型转换）、
+    类型转换器、choices、nargs 以及必填校验；未知的配置键被忽略。
+    _positional_args 中的键按 dest 匹配位置参数，匹配不到的按顺序填充剩余位置参数。
+    values 中的对象按 dest 原样放入 Namespace（不做类型转换和校验），覆盖配置中的同名参数。
+    
+    Raises:
+        ConfigCompileError: 配置值不合法
+    """
+    if index is None:
+        index = {}
+        for action in parser._actions:
+            if action.dest != 'help' and action.dest not in index:
+                index[action.dest] = ActionSpec(action)
+    
+    namespace = argparse.Namespace()
+    for action in parser._actions:
+        if action.dest in ('help', argparse.SUPPRESS) or action.default is argparse.SUPPRESS:
+            continue
+        default = action.default
+        if isinstance(default, str) and action.type is not None:
+            default = _convert_value(action, default)
+        setattr(namespace, action.dest, default)
+    for dest, default in parser._defaults.items():
+        setattr(namespace, dest, default)
+    
+    provided = set()
+    
+    # 位置参数：先按 dest 匹配，剩余值按顺序填充
+    positional_actions = [spec.action for spec in index.values() if spec.option_string is None]
+    unmatched = []
+    for key, value in config.get('_positional_args', {}).items():
+        spec = index.get(key)
+        if spec is not None and spec.option_string is None:
+            setattr(namespace, key, _compile_action_value(spec.action, value))
+            provided.add(key)
+        else:
+            unmatched.append(value)
+    for action in positional_actions:
+        if not unmatched:
+            break
+        if action.dest not in provided:
+            setattr(namespace, action.dest, _compile_action_value(action, unmatched.pop(0)))
+            provided.add(action.dest)
+    
+    # 可选参数：None 视为未提供，保留默认值
+    for key, value in config.items():
+        if key == '_positional_args' or value is None:
+            continue
+        spec = index.get(key)
+        if spec is None or spec.option_string is None:
+            continue
+        setattr(namespace, key, _compile_action_value(spec.action, value))
+        provided.add(key)
+    
+    for key, value in (values or {}).items():
+        if key not in index:
+            raise ConfigCompileError(f"未知参数: {key}")
+        setattr(namespace, key, value)
+        provided.add(key)
+    
+    # 必填校验
+    missing = []
+    for spec in index.values():
+        action = spec.action
+        if spec.dest in provided:
+            continue
+        if action.required or (spec.option_string is None and action.nargs not in ('?', '*')):
+            missing.append(_action_display_name(action))
+    if missing:
+        raise ConfigCompileError(f"the following arguments are required: {', '.join(missing)}")
+    
+    return namespace
+
+
+def supports_direct_compile(parser: argparse.ArgumentParser) -> bool:
+    """解析器是否可以直接编译（含子命令或 REMAINDER 参数时仍需走 argv 解析）"""
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction) \
+                or action.nargs in (argparse.REMAINDER, argparse.PARSER):
+            return False
+    return True
+
+
+class ParserCache:
+    """模块参数解析器缓存
+    
+    每个模块的解析器只构建一次，并预先计算 dest -> ActionSpec 映射，
+    注册的解析器工厂函数变化（例如模块被重新加载）时自动重建
+    """
+    
+    def __init__(self, registry: "Registry"):
+        self.registry = registry
+        # module_name -> (工厂函数, 解析器, dest 索引)
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def _entry(self, module_name: str) -> Optional[tuple]:
+        factory = self.registry.get(module_name)
+        if factory is None:
+            return None
+        cached = self._cache.get(module_name)
+        if cached is not None and cached[0] is factory:
+            return cached
+        with self._lock:
+            cached = self._cache.get(module_name)
+            if cached is not None and cached[0] is factory:
+                return cached
+            with trace.span(f"build parser {module_name}", "parser"):
+                parser = factory()
+            index: Dict[str, ActionSpec] = {}
+            for action in parser._actions:
+                if action.dest == 'help' or action.dest in index:
+                    continue
+                index[action.dest] = ActionSpec(action)
+            cached = (factory, parser, index)
+            self._cache[module_name] = cached
+            return cached
+    
+    def get_parser(self, module_name: str) -> Optional[argparse.ArgumentParser]:
+        """获取模块的解析器（缓存）"""
+        entry = self._entry(module_name)
+        return entry[1] if entry else None
+    
+    def get_action_index(self, module_name: str) -> Dict[str, ActionSpec]:
+        """获取模块的 dest -> ActionSpec 映射（缓存）"""
+        entry = self._entry(module_name)
+        return entry[2] if entry else {}
+    
+    @trace.traced("synthesize args", "args")
+    def build_synthetic_args(self, module_name: str, config: Dict[str, Any]) -> List[str]:
+        """把配置字典转换为命令行参数列表
+        
+        _positional_args 中的值按顺序作为位置参数，其余键通过 dest 索引找到对应的选项
+        """
+        index = self.get_action_index(module_name)
+        synthetic_args = []
+        
+        # 处理位置参数
+        positional_config = config.get('_positional_args', {})
+        for param_name, param_value in positional_config.items():
+            if isinstance(param_value, list):
+                synthetic_args.extend(map(str, param_value))
+            else:
+                synthetic_args.append(str(param_value))
+        
+        # 处理可选参数
+        for key, value in config.items():
+            if key == '_positional_args':
+                continue
+            spec = index.get(key)
+            if spec is None or spec.option_string is None:
+                continue
+            if spec.is_flag:
+                if value:
+                    synthetic_args.append(spec.option_string)
+            else:
+                synthetic_args.extend([spec.option_string, str(value)])
+        
+        return synthetic_args
+    
+    def compile_namespace(self, module_name: str, config: Dict[str, Any],
+                          values: Optional[Dict[str, Any]] = None) -> argparse.Namespace:
+        """把模块配置字典编译为 Namespace，values 中的对象原样放入（见 compile_namespace）
+        
+        解析器不支持直接编译时退回到合成 argv 并调用 parse_args
+        
+        Raises:
+            ConfigCompileError: 配置值不合法
+        """
+        entry = self._entry(module_name)
+        if entry is None:
+            raise ConfigCompileError(f"模块 '{module_name}' 缺少参数解析器")
+        _, parser, index = entry
+        with trace.span(f"compile args {module_name}", "args"):
+            if supports_direct_compile(parser):
+                return compile_namespace(parser, config, index, values)
+            namespace = parser.parse_args(self.build_synthetic_args(module_name, config))
+            for key, value in (values or {}).items():
+                setattr(namespace, key, value)
+            return namespace
+    
+    def clear(self, module_name: Optional[str] = None):
+        """清除缓存"""
+        with self._lock:
+            if module_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(module_name, None)
+
+
+def import_functions_module(item: str) -> bool:
+    """导入 functions/<item>/main.py（item 可以是 vision/mark_imgs 这样的嵌套路径），返回是否成功"""
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    
+    module_name = module_import_path(item)
+    try:
+        with trace.span(f"import {module_name}", "import"):
+            importlib.import_module(module_name)
+        return True
+    except ImportError as e:
+        print(f"Warning: Failed to import {module_name}: {e}")
+        return False
+
+
+def reload_functions_module(import_path: str) -> bool:
+    """重新加载已导入的功能模块（main.py 修改后），失败时恢复原注册项，返回是否成功"""
+    capabilities = {registry.name: {name: registry.declared_capabilities(name)
+                                    for name in registry.list_modules()}
+                    for registry in (FUNCTION, ARGS)}
+    removed = [(FUNCTION, FUNCTION.unregist_module(import_path)),
+               (ARGS, ARGS.unregist_module(import_path))]
+    try:
+        importlib.reload(sys.modules[import_path])
+        return True
+    except Exception:
+        print(f"警告: 重新加载 {import_path} 失败，继续使用旧版本")
+        traceback.print_exc()
+        for registry, entries in removed:
+            for module_name, entry in entries.items():
+                if not registry.has(module_name):
+                    registry.regist(module_name, **capabilities[registry.name][module_name])(entry)
+        return False
+
+
+def auto_import_functions_modules(lazy: bool = True, profiler: Optional[Any] = None):
+    """自动导入 functions 目录下的功能模块
+    
+    lazy 为 True 时只根据静态清单注册延迟项，模块在首次 get() 时才导入；
+    无法静态确定注册名的功能包仍会立即导入。
+    profiler 为 ImportProfiler 实例时，立即导入全部模块并记录每个模块的导入耗时
+    """
     base_dir = os.path.dirname(os.path.dirname(__file__))
     functions_dir = os.path.join(base_dir, "functions")
     
     if not os.path.exists(functions_dir):
         return
     
-    sys.path.insert(0, base_dir)
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
     
-    for item in os.listdir(functions_dir):
-        item_path = os.path.join(functions_dir, item)
-        if os.path.isdir(item_path) and not item.startswith('_'):
-            module_file = os.path.join(item_path, "main.py")
-            if os.path.exists(module_file):
-                try:
-                    module_name = f"functions.{item}.main"
-                    importlib.import_module(module_name)
-                except ImportError as e:
-                    print(f"Warning: Failed to import {module_name}: {e}")
+    if lazy and profiler is None:
+        manifest = get_manifest()
+        for item, entry in manifest.entries.items():
+            _regist_lazy_entry(item, entry)
+        _import_dynamic_modules(manifest.dynamic_items())
+        return
+    
+    for item in get_module_index().items_with_main():
+        if profiler is None:
+            import_functions_module(item)
+        else:
+            with profiler.track(module_import_path(item)) as record:
+                record["ok"] = import_functions_module(item)
+
+
+def auto_import_module(module_name: str):
+    """只为注册了 module_name 的功能包注册延迟项
+    
+    单模块调用的快速路径：命中清单缓存时只读取名称索引和一个分片，
+    耗时与 functions 下的功能包数量无关；未命中时退回到 auto_import_functions_modules
+    """
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    
+    found = lookup_module(module_name)
+    if found is None:
+        auto_import_functions_modules()
+        return
+    item, entry, dynamic_items = found
+    _regist_lazy_entry(item, entry)
+    _import_dynamic_modules(dynamic_items)
+
+
+def _regist_lazy_entry(item: str, entry: Dict[str, Any]):
+    """按清单条目注册延迟项（无法静态确定注册名的功能包跳过）"""
+    if entry.get("dynamic"):
+        return
+    import_path = module_import_path(item)
+    capabilities = entry.get("capabilities", {})
+    for module_name, attr in entry.get("FUNCTION", {}).items():
+        FUNCTION.regist_lazy(module_name, import_path, attr, capabilities.get(module_name))
+    for module_name, attr in entry.get("ARGS", {}).items():
+        ARGS.regist_lazy(module_name, import_path, attr)
+
+
+_DYNAMIC_IMPORTED = set()
+
+
+def _import_dynamic_modules(items: Optional[List[str]] = None):
+    """导入清单中无法静态确定注册名的功能包（每个包只尝试一次）"""
+    if items is None:
+        items = get_manifest().dynamic_items()
+    for item in items:
+        if item not in _DYNAMIC_IMPORTED:
+            _DYNAMIC_IMPORTED.add(item)
+            import_functions_module(item)
+
+
+def is_registered(registry: "Registry", module_name: str) -> bool:
+    """检查模块是否已注册：优先查询已导入的注册器，其次查询静态清单"""
+    if registry.has(module_name):
+        return True
+    found = lookup_module(module_name)
+    if found is not None and module_name in found[1].get(registry.name, {}):
+        return True
+    _import_dynamic_modules()
+    return registry.has(module_name)
+
+
+def load_module(module_name: str) -> bool:
+    """按需导入注册了 module_name 的功能包，返回模块是否已注册"""
+    if FUNCTION.has(module_name) or ARGS.has(module_name):
+        return True
+    found = lookup_module(module_name)
+    if found is not None:
+        import_functions_module(found[0])
+    else:
+        _import_dynamic_modules()
+    return FUNCTION.has(module_name) or ARGS.has(module_name)
 
 
 def get_project_root() -> str:
@@ -105,78 +633,72 @@ def get_module_skill_md_path(module_name: str) -> Optional[str]:
     """获取指定模块的 skill.md 文件路径，如果不存在则返回 None
     支持 skill.md 和 SKILL.md 两种命名
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    functions_dir = os.path.join(base_dir, "functions")
-    module_dir = os.path.join(functions_dir, module_name)
-    
-    # 优先检查 skill.md（小写）
-    skill_md_path = os.path.join(module_dir, "skill.md")
-    if os.path.exists(skill_md_path):
-        return skill_md_path
-    
-    # 备用检查 SKILL.md（大写）
-    skill_md_path_upper = os.path.join(module_dir, "SKILL.md")
-    if os.path.exists(skill_md_path_upper):
-        return skill_md_path_upper
-    
-    return None
+    files = get_module_files(module_name)
+    return files.skill_md if files else None
 
 
-def get_module_info(module_name: str) -> Dict[str, Any]:
-    """获取模块的完整信息"""
+def get_module_info(module_name: str, load: bool = True) -> Dict[str, Any]:
+    """获取模块的完整信息
+    
+    load 为 False 时只查询静态清单，不导入模块（尚未解析的 function / args_parser 为 None）
+    """
+    if load:
+        load_module(module_name)
     info = {
         "module_name": module_name,
-        "has_function": FUNCTION.has(module_name),
-        "has_args": ARGS.has(module_name),
-        "function": FUNCTION.get(module_name),
-        "args_parser": ARGS.get(module_name),
+        "has_function": is_registered(FUNCTION, module_name),
+        "has_args": is_registered(ARGS, module_name),
+        # 常驻服务等场景中可能已注册延迟项，get() 会导入模块
+        "function": FUNCTION.get(module_name) if load else FUNCTION.peek(module_name),
+        "args_parser": ARGS.get(module_name) if load else ARGS.peek(module_name),
         "has_start_sh": get_module_start_sh_path(module_name) is not None,
         "has_skill_md": get_module_skill_md_path(module_name) is not None,
+        "capabilities": get_module_capabilities(module_name),
     }
     return info
 
 
+def get_module_capabilities(module_name: str) -> Dict[str, Any]:
+    """获取模块的执行特性：已注册（含延迟项）时取注册器中的记录，否则取静态清单"""
+    if not FUNCTION.has(module_name):
+        found = lookup_module(module_name)
+        if found is not None:
+            capabilities = dict(CAPABILITY_DEFAULTS)
+            capabilities.update(found[1].get("capabilities", {}).get(module_name, {}))
+            return capabilities
+    return FUNCTION.get_capabilities(module_name)
+
+
 def list_all_modules() -> list:
-    """列出所有已注册的模块"""
+    """列出所有已注册的模块（包含静态清单中尚未导入的模块）"""
+    _import_dynamic_modules()
     function_modules = set(FUNCTION.list_modules())
     args_modules = set(ARGS.list_modules())
     all_modules = function_modules.union(args_modules)
+    all_modules.update(get_manifest().module_names())
     return sorted(list(all_modules))
 
 
 def validate_module(module_name: str) -> bool:
     """验证模块是否完整注册（既有函数又有参数解析器）"""
-    return FUNCTION.has(module_name) and ARGS.has(module_name)
+    return is_registered(FUNCTION, module_name) and is_registered(ARGS, module_name)
 
 
 def list_modules_with_start_sh() -> List[str]:
-    """列出所有包含start.sh文件的模块"""
-    modules_with_start = []
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    functions_dir = os.path.join(base_dir, "functions")
-    
-    if not os.path.exists(functions_dir):
-        return modules_with_start
-    
-    for item in os.listdir(functions_dir):
-        item_path = os.path.join(functions_dir, item)
-        if os.path.isdir(item_path) and not item.startswith('_'):
-            start_sh_path = os.path.join(item_path, "start.sh")
-            if os.path.exists(start_sh_path):
-                modules_with_start.append(item)
-    
-    return sorted(modules_with_start)
+    """列出所有包含start.sh文件的模块（嵌套功能包返回其路径，如 vision/mark_imgs）"""
+    index = get_module_index()
+    return sorted(item for item, files in index.modules.items() if files.start_sh)
 
 
 def get_module_start_sh_path(module_name: str) -> Optional[str]:
     """获取指定模块的start.sh文件路径，如果不存在则返回None"""
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    functions_dir = os.path.join(base_dir, "functions")
-    start_sh_path = os.path.join(functions_dir, module_name, "start.sh")
-    
-    if os.path.exists(start_sh_path):
-        return start_sh_path
-    return None
+    files = get_module_files(module_name)
+    return files.start_sh if files else None
+
+
+def has_default_config(module_name: str) -> bool:
+    """检查模块是否存在 configs/<module_name>/default.json"""
+    return _has_default_config(module_name)
 
 
 def execute_start_sh(module_name: str, args: List[str] = None) -> bool:
@@ -226,6 +748,32 @@ def execute_start_sh(module_name: str, args: List[str] = None) -> bool:
         return False
 
 
+def get_module_parser(module_name: str) -> Optional[argparse.ArgumentParser]:
+    """获取模块的参数解析器（进程内缓存）"""
+    return PARSERS.get_parser(module_name)
+
+
+def build_synthetic_args(module_name: str, config: Dict[str, Any]) -> List[str]:
+    """把模块配置字典转换为命令行参数列表"""
+    return PARSERS.build_synthetic_args(module_name, config)
+
+
+def invoke(func: Callable, args: argparse.Namespace) -> Any:
+    """调用模块函数；注册的是协程函数时在新的事件循环中运行到结束"""
+    value = func(args)
+    if isinstance(value, types.CoroutineType):
+        import asyncio
+        value = asyncio.run(value)
+    return value
+
+
+def compile_module_args(module_name: str, config: Dict[str, Any],
+                        values: Optional[Dict[str, Any]] = None) -> argparse.Namespace:
+    """把模块配置字典直接编译为 Namespace（保留 JSON 值的类型），values 中的对象原样放入"""
+    return PARSERS.compile_namespace(module_name, config, values)
+
+
 # 全局注册实例
 FUNCTION = Registry("FUNCTION")
-ARGS = Registry("ARGS")
\ No newline at end of file
+ARGS = Registry("ARGS")
+PARSERS = ParserCache(ARGS)
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+进程内批量执行模块调用（gtools batch）
+任务以 JSONL 给出，每行一个调用：
+    {"module": "calculator", "params": {"operation": "add", "_positional_args": {"numbers": [1, 2]}}}
+params 与 configs/<module>/default.json 的格式相同，并与默认配置深度合并。
+所有任务在同一进程（或进程池）中执行，每个任务输出一行 JSON 结果。
+"""
+import copy
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from . import events, trace
+from .registry import (
+    FUNCTION,
+    ConfigHandler,
+    ConfigCompileError,
+    auto_import_functions_modules,
+    compile_module_args,
+    invoke,
+    validate_module,
+)
+from .utils.capture import capture_output
+
+# 模块名 -> 限制并发数的信号量（按执行特性 max_parallel / thread_safe 建立）
+_LIMITS: Dict[str, Any] = {}
+
+# 默认配置路径 -> (mtime_ns, size, 配置)
+_DEFAULT_CONFIGS: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+
+def merge_config(config: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """深度合并配置，override 优先级更高（与 --option 的合并规则一致）"""
+    result = dict(config)
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = merge_config(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def load_default_config(module_name: str) -> Dict[str, Any]:
+    """configs/<module_name>/default.json 的副本
+
+    按路径缓存在进程内，文件的 (mtime_ns, size) 变化时重新读取；
+    批量执行和 arun / gather 中大量调用同一模块时不必每次读取文件
+    """
+    path = ConfigHandler.get_default_config_path(module_name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    cached = _DEFAULT_CONFIGS.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        cached = (stat.st_mtime_ns, stat.st_size, ConfigHandler.load_config(path))
+        _DEFAULT_CONFIGS[path] = cached
+    # 合并后的配置会被编译进参数，模块可能修改其中的列表，不能共享缓存的对象
+    return copy.deepcopy(cached[2])
+
+
+@trace.traced("build module config", "config")
+def build_module_config(module_name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """configs/<module_name>/default.json 与参数合并后的完整配置"""
+    return merge_config(load_default_config(module_name), params or {})
+
+
+def parse_job(line: str, index: int) -> Dict[str, Any]:
+    """解析一行任务，格式错误时抛出 ValueError"""
+    job = json.loads(line)
+    if not isinstance(job, dict):
+        raise ValueError("任务必须是 JSON 对象")
+    module_name = job.get("module") or job.get("module_name")
+    if not module_name:
+        raise ValueError("任务缺少 module 字段")
+    params = job.get("params", {})
+    if not isinstance(params, dict):
+        raise ValueError("params 必须是 JSON 对象")
+    return {"index": index, "id": job.get("id", index), "module": module_name, "params": params}
+
+
+def _jsonable(value: Any) -> Any:
+    """模块返回值转换为可写入 JSON 的形式"""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def execute_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """执行一个任务并返回结果，模块的 stdout/stderr 被捕获到结果中"""
+    result = {
+        "index": job["index"],
+        "id": job["id"],
+        "module": job["module"],
+        "ok": False,
+        "exit_code": 1,
+        "result": None,
+        "error": None,
+        "stdout": "",
+        "stderr": "",
+        "wall_ms": 0.0,
+    }
+    module_name = job["module"]
+    limit = _LIMITS.get(module_name)
+    start = time.perf_counter()
+    with capture_output() as (out, err):
+        if limit is not None:
+            limit.acquire()
+        try:
+            if not validate_module(module_name):
+                result["error"] = f"模块 '{module_name}' 未注册或注册不完整"
+                return result
+            args = compile_module_args(module_name, build_module_config(module_name, job["params"]))
+            with events.scope(module_name):
+                result["result"] = _jsonable(invoke(FUNCTION.get(module_name), args))
+            result["ok"], result["exit_code"] = True, 0
+        except ConfigCompileError as e:
+            result["error"], result["exit_code"] = f"参数错误: {e}", 2
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            result["ok"], result["exit_code"] = code == 0, code
+            if code != 0:
+                result["error"] = f"模块退出，退出码 {code}"
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        finally:
+            if limit is not None:
+                limit.release()
+            result["wall_ms"] = (time.perf_counter() - start) * 1000
+            result["stdout"], result["stderr"] = out.getvalue(), err.getvalue()
+    return result
+
+
+def build_limits(executor: str, workers: int) -> Dict[str, Any]:
+    """按执行特性建立并发限制：max_parallel，线程池下非线程安全的模块单实例运行"""
+    import multiprocessing
+
+    limits = {}
+    for module_name in FUNCTION.list_modules():
+        capabilities = FUNCTION.get_capabilities(module_name)
+        limit = capabilities["max_parallel"]
+        if executor == "thread" and not capabilities["thread_safe"]:
+            limit = 1
+        if limit is None or limit >= workers:
+            continue
+        if executor == "thread":
+            limits[module_name] = threading.BoundedSemaphore(limit)
+        else:
+            limits[module_name] = multiprocessing.BoundedSemaphore(limit)
+    return limits
+
+
+def _init_process_worker(limits: Dict[str, Any]):
+    """进程池工作进程初始化：共享并发限制并注册功能模块"""
+    _LIMITS.clear()
+    _LIMITS.update(limits)
+    auto_import_functions_modules()
+
+
+class BatchRunner:
+    """批量执行 JSONL 任务
+
+    Usage:
+    ---
+    >>> runner = BatchRunner(workers=4, executor="thread")
+    >>> failures = runner.run(open("jobs.jsonl"), sys.stdout)
+    """
+
+    def __init__(self, workers: Optional[int] = None, executor: str = "thread", ordered: bool = False):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"不支持的执行器: {executor}")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.executor = executor
+        self.ordered = ordered
+        self.summary = {"total": 0, "ok": 0, "failed": 0, "wall_ms": 0.0}
+
+    def _build_limits(self) -> Dict[str, Any]:
+        return build_limits(self.executor, self.workers)
+
+    def _jobs(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """逐行解析任务；格式错误的行直接生成失败结果"""
+        for index, line in enumerate(lines):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield parse_job(line, index)
+            except ValueError as e:
+                yield {"index": index, "id": index, "module": None, "invalid": f"任务格式错误: {e}"}
+
+    def _emit(self, result: Dict[str, Any], output: TextIO):
+        self.summary["total"] += 1
+        self.summary["ok" if result["ok"] else "failed"] += 1
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+    def run(self, lines: Iterable[str], output: TextIO) -> int:
+        """执行全部任务，结果逐行写入 output，返回失败任务数"""
+        start = time.perf_counter()
+        for result in self.execute(self._jobs(lines)):
+            self._emit(result, output)
+        self.summary["wall_ms"] = (time.perf_counter() - start) * 1000
+        return self.summary["failed"]
+
+    def execute(self, jobs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """执行已解析的任务，按完成顺序（ordered 时按输入顺序）逐个产出结果"""
+        limits = self._build_limits()
+        if self.executor == "thread":
+            _LIMITS.clear()
+            _LIMITS.update(limits)
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process_worker,
+                                       initargs=(limits,))
+
+        # 控制同时提交的任务数，避免一次性读入整个输入流
+        window = self.workers * 4
+        pending = {}
+        finished: Dict[int, Dict[str, Any]] = {}
+        order = []
+        next_emit = 0
+
+        def collect(done):
+            nonlocal next_emit
+            ready = []
+            for future in done:
+                result = future.result()
+                pending.pop(future)
+                if not self.ordered:
+                    ready.append(result)
+                    continue
+                finished[result["index"]] = result
+            while self.ordered and next_emit < len(order) and order[next_emit] in finished:
+                ready.append(finished.pop(order[next_emit]))
+                next_emit += 1
+            return ready
+
+        try:
+            with pool:
+                for job in jobs:
+                    order.append(job["index"])
+                    if "invalid" in job:
+                        result = {"index": job["index"], "id": job["id"], "module": None, "ok": False,
+                                  "exit_code": 2, "result": None, "error": job["invalid"],
+                                  "stdout": "", "stderr": "", "wall_ms": 0.0}
+                        future = _completed(result)
+                    else:
+                        future = pool.submit(execute_job, job)
+                    pending[future] = job["index"]
+                    if len(pending) >= window:
+                        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        yield from collect(done)
+                while pending:
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    yield from collect(done)
+        finally:
+            if self.executor == "thread":
+                _LIMITS.clear()
+
+
+def _completed(result: Dict[str, Any]):
+    """已完成的 Future，用于直接返回的失败结果"""
+    from concurrent.futures import Future
+
+    future = Future()
+    future.set_result(result)
+    return future
@@ -0,0 +1,233 @@
+"""
+gtools 常驻服务（gtools serve）
+启动时导入全部功能模块并保持驻留，每个请求 fork 一个子进程执行，
+子进程直接使用客户端传来的标准输入/输出/错误，执行结束后回传退出码。
+每次处理请求前检查 functions/*/main.py 的变化并重新加载对应模块。
+"""
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+from typing import Dict, Optional
+
+from .client import _INT, get_socket_path, receive_request
+from .manifest import get_manifest, module_import_path
+from .registry import (
+    FUNCTION,
+    ARGS,
+    auto_import_functions_modules,
+    import_functions_module,
+    get_module_parser,
+    reload_functions_module,
+)
+
+
+def run_cli(argv) -> int:
+    """在当前进程中执行一次 CLI 调用，返回退出码"""
+    from .cli import CLI
+
+    try:
+        CLI().main(argv)
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def _attach_stdio(fds):
+    """把客户端的文件描述符接到 0/1/2，并按终端类型重建标准流"""
+    for target, fd in zip((0, 1, 2), fds):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    encoding = sys.stdout.encoding or "utf-8"
+    sys.stdin = open(0, "r", encoding=encoding, closefd=False)
+    sys.stdout = open(1, "w", encoding=encoding, closefd=False,
+                      buffering=1 if os.isatty(1) else -1)
+    sys.stderr = open(2, "w", encoding=encoding, closefd=False, buffering=1)
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """请求处理器，运行在 fork 出的子进程中"""
+
+    def handle(self):
+        conn = self.request
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            argv, cwd, env, fds = receive_request(conn)
+        except (ConnectionError, ValueError):
+            # 探测连接或不完整的请求
+            return
+        conn.sendall(_INT.pack(os.getpid()))
+
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            conn.sendall(_INT.pack(1))
+            return
+
+        _attach_stdio(fds)
+        os.environ.clear()
+        os.environ.update(env)
+        sys.argv = ["gtools"] + list(argv)
+
+        try:
+            os.chdir(cwd)
+            code = run_cli(argv)
+        except OSError as e:
+            print(f"错误: 无法切换到工作目录 '{cwd}': {e}", file=sys.stderr)
+            code = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        conn.sendall(_INT.pack(code))
+
+
+class _ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """按请求 fork 的 Unix 域套接字服务"""
+
+    max_children = 256
+
+    def __init__(self, socket_path: str, gserver: "GtoolsServer"):
+        self.gserver = gserver
+        super().__init__(socket_path, _RequestHandler)
+
+    def process_request(self, request, client_address):
+        # fork 之前在父进程中完成重新加载，子进程继承最新的模块
+        self.gserver.refresh_modules()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        super().process_request(request, client_address)
+
+
+class GtoolsServer:
+    """常驻服务：维护已导入的模块，并在 main.py 变化时重新加载"""
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or get_socket_path()
+        # import path -> 导入时的 main.py mtime_ns
+        self._loaded: Dict[str, int] = {}
+
+    def warm(self):
+        """导入全部功能模块并预先构建参数解析器"""
+        # 解析器的 prog 取自 sys.argv[0]，预构建前统一为 gtools
+        sys.argv[0] = "gtools"
+        auto_import_functions_modules(lazy=False)
+        self._record_loaded()
+        self._build_parsers()
+
+    def _build_parsers(self):
+        """构建（或在模块重新加载后重建）所有模块的解析器缓存"""
+        for module_name in ARGS.list_modules():
+            try:
+                get_module_parser(module_name)
+            except Exception as e:
+                print(f"警告: 构建模块 '{module_name}' 的参数解析器失败: {e}")
+
+    def _record_loaded(self):
+        """记录已导入模块的 main.py 修改时间"""
+        for item, entry in get_manifest().entries.items():
+            import_path = module_import_path(item)
+            if import_path in sys.modules:
+                self._loaded[import_path] = entry["mtime_ns"]
+
+    def _reload(self, import_path: str):
+        """重新加载模块，失败时恢复原注册项"""
+        if reload_functions_module(import_path):
+            print(f"已重新加载模块: {import_path}")
+
+    def refresh_modules(self):
+        """检查 functions 目录的变化：重新加载修改过的模块，导入新增模块，移除已删除模块
+
+        每个请求都会调用，先只比较 main.py 和命名空间目录的 mtime，有变化时才重新扫描
+        """
+        if get_manifest().is_current():
+            return
+        manifest = get_manifest(refresh=True)
+        current = set()
+        changed = False
+        for item, entry in manifest.entries.items():
+            import_path = module_import_path(item)
+            current.add(import_path)
+            if self._loaded.get(import_path) == entry["mtime_ns"]:
+                continue
+            if import_path in sys.modules:
+                self._reload(import_path)
+            else:
+                import_functions_module(item)
+            self._loaded[import_path] = entry["mtime_ns"]
+            changed = True
+
+        for import_path in set(self._loaded) - current:
+            FUNCTION.unregist_module(import_path)
+            ARGS.unregist_module(import_path)
+            sys.modules.pop(import_path, None)
+            del self._loaded[import_path]
+            print(f"模块已移除: {import_path}")
+
+        if changed:
+            self._build_parsers()
+
+    def _check_stale_socket(self) -> bool:
+        """套接字文件已存在时判断是否有服务在运行，残留文件会被删除"""
+        if not os.path.exists(self.socket_path):
+            return False
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+            return True
+        except OSError:
+            os.unlink(self.socket_path)
+            return False
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        """启动服务，直到被中断"""
+        if self._check_stale_socket():
+            print(f"错误: 已有 gtools 服务在 {self.socket_path} 上运行")
+            sys.exit(1)
+
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        self.warm()
+
+        old_umask = os.umask(0o077)
+        try:
+            server = _ForkingUnixServer(self.socket_path, self)
+        finally:
+            os.umask(old_umask)
+
+        print(f"gtools 服务已启动: {self.socket_path}")
+        print(f"已加载 {len(self._loaded)} 个功能模块")
+        print(f"客户端使用: export GTOOLS_SERVER={self.socket_path}")
+        sys.stdout.flush()
+        # SIGTERM 与 Ctrl-C 一样正常退出，保证清理套接字文件
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\ngtools 服务已停止")
+        finally:
+            server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def serve(socket_path: Optional[str] = None):
+    """启动 gtools 常驻服务"""
+    GtoolsServer(socket_path).serve_forever()
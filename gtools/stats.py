@@ -0,0 +1,263 @@
+"""
+资源统计（gtools --stats）
+模块执行（以及 run --config 的每个管道节点）结束后统计：
+墙钟时间、用户态/内核态 CPU、峰值 RSS、块设备读写、上下文切换。
+
+数据来自 resource.getrusage（含子进程）和 /proc/self（io、status）。
+Linux 上每次测量前通过 /proc/self/clear_refs 重置峰值 RSS，使每个节点的峰值互不影响；
+无法重置时报告的是进程启动以来的峰值。
+
+管道节点在执行它的线程或子进程中测量，测量结果随节点结果返回，由父进程用 add() 汇总。
+线程池中的节点使用 RUSAGE_THREAD 和 /proc/thread-self/io 按线程统计 CPU、上下文切换和 I/O，
+峰值 RSS 是进程级的，报告的是整个进程的峰值。
+"""
+import json
+import sys
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from .utils.text import display_width
+
+_NULL_METER = nullcontext()
+
+# 当前的统计记录列表，None 表示未开启
+_RECORDS: Optional[List[Dict[str, Any]]] = None
+
+
+def _read_proc_io(path: str = "/proc/self/io") -> Optional[Dict[str, int]]:
+    """/proc/self/io（或 /proc/thread-self/io）中实际落到块设备的读写字节数"""
+    try:
+        with open(path, "r") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"read_bytes": int(fields["read_bytes"]), "write_bytes": int(fields["write_bytes"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _read_hwm_kb() -> Optional[int]:
+    """/proc/self/status 中的 VmHWM（峰值 RSS，KB）"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _reset_hwm() -> bool:
+    """重置峰值 RSS（Linux 4.0+ 支持向 clear_refs 写入 5），返回是否成功"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _maxrss_kb(ru) -> int:
+    # macOS 上 ru_maxrss 单位为字节
+    return ru.ru_maxrss // 1024 if sys.platform == "darwin" else ru.ru_maxrss
+
+
+def thread_supported() -> bool:
+    """是否支持按线程统计（RUSAGE_THREAD）"""
+    import resource
+
+    return hasattr(resource, "RUSAGE_THREAD")
+
+
+class Snapshot:
+    """某一时刻的资源计数；thread 为 True 时只统计当前线程（不含子进程）"""
+
+    __slots__ = ("wall", "self_ru", "children_ru", "io")
+
+    def __init__(self, thread: bool = False):
+        import resource
+
+        self.wall = time.perf_counter()
+        if thread:
+            self.self_ru = resource.getrusage(resource.RUSAGE_THREAD)
+            self.children_ru = None
+            self.io = _read_proc_io("/proc/thread-self/io")
+        else:
+            self.self_ru = resource.getrusage(resource.RUSAGE_SELF)
+            self.children_ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+            self.io = _read_proc_io()
+
+
+def diff(before: Snapshot, after: Snapshot, peak_rss_kb: Optional[int]) -> Dict[str, Any]:
+    """两个快照之间的资源消耗（CPU 与块 I/O 包含已结束的子进程）"""
+    def delta(field: str) -> float:
+        value = getattr(after.self_ru, field) - getattr(before.self_ru, field)
+        if after.children_ru is not None:
+            value += getattr(after.children_ru, field) - getattr(before.children_ru, field)
+        return value
+
+    wall_s = after.wall - before.wall
+    user_s, sys_s = delta("ru_utime"), delta("ru_stime")
+    if before.io is not None and after.io is not None:
+        read_bytes = after.io["read_bytes"] - before.io["read_bytes"]
+        write_bytes = after.io["write_bytes"] - before.io["write_bytes"]
+    else:
+        read_bytes = int(delta("ru_inblock")) * 512
+        write_bytes = int(delta("ru_oublock")) * 512
+    if peak_rss_kb is None:
+        peak_rss_kb = _maxrss_kb(after.self_ru)
+    # RUSAGE_CHILDREN 的峰值是历史值，只在测量期间有子进程结束时报告
+    children_peak_kb = 0
+    if after.children_ru is not None:
+        children_cpu = (after.children_ru.ru_utime + after.children_ru.ru_stime
+                        - before.children_ru.ru_utime - before.children_ru.ru_stime)
+        children_peak_kb = _maxrss_kb(after.children_ru) if children_cpu > 0 else 0
+    return {
+        "wall_s": round(wall_s, 6),
+        "user_s": round(user_s, 6),
+        "sys_s": round(sys_s, 6),
+        "cpu_percent": round((user_s + sys_s) / wall_s * 100, 1) if wall_s > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "children_peak_rss_mb": round(children_peak_kb / 1024, 1) if children_peak_kb else None,
+        "read_bytes": read_bytes,
+        "write_bytes": write_bytes,
+        "voluntary_ctx_switches": int(delta("ru_nvcsw")),
+        "involuntary_ctx_switches": int(delta("ru_nivcsw")),
+    }
+
+
+class ResourceMeter:
+    """测量代码块的资源消耗，结果保存在 stats 属性中
+
+    Usage:
+    ---
+    >>> with ResourceMeter("calculator") as meter:
+    >>>     main(args)
+    >>> print(format_stats([meter.stats]))
+    """
+
+    def __init__(self, label: str, records: Optional[List[Dict[str, Any]]] = None, thread: bool = False):
+        self.label = label
+        self.records = records
+        # 与其他线程并发执行时只统计当前线程，且不重置进程级的峰值 RSS
+        self.thread = thread and thread_supported()
+        self.stats: Dict[str, Any] = {}
+        self._before: Optional[Snapshot] = None
+        self._hwm_reset = False
+
+    def __enter__(self) -> "ResourceMeter":
+        self._hwm_reset = not self.thread and _reset_hwm()
+        self._before = Snapshot(self.thread)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        after = Snapshot(self.thread)
+        peak = _read_hwm_kb() if self._hwm_reset else None
+        self.stats = dict(diff(self._before, after, peak), label=self.label, ok=exc_type is None)
+        if self.records is not None:
+            self.records.append(self.stats)
+
+
+def start() -> List[Dict[str, Any]]:
+    """开启统计，返回记录列表"""
+    global _RECORDS
+    _RECORDS = []
+    return _RECORDS
+
+
+def stop() -> List[Dict[str, Any]]:
+    """停止统计并返回全部记录"""
+    global _RECORDS
+    records, _RECORDS = _RECORDS, None
+    return records or []
+
+
+def enabled() -> bool:
+    return _RECORDS is not None
+
+
+def add(record: Dict[str, Any]):
+    """加入在其他线程或子进程中测量的记录（未开启时忽略）"""
+    records = _RECORDS
+    if records is not None:
+        records.append(record)
+
+
+def measure(label: str):
+    """统计代码块的资源消耗；未开启时返回共享的空上下文"""
+    records = _RECORDS
+    if records is None:
+        return _NULL_METER
+    return ResourceMeter(label, records)
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def total(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """多条记录的合计：时间与计数求和，峰值取最大"""
+    summed = {"label": "总计", "ok": all(r["ok"] for r in records)}
+    for key in ("wall_s", "user_s", "sys_s", "read_bytes", "write_bytes",
+                "voluntary_ctx_switches", "involuntary_ctx_switches"):
+        summed[key] = sum(r[key] for r in records)
+    summed["cpu_percent"] = round((summed["user_s"] + summed["sys_s"]) / summed["wall_s"] * 100, 1) \
+        if summed["wall_s"] > 0 else 0.0
+    summed["peak_rss_mb"] = max(r["peak_rss_mb"] for r in records)
+    children = [r["children_peak_rss_mb"] for r in records if r["children_peak_rss_mb"]]
+    summed["children_peak_rss_mb"] = max(children) if children else None
+    return summed
+
+
+def format_stats(records: List[Dict[str, Any]]) -> str:
+    """文本报告：单条记录为键值形式，多条记录（管道节点）为表格并附总计"""
+    if not records:
+        return "资源统计: 没有执行任何模块"
+    if len(records) == 1:
+        r = records[0]
+        lines = [f"📊 资源统计: {r['label']}",
+                 f"  墙钟时间   {_format_seconds(r['wall_s'])}",
+                 f"  CPU        用户态 {_format_seconds(r['user_s'])}，内核态 {_format_seconds(r['sys_s'])}"
+                 f"（{r['cpu_percent']:.0f}%）",
+                 f"  峰值 RSS   {r['peak_rss_mb']:.1f}MB"
+                 + (f"（子进程 {r['children_peak_rss_mb']:.1f}MB）" if r["children_peak_rss_mb"] else ""),
+                 f"  块 I/O     读 {_format_bytes(r['read_bytes'])}，写 {_format_bytes(r['write_bytes'])}",
+                 f"  上下文切换 自愿 {r['voluntary_ctx_switches']}，非自愿 {r['involuntary_ctx_switches']}"]
+        return "\n".join(lines)
+
+    columns = [("节点", 20), ("墙钟", 9), ("用户态", 9), ("内核态", 9), ("CPU%", 6),
+               ("峰值RSS(MB)", 12), ("读", 9), ("写", 9), ("上下文切换", 10)]
+
+    def row(cells: List[str]) -> str:
+        first = cells[0] + " " * (columns[0][1] - display_width(cells[0]))
+        rest = [" " * (width - display_width(cell)) + cell for cell, (_, width) in zip(cells[1:], columns[1:])]
+        return " ".join([first] + rest)
+
+    header = row([name for name, _ in columns])
+    rule = "-" * display_width(header)
+    lines = ["📊 资源统计（每个节点）", header, rule]
+    for r in records + [total(records)]:
+        if r["label"] == "总计":
+            lines.append(rule)
+        label = r["label"] if len(r["label"]) <= 20 else r["label"][:19] + "…"
+        lines.append(row([label, _format_seconds(r["wall_s"]), _format_seconds(r["user_s"]),
+                          _format_seconds(r["sys_s"]), f"{r['cpu_percent']:.0f}", f"{r['peak_rss_mb']:.1f}",
+                          _format_bytes(r["read_bytes"]), _format_bytes(r["write_bytes"]),
+                          str(r["voluntary_ctx_switches"] + r["involuntary_ctx_switches"])]))
+    return "\n".join(lines)
+
+
+def report(records: List[Dict[str, Any]], fmt: str = "table") -> str:
+    """table 为文本报告，json 为 {"runs": [...], "total": {...}}"""
+    if fmt == "json":
+        return json.dumps({"runs": records, "total": total(records) if records else None},
+                          ensure_ascii=False, indent=2)
+    return format_stats(records)
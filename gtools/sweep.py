@@ -0,0 +1,146 @@
+"""
+参数扫描（gtools sweep）
+在模块配置（默认 configs/<module>/default.json）的基础上，对若干参数取值做笛卡尔积，
+每个组合作为一个任务在进程池中执行，最后输出结果表（参数、状态、耗时、输出）。
+
+    gtools sweep calculator --grid operation=add,multiply --grid _positional_args.numbers=[1,2],[3,4]
+
+--module-config 指向的配置文件也可以包含 sweep 段，键与 --grid 相同，值为候选值列表：
+
+    {"operation": "add", "sweep": {"operation": ["add", "multiply"]}}
+"""
+import csv
+import itertools
+import json
+import os
+from typing import Any, Dict, List, Optional, TextIO
+
+from .runner import BatchRunner, merge_config
+
+# 结果表中输出列显示的最大字符数
+OUTPUT_PREVIEW_CHARS = 60
+
+
+def split_grid_values(text: str) -> List[str]:
+    """按顶层逗号拆分候选值，方括号 / 花括号 / 引号内的逗号不拆分
+
+    >>> split_grid_values('[1,2],[3,4]')
+    ['[1,2]', '[3,4]']
+    """
+    values, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            values.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    values.append("".join(current).strip())
+    return [value for value in values if value]
+
+
+def nest(assignment: Dict[str, Any]) -> Dict[str, Any]:
+    """把 {"_positional_args.numbers": [1]} 形式的点分键展开为嵌套字典"""
+    result: Dict[str, Any] = {}
+    for key, value in assignment.items():
+        keys = key.split(".")
+        current = result
+        for k in keys[:-1]:
+            current = current.setdefault(k, {})
+        current[keys[-1]] = value
+    return result
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """笛卡尔积展开，返回每个组合的 {点分键: 取值}，顺序与 grid 中键的顺序一致"""
+    keys = list(grid)
+    for key in keys:
+        if not isinstance(grid[key], list) or not grid[key]:
+            raise ValueError(f"扫描参数 '{key}' 需要非空的候选值列表")
+    return [dict(zip(keys, combination)) for combination in itertools.product(*(grid[key] for key in keys))]
+
+
+def _preview(text: str) -> str:
+    """输出的最后一行非空内容，用于结果表"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return ""
+    last = lines[-1].strip()
+    return last if len(last) <= OUTPUT_PREVIEW_CHARS else last[:OUTPUT_PREVIEW_CHARS - 1] + "…"
+
+
+class SweepRunner:
+    """在进程池中执行参数组合
+
+    Usage:
+    ---
+    >>> runner = SweepRunner(workers=4)
+    >>> results = runner.run("calculator", {}, {"operation": ["add", "multiply"]})
+    >>> print(runner.format_table(results))
+    """
+
+    def __init__(self, workers: Optional[int] = None, executor: str = "process"):
+        self.runner = BatchRunner(workers=workers, executor=executor, ordered=True)
+        self.keys: List[str] = []
+
+    def run(self, module_name: str, base_config: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """执行全部组合，结果按组合顺序返回，每个结果附带 params（本组合的取值）
+
+        base_config 与模块默认配置合并后作为每个组合的基础配置
+        """
+        self.keys = list(grid)
+        assignments = expand_grid(grid)
+        jobs = [{"index": i, "id": i, "module": module_name,
+                 "params": merge_config(base_config, nest(assignment))}
+                for i, assignment in enumerate(assignments)]
+        results = []
+        for result in self.runner.execute(iter(jobs)):
+            result["params"] = assignments[result["index"]]
+            results.append(result)
+        return results
+
+    def format_table(self, results: List[Dict[str, Any]]) -> str:
+        """结果表：组合序号、各扫描参数、状态、返回值、耗时、输出最后一行"""
+        from beautifultable import BeautifulTable
+
+        table = BeautifulTable(maxwidth=200)
+        table.columns.header = ["#"] + self.keys + ["状态", "返回值", "耗时(ms)", "输出"]
+        for result in results:
+            status = "✓" if result["ok"] else f"✗ {result['exit_code']}"
+            value = "" if result["result"] is None else json.dumps(result["result"], ensure_ascii=False)
+            output = _preview(result["stdout"]) if result["ok"] else _preview(result["error"] or result["stderr"])
+            table.rows.append([result["index"]]
+                              + [json.dumps(result["params"][key], ensure_ascii=False) for key in self.keys]
+                              + [status, value, f"{result['wall_ms']:.1f}", output])
+        table.set_style(BeautifulTable.STYLE_GRID)
+        table.columns.alignment["输出"] = BeautifulTable.ALIGN_LEFT
+        return str(table)
+
+    def write_results(self, results: List[Dict[str, Any]], path: str):
+        """保存完整结果：.csv 写为表格，其他扩展名写为 JSONL（含完整的 stdout/stderr）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.endswith(".csv"):
+                self._write_csv(results, f)
+            else:
+                for result in results:
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    def _write_csv(self, results: List[Dict[str, Any]], f: TextIO):
+        writer = csv.writer(f)
+        writer.writerow(["index"] + self.keys + ["ok", "exit_code", "result", "wall_ms", "error", "stdout", "stderr"])
+        for result in results:
+            writer.writerow([result["index"]]
+                            + [json.dumps(result["params"][key], ensure_ascii=False) for key in self.keys]
+                            + [result["ok"], result["exit_code"], json.dumps(result["result"], ensure_ascii=False),
+                               f"{result['wall_ms']:.3f}", result["error"] or "", result["stdout"], result["stderr"]])
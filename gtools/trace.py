@@ -0,0 +1,159 @@
+"""
+Chrome trace 事件记录（gtools --trace out.json）
+记录解释器启动、模块发现/导入、配置加载、解析器构建、参数编译、模块执行以及管道节点等阶段的耗时，
+输出 Chrome trace-event JSON，可在 https://ui.perfetto.dev 或 chrome://tracing 中查看。
+
+未开启时 span() 只做一次全局变量判断并返回共享的空上下文，不分配对象、不读时钟。
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+_NULL_SPAN = nullcontext()
+
+# 当前的记录器，None 表示未开启
+_TRACER: Optional["Tracer"] = None
+
+
+def _process_start() -> Optional[float]:
+    """进程创建时刻（perf_counter 时钟），读取 /proc/self/stat，精度为一个时钟节拍（通常 10ms）"""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # comm 字段可能包含空格，从最后一个右括号之后开始计数
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return time.perf_counter() - age
+
+
+class Tracer:
+    """收集 trace 事件（complete 事件，ph=X）
+
+    Usage:
+    ---
+    >>> tracer = Tracer()
+    >>> with tracer.span("load config", "config"):
+    >>>     ...
+    >>> tracer.write("out.json")
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self.origin = _process_start() or time.perf_counter()
+
+    def _us(self, t: float) -> float:
+        return round((t - self.origin) * 1e6, 3)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Optional[Dict[str, Any]] = None):
+        """记录一个已完成的区间（perf_counter 时刻）"""
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start), "dur": round((end - start) * 1e6, 3),
+                 "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def span(self, name: str, cat: str = "gtools", args: Optional[Dict[str, Any]] = None) -> "_Span":
+        return _Span(self, name, cat, args)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Chrome trace-event JSON，附带进程和线程名称"""
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                     "args": {"name": "gtools " + " ".join(sys.argv[1:])}}]
+        for tid in {event["tid"] for event in self.events}:
+            name = "main" if tid == threading.main_thread().ident else f"thread-{tid}"
+            metadata.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": metadata + sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+    def write(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False)
+
+
+class _Span:
+    """区间上下文，退出时记录事件；异常时在 args 中记录异常类型"""
+
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        self.tracer.add(self.name, self.cat, self.start, end, self.args)
+
+
+def start(entry_time: Optional[float] = None) -> Tracer:
+    """开启记录；entry_time 为命令行入口开始执行的时刻，用于区分解释器启动和 gtools 导入"""
+    global _TRACER
+    tracer = Tracer()
+    now = time.perf_counter()
+    if entry_time is not None and tracer.origin < entry_time:
+        tracer.add("interpreter startup", "startup", tracer.origin, entry_time)
+        tracer.add("import gtools.cli", "startup", entry_time, now)
+    elif tracer.origin < now:
+        tracer.add("interpreter startup", "startup", tracer.origin, now)
+    _TRACER = tracer
+    return tracer
+
+
+def stop() -> Optional[Tracer]:
+    """停止记录并返回记录器"""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+def span(name: str, cat: str = "gtools", **args: Any):
+    """记录一个区间；未开启时返回共享的空上下文
+
+    >>> with trace.span("load config", "config", path=path):
+    >>>     ...
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args or None)
+
+
+def traced(name: Optional[str] = None, cat: str = "gtools") -> Callable:
+    """装饰器：记录函数调用区间，未开启时只多一次全局变量判断"""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, cat, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
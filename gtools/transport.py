@@ -0,0 +1,156 @@
+"""
+管道节点跨进程传递返回值（进程池 / --isolate 中的数据边）
+子进程中节点的返回值原本经 pickle 写入管道，父进程读出后再传给下游进程，大数组要复制多次。
+返回值较大时改为共享内存：
+
+- 生产者用 pickle 协议 5 序列化，numpy 数组等对象的数据作为带外缓冲区，
+  与序列化后的元数据一起写入一块 multiprocessing.shared_memory，管道中只传递 SharedValue（名称和各段位置）
+- 消费者连接共享内存，pickle.loads(..., buffers=...) 直接在共享内存上重建对象，numpy 数组不再复制
+- 父进程的 ArtifactStore 持有 SharedValue，最后一个引用它的下游节点结束后 unlink
+
+共享内存由父进程的 resource_tracker 兜底：gtools 进程异常退出时未释放的共享内存会被回收。
+子进程需要与父进程共用同一个 resource_tracker（fork 时继承，forkserver / spawn 时由 multiprocessing 传递），
+启动子进程前调用 prepare()。
+共享内存只在 POSIX 系统上使用（Windows 上最后一个句柄关闭即释放，无法跨越生产者进程的生命周期）。
+"""
+import os
+import pickle
+import threading
+from typing import Any, List, Optional, Tuple
+
+SHARED_MEMORY_AVAILABLE = os.name == "posix"
+
+# 序列化后（元数据 + 带外缓冲区）不小于该大小时使用共享内存
+SHARED_MEMORY_THRESHOLD = 1 << 20
+
+# 当前进程中已连接、仍可能被对象引用的共享内存
+_ATTACHED: List[Any] = []
+_ATTACHED_LOCK = threading.Lock()
+
+
+class _OutOfBandPickler(pickle.Pickler):
+    """bytearray 同样作为带外缓冲区（bytes 等基本类型不经过 reducer_override，保持带内）"""
+
+    def reducer_override(self, obj):
+        if type(obj) is bytearray:
+            return bytearray, (pickle.PickleBuffer(obj),)
+        return NotImplemented
+
+
+class SharedValue:
+    """共享内存中的对象；只有名称和各段位置经 pickle 传递
+
+    spans[0] 为元数据，其余为带外缓冲区；path 为 load 之后依次取的键（见 gtools.artifacts）
+    """
+
+    __slots__ = ("name", "size", "spans", "path")
+
+    def __init__(self, name: str, size: int, spans: List[Tuple[int, int]], path: Tuple[str, ...] = ()):
+        self.name = name
+        self.size = size
+        self.spans = spans
+        self.path = path
+
+    def select(self, path: List[str]) -> "SharedValue":
+        """同一块共享内存，load 之后再按键路径取值"""
+        return SharedValue(self.name, self.size, self.spans, self.path + tuple(path))
+
+    def load(self) -> Any:
+        """连接共享内存并重建对象（带外缓冲区不复制）
+
+        Raises:
+            FileNotFoundError: 共享内存已被释放
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=self.name)
+        buf = shm.buf
+        (start, end), buffers = self.spans[0], self.spans[1:]
+        value = pickle.loads(buf[start:end], buffers=[buf[a:b] for a, b in buffers])
+        with _ATTACHED_LOCK:
+            _ATTACHED.append(shm)
+        for key in self.path:
+            value = value[int(key)] if isinstance(value, (list, tuple)) else value[key]
+        return value
+
+    def unlink(self):
+        """释放共享内存（已释放时忽略）"""
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def __repr__(self) -> str:
+        return f"<SharedValue {self.name} {self.size} bytes>"
+
+
+def prepare():
+    """启动 resource_tracker，之后启动的子进程与当前进程共用它"""
+    if SHARED_MEMORY_AVAILABLE:
+        from multiprocessing import resource_tracker
+
+        resource_tracker.ensure_running()
+
+
+def share(value: Any, threshold: int = SHARED_MEMORY_THRESHOLD) -> Any:
+    """序列化后不小于 threshold 时把对象写入共享内存并返回 SharedValue，否则原样返回"""
+    if not SHARED_MEMORY_AVAILABLE or value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    import io
+
+    buffers: List[pickle.PickleBuffer] = []
+    stream = io.BytesIO()
+    try:
+        _OutOfBandPickler(stream, protocol=5, buffer_callback=buffers.append).dump(value)
+        raws = [buffer.raw() for buffer in buffers]
+    except (pickle.PicklingError, TypeError, AttributeError, BufferError):
+        # 无法序列化的对象交给原来的传递方式报错
+        return value
+    meta = stream.getbuffer()
+    size = meta.nbytes + sum(raw.nbytes for raw in raws)
+    if size < threshold:
+        return value
+
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    spans, offset = [], 0
+    for chunk in [meta] + raws:
+        shm.buf[offset:offset + chunk.nbytes] = chunk
+        spans.append((offset, offset + chunk.nbytes))
+        offset += chunk.nbytes
+    name = shm.name
+    # 生产者不再需要映射；共享内存保留到父进程 unlink
+    shm.close()
+    return SharedValue(name, size, spans)
+
+
+def load_inputs(inputs: Optional[dict]) -> Optional[dict]:
+    """把注入参数中的 SharedValue（包括引用列表中的）替换为对象"""
+    if not inputs:
+        return inputs
+
+    def load(value):
+        if isinstance(value, SharedValue):
+            return value.load()
+        if isinstance(value, list):
+            return [load(item) for item in value]
+        return value
+
+    return {key: load(value) for key, value in inputs.items()}
+
+
+def close_attached():
+    """解除不再被对象引用的共享内存映射；仍有 numpy 数组等引用的保留到下次"""
+    with _ATTACHED_LOCK:
+        remaining = []
+        for shm in _ATTACHED:
+            try:
+                shm.close()
+            except BufferError:
+                remaining.append(shm)
+        _ATTACHED[:] = remaining
@@ -1,5 +1,7 @@
 from .io import read_txt, write_bags
+from .json_exact import fits_json
 from .logger import get_logger
+from .text import display_width
 from .time_record import print_run_time
 
-__all__ = ["read_txt", "write_bags", "get_logger", "print_run_time"]
+__all__ = ["read_txt", "write_bags", "get_logger", "print_run_time", "display_width", "fits_json"]
@@ -0,0 +1,84 @@
+"""
+按线程捕获标准输出/错误
+redirect_stdout 会替换进程级的 sys.stdout，多个线程同时执行模块时输出会互相混杂。
+这里在 sys.stdout/sys.stderr 上安装一个代理，写入时按当前线程分发到各自的缓冲区，
+没有开启捕获的线程仍写入原始流。
+"""
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+_install_lock = threading.Lock()
+
+
+class ThreadLocalStream:
+    """按线程分发写入的流代理"""
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    @property
+    def original(self):
+        return self._original
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self._original.write(text)
+        if getattr(self._local, "tee", False):
+            self._original.write(text)
+        return buffer.write(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if getattr(self._local, "tee", False) or getattr(self._local, "buffer", None) is None:
+            self._original.flush()
+
+    def isatty(self) -> bool:
+        # 捕获中的输出不是终端，模块据此关闭进度条等交互输出；tee 模式保持原样
+        if getattr(self._local, "buffer", None) is not None and not getattr(self._local, "tee", False):
+            return False
+        return self._original.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def install() -> Tuple[ThreadLocalStream, ThreadLocalStream]:
+    """在 sys.stdout / sys.stderr 上安装线程代理（可重复调用）"""
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadLocalStream):
+            sys.stdout = ThreadLocalStream(sys.stdout)
+        if not isinstance(sys.stderr, ThreadLocalStream):
+            sys.stderr = ThreadLocalStream(sys.stderr)
+        return sys.stdout, sys.stderr
+
+
+@contextmanager
+def capture_output(tee: bool = False) -> Iterator[Tuple[io.StringIO, io.StringIO]]:
+    """捕获当前线程在代码块内写入 stdout/stderr 的内容；tee 为 True 时同时写入原始流
+
+    Usage:
+    ---
+    >>> with capture_output() as (out, err):
+    >>>     print("hello")
+    >>> out.getvalue()
+    'hello\\n'
+    """
+    stdout, stderr = install()
+    out, err = io.StringIO(), io.StringIO()
+    previous = [(getattr(stream._local, "buffer", None), getattr(stream._local, "tee", False))
+                for stream in (stdout, stderr)]
+    for stream, buffer in ((stdout, out), (stderr, err)):
+        stream._local.buffer, stream._local.tee = buffer, tee
+    try:
+        yield out, err
+    finally:
+        for stream, (buffer, previous_tee) in zip((stdout, stderr), previous):
+            stream._local.buffer, stream._local.tee = buffer, previous_tee
@@ -0,0 +1,124 @@
+"""
+导入耗时分析
+记录功能模块及其重量级依赖（cv2、tqdm、beautifultable、streamlit 等）的导入耗时和内存增量
+"""
+import builtins
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Sequence
+
+# 默认跟踪的重量级第三方依赖（顶层包名）
+HEAVY_MODULES = ("cv2", "numpy", "tqdm", "beautifultable", "streamlit", "streamlit_agraph")
+
+
+def current_rss_kb() -> int:
+    """当前进程常驻内存（KB）；无 /proc 时退回到峰值 RSS"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 上 ru_maxrss 单位为字节
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class ImportProfiler:
+    """导入耗时分析器
+
+    Usage:
+    ---
+    >>> profiler = ImportProfiler()
+    >>> with profiler:
+    >>>     with profiler.track("functions.calculator.main"):
+    >>>         importlib.import_module("functions.calculator.main")
+    >>> print(profiler.format_table())
+    """
+
+    def __init__(self, watch: Sequence[str] = HEAVY_MODULES):
+        self.watch = set(watch)
+        self.records: List[Dict[str, Any]] = []
+        self._owners: List[str] = []
+        self._original_import = None
+
+    def __enter__(self) -> "ImportProfiler":
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._profiled_import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _profiled_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 只跟踪重量级依赖的顶层包，其子模块耗时已计入顶层包
+        if level != 0 or name not in self.watch or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        with self.track(name, kind="dependency"):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+    @contextmanager
+    def track(self, name: str, kind: str = "function"):
+        """记录代码块内一次导入的耗时和内存增量"""
+        record = {
+            "name": name,
+            "kind": kind,
+            "imported_by": self._owners[-1] if self._owners else None,
+            "wall_ms": 0.0,
+            "rss_delta_kb": 0,
+            "ok": True,
+        }
+        self.records.append(record)
+        self._owners.append(name)
+        rss_before = current_rss_kb()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["ok"] = False
+            raise
+        finally:
+            record["wall_ms"] = (time.perf_counter() - start) * 1000
+            record["rss_delta_kb"] = current_rss_kb() - rss_before
+            self._owners.pop()
+
+    def sorted_records(self) -> List[Dict[str, Any]]:
+        """按耗时从高到低排序的记录"""
+        return sorted(self.records, key=lambda r: r["wall_ms"], reverse=True)
+
+    def to_json(self) -> str:
+        """JSON 格式报告"""
+        function_records = [r for r in self.records if r["kind"] == "function"]
+        report = {
+            "total_ms": sum(r["wall_ms"] for r in function_records),
+            "total_rss_delta_kb": sum(r["rss_delta_kb"] for r in function_records),
+            "records": self.sorted_records(),
+        }
+        return json.dumps(report, ensure_ascii=False, indent=2)
+
+    def format_table(self) -> str:
+        """文本表格格式报告（依赖项的耗时已计入其所属功能模块）"""
+        lines = [f"{'模块':<40} {'类型':<10} {'耗时(ms)':>10} {'内存(KB)':>10}  导入方"]
+        lines.append("-" * 90)
+        for record in self.sorted_records():
+            kind = "功能模块" if record["kind"] == "function" else "依赖"
+            status = "" if record["ok"] else "  (失败)"
+            lines.append(
+                f"{record['name']:<40} {kind:<10} {record['wall_ms']:>10.1f} "
+                f"{record['rss_delta_kb']:>10}  {record['imported_by'] or '-'}{status}"
+            )
+        function_records = [r for r in self.records if r["kind"] == "function"]
+        lines.append("-" * 90)
+        lines.append(f"功能模块合计: {len(function_records)} 个, "
+                     f"{sum(r['wall_ms'] for r in function_records):.1f} ms, "
+                     f"{sum(r['rss_delta_kb'] for r in function_records)} KB")
+        return "\n".join(lines)
+
+    def report(self, fmt: str = "table") -> str:
+        """按格式生成报告：table 或 json"""
+        return self.to_json() if fmt == "json" else self.format_table()
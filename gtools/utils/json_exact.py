@@ -0,0 +1,35 @@
+"""
+判断值能否经 JSON 原样还原
+"""
+from typing import Any, Optional
+
+
+def fits_json(value: Any, limit: Optional[int] = None) -> bool:
+    """value 能否经 JSON 原样还原（且估算大小不超过 limit）；超出时立即停止，不遍历完整的大对象
+
+    只接受 JSON 类型本身（不含子类）：tuple 会还原成 list，非 str 的字典键会变成 str
+    """
+    size, stack = 0, [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if item is None or kind in (bool, int, float):
+            size += 8
+        elif kind is str:
+            size += len(item) + 2
+        elif kind is list:
+            size += len(item) + 2
+            if limit is None or size <= limit:
+                stack.extend(item)
+        elif kind is dict:
+            size += 2 * len(item) + 2
+            if limit is None or size <= limit:
+                for key, child in item.items():
+                    if type(key) is not str:
+                        return False
+                    stack.extend((key, child))
+        else:
+            return False
+        if limit is not None and size > limit:
+            return False
+    return True
@@ -0,0 +1,11 @@
+"""
+终端文本对齐
+"""
+import unicodedata
+
+
+def display_width(text: str) -> int:
+    """终端显示宽度（全角字符占两列）"""
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
@@ -0,0 +1,195 @@
+"""
+监听模式（gtools watch）
+在同一进程中保持注册表、模块和参数解析器驻留，监听的文件变化后重新执行模块：
+
+    gtools watch calculator 1 2 3 --operation multiply --paths data/ configs/calculator
+
+通过轮询文件的 (mtime_ns, size) 快照检测变化，不依赖 inotify 等平台接口；
+检测到变化后等待快照在 debounce 时间内保持不变再执行，编辑器保存时的多次写入只触发一次。
+模块自身的 main.py 变化时先重新加载模块，默认配置在每次执行时重新读取。
+
+--paths / --interval / --debounce 可以出现在模块参数之间，`--` 之后的参数原样传给模块。
+"""
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .manifest import get_module_files, module_import_path
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.2
+
+# 遍历目录时跳过的目录名（另外跳过所有以 . 开头的目录）
+IGNORED_DIRS = {"__pycache__", "node_modules"}
+
+# watch 自身的选项：(选项, 是否接受多个值)
+WATCH_OPTIONS = {"--paths": True, "--interval": False, "--debounce": False}
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def split_watch_argv(argv: List[str]) -> Tuple[List[str], List[str]]:
+    """把 watch 之后的参数拆分为 (watch 选项 + 模块名, 模块参数)
+
+    >>> split_watch_argv(['calculator', '1', '2', '--paths', 'data', '--operation', 'add'])
+    (['calculator', '--paths', 'data'], ['1', '2', '--operation', 'add'])
+    """
+    options, rest = [], []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--":
+            rest.extend(argv[i + 1:])
+            break
+        flag = arg.split("=", 1)[0]
+        if flag not in WATCH_OPTIONS:
+            rest.append(arg)
+            i += 1
+            continue
+        options.append(arg)
+        i += 1
+        if "=" in arg:
+            continue
+        if WATCH_OPTIONS[flag]:
+            while i < len(argv) and not argv[i].startswith("-"):
+                options.append(argv[i])
+                i += 1
+        elif i < len(argv):
+            options.append(argv[i])
+            i += 1
+    # 第一个非选项参数是模块名，-h 保留给 watch 自身的帮助
+    for j, arg in enumerate(rest):
+        if arg in ("-h", "--help") or not arg.startswith("-"):
+            return [arg] + options, rest[:j] + rest[j + 1:]
+    return options, rest
+
+
+def _scan(path: str, snapshot: Snapshot):
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith(".") and entry.name not in IGNORED_DIRS:
+                    _scan(entry.path, snapshot)
+            elif entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            continue
+
+
+def take_snapshot(paths: Iterable[str]) -> Snapshot:
+    """监听路径下所有文件的 {路径: (mtime_ns, size)}，目录递归遍历，不存在的路径忽略"""
+    snapshot: Snapshot = {}
+    for path in paths:
+        if os.path.isdir(path):
+            _scan(path, snapshot)
+        else:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def changed_files(old: Snapshot, new: Snapshot) -> List[str]:
+    """两个快照之间新增、删除或修改的文件"""
+    return sorted(path for path in old.keys() | new.keys() if old.get(path) != new.get(path))
+
+
+class Watcher:
+    """执行模块，并在监听的文件变化后重新执行
+
+    Usage:
+    ---
+    >>> watcher = Watcher(cli, "calculator", ["1", "2"], paths=["data"])
+    >>> watcher.loop()
+    """
+
+    def __init__(self, cli, module_name: str, module_args: List[str], paths: Optional[List[str]] = None,
+                 interval: float = DEFAULT_INTERVAL, debounce: float = DEFAULT_DEBOUNCE):
+        self.cli = cli
+        self.module_name = module_name
+        self.module_args = module_args
+        self.interval = interval
+        self.debounce = debounce
+        files = get_module_files(module_name)
+        self.main_py = files.main_py if files is not None else None
+        self.import_path = module_import_path(files.item) if files is not None else None
+        if paths is None:
+            paths = [self.cli.config_handler.get_default_config_path(module_name)]
+            if files is not None:
+                paths.insert(0, files.path)
+        self.paths = [os.path.abspath(path) for path in paths]
+        # 模块自身的 main.py 总是被监听，变化时重新加载
+        if self.main_py and not any(self.main_py == path or self.main_py.startswith(path + os.sep)
+                                    for path in self.paths):
+            self.paths.append(self.main_py)
+        self.snapshot = take_snapshot(self.paths)
+        self.runs = 0
+
+    def run_once(self) -> bool:
+        """执行一次模块，出错或调用 sys.exit 不会结束监听，返回是否成功"""
+        self.runs += 1
+        start = time.perf_counter()
+        ok = True
+        try:
+            self.cli.run_module(self.module_name, list(self.module_args))
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception as e:
+            print(f"❌ 运行模块 '{self.module_name}' 时出错: {e}")
+            ok = False
+        sys.stdout.flush()
+        elapsed = (time.perf_counter() - start) * 1000
+        status = "✓ 完成" if ok else "✗ 失败"
+        print(f"── {status}（第 {self.runs} 次，{elapsed:.1f}ms），等待文件变化… ──", flush=True)
+        return ok
+
+    def wait_for_change(self) -> List[str]:
+        """轮询直到文件发生变化，并等待变化在 debounce 时间内平息，返回变化的文件"""
+        while True:
+            time.sleep(self.interval)
+            current = take_snapshot(self.paths)
+            if current != self.snapshot:
+                break
+        # 去抖：快照在 debounce 时间内保持不变才认为写入结束
+        while self.debounce > 0:
+            time.sleep(self.debounce)
+            settled = take_snapshot(self.paths)
+            if settled == current:
+                break
+            current = settled
+        changed = changed_files(self.snapshot, current)
+        self.snapshot = current
+        return changed
+
+    def reload_if_needed(self, changed: List[str]) -> bool:
+        """模块的 main.py 发生变化时重新加载模块，返回是否重新加载"""
+        if not self.main_py or self.main_py not in changed or self.import_path not in sys.modules:
+            return False
+        from .registry import reload_functions_module
+
+        if reload_functions_module(self.import_path):
+            print(f"已重新加载模块: {self.import_path}")
+        return True
+
+    def loop(self, max_runs: Optional[int] = None):
+        """执行模块并持续监听，Ctrl-C 退出；max_runs 限制执行次数（用于测试）"""
+        print(f"👀 监听 {len(self.snapshot)} 个文件（{', '.join(self.paths)}），Ctrl-C 退出")
+        try:
+            self.run_once()
+            while max_runs is None or self.runs < max_runs:
+                changed = self.wait_for_change()
+                shown = ", ".join(os.path.relpath(path) for path in changed[:3])
+                more = f" 等 {len(changed)} 个文件" if len(changed) > 3 else ""
+                print(f"\n🔄 检测到变化: {shown}{more}")
+                self.reload_if_needed(changed)
+                self.run_once()
+        except KeyboardInterrupt:
+            print("\n已停止监听")
@@ -36,7 +36,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "gtools=gtools.cli:main",
+            "gtools=gtools.client:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,49 @@
+"""
+管道测试用的模块：独立进程通过导入本文件注册它们（测试函数中临时注册的模块在子进程中不可用）
+"""
+import argparse
+import os
+import signal
+
+from gtools.registry import ARGS, FUNCTION
+
+BIG_SIZE = 4 << 20
+
+
+@FUNCTION.regist(module_name="_test_env")
+def report_env(args):
+    if args.crash:
+        os.kill(os.getpid(), signal.SIGSEGV)
+    os.environ["GTOOLS_TEST_LEAK"] = "1"
+    # 绕过 sys.stdout 直接写文件描述符，同样应被捕获
+    os.write(1, b"raw fd output\n")
+    return {"cwd": os.getcwd(), "value": os.environ.get("GTOOLS_TEST_VALUE")}
+
+
+@ARGS.regist(module_name="_test_env")
+def report_env_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crash", action="store_true")
+    return parser
+
+
+@FUNCTION.regist(module_name="_test_big")
+def big(args):
+    return {"data": bytearray(b"\x07") * BIG_SIZE, "pid": os.getpid()}
+
+
+@ARGS.regist(module_name="_test_big")
+def big_args():
+    return argparse.ArgumentParser()
+
+
+@FUNCTION.regist(module_name="_test_reader")
+def reader(args):
+    return {"size": len(args.data), "ok": args.data[-1] == 7, "pid": os.getpid()}
+
+
+@ARGS.regist(module_name="_test_reader")
+def reader_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("data")
+    return parser
@@ -196,6 +196,1250 @@ def test_config_edge_cases():
         print(f"❌ 配置边界情况测试失败: {e}")
 
 
+def test_manifest_scan():
+    """测试静态清单：不导入模块即可识别注册信息，并按文件变化失效"""
+    from gtools.manifest import ModuleManifest, scan_module_file
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        module_dir = os.path.join(tmp_dir, "functions", "demo")
+        os.makedirs(module_dir)
+        module_file = os.path.join(module_dir, "main.py")
+        with open(module_file, "w", encoding="utf-8") as f:
+            f.write(
+                "import not_installed_heavy_dependency\n"
+                "NAME = 'demo'\n"
+                "@FUNCTION.regist(module_name=NAME)\n"
+                "def main(args):\n    pass\n"
+                "@ARGS.regist(module_name=f'demo')\n"
+                "def parse_args():\n    pass\n"
+            )
+
+        scanned = scan_module_file(module_file)
+        assert scanned["FUNCTION"] == {"demo": "main"}
+        assert scanned["ARGS"] == {"demo": "parse_args"}
+        assert not scanned["dynamic"]
+
+        cache_dir = os.path.join(tmp_dir, "manifest")
+        manifest = ModuleManifest(os.path.join(tmp_dir, "functions"), cache_dir).load()
+        assert manifest.has("FUNCTION", "demo")
+        assert manifest.find_item("demo") == "demo"
+        assert os.path.exists(os.path.join(cache_dir, "names.json"))
+
+        # 修改文件后清单应重新解析
+        with open(module_file, "a", encoding="utf-8") as f:
+            f.write("@FUNCTION.regist('demo_extra')\ndef extra(args):\n    pass\n")
+        manifest = ModuleManifest(os.path.join(tmp_dir, "functions"), cache_dir).load()
+        assert manifest.module_names() == ["demo", "demo_extra"]
+
+        # 不遍历目录即可判断清单是否仍然有效：main.py 被修改或新增功能包时失效
+        assert manifest.is_current()
+        with open(module_file, "a", encoding="utf-8") as f:
+            f.write("\n")
+        assert not manifest.is_current()
+        manifest.load()
+        assert manifest.is_current()
+        os.makedirs(os.path.join(tmp_dir, "functions", "other"))
+        assert not manifest.is_current()
+
+
+def test_module_index():
+    """测试文件系统索引：一次遍历记录 start.sh / skill.md / default.json"""
+    from gtools.manifest import ModuleIndex
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        functions_dir = os.path.join(tmp_dir, "functions")
+        configs_dir = os.path.join(tmp_dir, "configs")
+        for item, files in {"alpha": ["main.py", "start.sh", "SKILL.md"],
+                            "beta": ["main.py", "skill.md", "SKILL.md"],
+                            "_private": ["main.py"],
+                            "gamma": ["README.md"]}.items():
+            os.makedirs(os.path.join(functions_dir, item))
+            for name in files:
+                open(os.path.join(functions_dir, item, name), "w").close()
+        os.makedirs(os.path.join(configs_dir, "alpha"))
+        open(os.path.join(configs_dir, "alpha", "default.json"), "w").close()
+        os.makedirs(os.path.join(configs_dir, "beta"))
+
+        index = ModuleIndex(functions_dir, configs_dir).scan()
+        assert index.items_with_main() == ["alpha", "beta"]
+        assert index.get("alpha").start_sh.endswith("start.sh")
+        assert index.get("beta").start_sh is None
+        assert index.get("beta").skill_md.endswith("skill.md")
+        assert index.has_default_config("alpha")
+        assert not index.has_default_config("beta")
+
+
+def test_list_without_import():
+    """测试 list / info / root 不会导入功能模块"""
+    code = (
+        "import sys\n"
+        "from gtools.cli import CLI\n"
+        "cli = CLI()\n"
+        "cli.main(['list'])\n"
+        "cli.main(['info', 'calculator'])\n"
+        "cli.main(['root'])\n"
+        "assert not any(m.startswith('functions.') for m in sys.modules), sorted(sys.modules)\n"
+        # 已注册延迟项（如常驻服务中）时同样不导入
+        "from gtools.registry import auto_import_module\n"
+        "auto_import_module('calculator')\n"
+        "cli.main(['info', 'calculator'])\n"
+        "assert not any(m.startswith('functions.') for m in sys.modules), sorted(sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True, cwd=project_root)
+    assert result.returncode == 0, result.stderr
+    assert "calculator" in result.stdout
+
+
+def test_lazy_registry():
+    """测试延迟注册项：首次 get() 时才解析，失败时移除占位项"""
+    from gtools.registry import Registry
+
+    registry = Registry("LAZY_TEST")
+    registry.regist_lazy("dumps", "json", "dumps")
+    assert registry.has("dumps") and registry.is_lazy("dumps")
+    assert registry.get("dumps") is json.dumps
+    assert not registry.is_lazy("dumps")
+
+    registry.regist_lazy("missing", "gtools_module_that_does_not_exist", "main")
+    assert registry.get("missing") is None
+    assert not registry.has("missing")
+
+
+def test_dispatch_imports_single_module():
+    """测试运行单个模块时只导入该模块"""
+    code = (
+        "import sys\n"
+        "from gtools.cli import CLI\n"
+        "CLI().main(['calculator', '1', '2'])\n"
+        "loaded = sorted(m for m in sys.modules if m.endswith('.main') and m.startswith('functions.'))\n"
+        "assert loaded == ['functions.calculator.main'], loaded\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True, cwd=project_root)
+    assert result.returncode == 0, result.stderr
+    assert "3.0" in result.stdout
+
+
+def test_serve_forwarding():
+    """测试常驻服务：客户端转发 argv/cwd/env，输出直接写回客户端的标准输出"""
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, "serve.sock")
+        env = dict(os.environ, GTOOLS_CACHE_DIR=tmp_dir)
+        server = subprocess.Popen([sys.executable, "-m", "gtools", "serve", "--socket", socket_path],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  cwd=project_root, env=env)
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.1)
+            assert os.path.exists(socket_path), "服务未能启动"
+
+            client_env = dict(env, GTOOLS_SERVER=socket_path)
+            result = subprocess.run([sys.executable, "-m", "gtools", "calculator", "1", "2", "5"],
+                                    capture_output=True, text=True, cwd=project_root, env=client_env)
+            assert result.returncode == 0, result.stderr
+            assert "8.0" in result.stdout
+
+            result = subprocess.run([sys.executable, "-m", "gtools", "nonexistent_module"],
+                                    capture_output=True, text=True, cwd=project_root, env=client_env)
+            assert result.returncode == 1
+            assert "nonexistent_module" in result.stdout
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        assert not os.path.exists(socket_path)
+
+        # 服务端接受连接后立即关闭时，客户端回退到本地执行
+        import socket
+        import threading
+        from gtools.client import forward
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socket_path)
+        listener.listen(1)
+        closer = threading.Thread(target=lambda: listener.accept()[0].close())
+        closer.start()
+        try:
+            assert forward(["calculator", "1"], socket_path) is None
+        finally:
+            closer.join(timeout=10)
+            listener.close()
+
+    # functions 目录未变化时处理请求不重新扫描
+    from gtools import manifest as manifest_module, server as server_module
+    refreshes = []
+    loaded = manifest_module._MANIFEST, manifest_module._INDEX
+    original_get_manifest = server_module.get_manifest
+    server_module.get_manifest = lambda refresh=False: refreshes.append(refresh) or original_get_manifest(refresh)
+    try:
+        for _ in range(3):
+            server_module.GtoolsServer(socket_path).refresh_modules()
+    finally:
+        server_module.get_manifest = original_get_manifest
+        manifest_module._MANIFEST, manifest_module._INDEX = loaded
+    assert refreshes == [False] * 3
+
+
+def test_import_profile():
+    """测试导入耗时分析：记录功能模块和被跟踪的依赖，并能输出 JSON 报告"""
+    from gtools.cli import CLI
+    from gtools.utils.import_profile import ImportProfiler
+
+    sys.modules.pop("colorsys", None)
+    profiler = ImportProfiler(watch=("colorsys",))
+    with profiler:
+        with profiler.track("fake_function_module"):
+            import colorsys  # noqa: F401
+    names = {r["name"]: r for r in profiler.records}
+    assert names["colorsys"]["imported_by"] == "fake_function_module"
+    assert names["fake_function_module"]["wall_ms"] >= names["colorsys"]["wall_ms"]
+    assert json.loads(profiler.report("json"))["records"]
+
+    options, rest = CLI().parse_global_options(["--import-profile=json", "calculator", "1"])
+    assert options["import_profile"] == "json"
+    assert rest == ["calculator", "1"]
+
+
+def test_parser_cache():
+    """测试解析器缓存：只构建一次，工厂函数变化时重建，并通过 dest 索引生成参数"""
+    from gtools.registry import ParserCache, Registry
+
+    registry = Registry("PARSER_TEST")
+    build_count = []
+
+    @registry.regist(module_name="demo")
+    def parse_args():
+        build_count.append(1)
+        parser = argparse.ArgumentParser()
+        parser.add_argument("numbers", nargs="+", type=float)
+        parser.add_argument("--operation", "-op", default="add")
+        parser.add_argument("--show-details", "-d", action="store_true")
+        return parser
+
+    cache = ParserCache(registry)
+    parser = cache.get_parser("demo")
+    assert cache.get_parser("demo") is parser
+    assert len(build_count) == 1
+
+    index = cache.get_action_index("demo")
+    assert index["operation"].option_string == "--operation"
+    assert index["show_details"].is_flag
+    assert index["numbers"].option_string is None
+
+    args = cache.build_synthetic_args("demo", {
+        "operation": "multiply", "show_details": False, "unknown": 1,
+        "_positional_args": {"numbers": [1, 2]},
+    })
+    assert args == ["1", "2", "--operation", "multiply"]
+
+    # 重新注册（例如模块重新加载）后自动重建
+    registry.regist(module_name="demo")(lambda: argparse.ArgumentParser())
+    assert cache.get_parser("demo") is not parser
+
+
+def test_compile_namespace():
+    """测试配置直接编译为 Namespace 与 parse_args 结果一致"""
+    import argparse
+    from gtools.registry import compile_namespace, ConfigCompileError
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("numbers", nargs="+", type=float)
+    parser.add_argument("--operation", "-op", choices=["add", "multiply"], default="add")
+    parser.add_argument("--show-details", action="store_true")
+    parser.add_argument("--limit", type=int, default="10")
+
+    config = {"operation": "multiply", "show_details": True, "unknown": 1,
+              "_positional_args": {"numbers": [1, "2.5"]}}
+    args = compile_namespace(parser, config)
+    assert args == parser.parse_args(["1", "2.5", "--operation", "multiply", "--show-details"])
+    assert args.limit == 10
+
+    # None 视为未提供，保留默认值
+    args = compile_namespace(parser, {"operation": None, "_positional_args": {"numbers": [3]}})
+    assert args.operation == "add" and args.numbers == [3.0]
+
+    for bad in ({"_positional_args": {"numbers": [1]}, "operation": "divide"},
+                {"_positional_args": {"numbers": ["x"]}},
+                {"operation": "add"}):
+        try:
+            compile_namespace(parser, bad)
+        except ConfigCompileError:
+            pass
+        else:
+            assert False, f"配置 {bad} 应该编译失败"
+
+
+def test_bench_startup():
+    """测试启动基准测试的统计与结果结构"""
+    from gtools.bench import StartupBenchmark, percentile, summarize
+
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    stats = summarize([10.0, 20.0, 30.0])
+    assert stats["runs"] == 3 and stats["p50"] == 20.0 and stats["max"] == 30.0
+
+    bench = StartupBenchmark(repeat=1, warmup=0, modes=["warm"], scenarios=["root"])
+    report = bench.run()
+    assert report["suite"] == "startup"
+    assert report["results"]["root"]["warm"]["runs"] == 1
+    assert "cold" not in report["results"]["root"]
+    json.dumps(report)
+    assert "root" in bench.format_table(report, baseline=report)
+
+
+def test_nested_namespace_discovery():
+    """测试嵌套命名空间下的功能包发现与分片清单的快速查找"""
+    from gtools.manifest import ModuleIndex, ModuleManifest, module_import_path
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        functions_dir = os.path.join(tmp_dir, "functions")
+        for item, name in {"vision/mark_imgs": "mark_imgs", "vision/ocr/reader": "reader",
+                           "flat": "flat_tool"}.items():
+            module_dir = os.path.join(functions_dir, *item.split("/"))
+            os.makedirs(module_dir)
+            with open(os.path.join(module_dir, "main.py"), "w", encoding="utf-8") as f:
+                f.write(f"@FUNCTION.regist(module_name='{name}')\ndef main(args):\n    pass\n")
+        open(os.path.join(functions_dir, "vision", "start.sh"), "w").close()
+
+        index = ModuleIndex(functions_dir, os.path.join(tmp_dir, "configs")).scan()
+        assert index.items_with_main() == ["flat", "vision/mark_imgs", "vision/ocr/reader"]
+        assert index.find("mark_imgs").item == "vision/mark_imgs"
+        assert module_import_path("vision/ocr/reader") == "functions.vision.ocr.reader.main"
+
+        cache_dir = os.path.join(tmp_dir, "manifest")
+        manifest = ModuleManifest(functions_dir, cache_dir).load(index)
+        assert manifest.find_item("reader") == "vision/ocr/reader"
+
+        # 快速路径：只读取名称索引和一个分片
+        item, entry, dynamic = ModuleManifest(functions_dir, cache_dir).lookup("reader")
+        assert item == "vision/ocr/reader" and entry["FUNCTION"] == {"reader": "main"}
+        assert dynamic == []
+        assert ModuleManifest(functions_dir, cache_dir).lookup("missing") is None
+
+        # main.py 变化后快速路径失效，由调用方退回到完整加载
+        with open(os.path.join(functions_dir, "flat", "main.py"), "a", encoding="utf-8") as f:
+            f.write("# changed\n")
+        assert ModuleManifest(functions_dir, cache_dir).lookup("flat_tool") is None
+        assert ModuleManifest(functions_dir, cache_dir).lookup("mark_imgs") is not None
+
+        # 命名空间中新增功能包（可能注册同名模块）后快速路径同样失效，完整加载后恢复
+        os.makedirs(os.path.join(functions_dir, "vision", "ocr", "reader2"))
+        assert ModuleManifest(functions_dir, cache_dir).lookup("reader") is None
+        ModuleManifest(functions_dir, cache_dir).load(ModuleIndex(functions_dir).scan())
+        assert ModuleManifest(functions_dir, cache_dir).lookup("reader") is not None
+
+
+def test_capabilities():
+    """测试注册时声明的执行特性：校验、默认值、静态提取"""
+    from gtools.registry import Registry, CAPABILITY_DEFAULTS
+    from gtools.manifest import scan_module_file
+
+    registry = Registry("TEST")
+
+    @registry.regist(module_name="pure_demo", pure=True, thread_safe=True, max_parallel=4)
+    def pure_demo(args):
+        pass
+
+    capabilities = registry.get_capabilities("pure_demo")
+    assert capabilities["pure"] and capabilities["thread_safe"]
+    assert capabilities["max_parallel"] == 4 and capabilities["est_memory_mb"] is None
+    assert registry.get_capabilities("missing") == CAPABILITY_DEFAULTS
+
+    for bad in ({"io_bound": True, "cpu_bound": True}, {"max_parallel": 0},
+                {"pure": "yes"}, {"est_memory_mb": -1}, {"unknown": True}):
+        try:
+            registry.regist(module_name="bad", **bad)
+        except ValueError:
+            pass
+        else:
+            assert False, f"执行特性 {bad} 应该校验失败"
+
+    # 静态清单提取字面量声明，延迟项无需导入即可查询
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        module_file = os.path.join(tmp_dir, "main.py")
+        with open(module_file, "w", encoding="utf-8") as f:
+            f.write("@FUNCTION.regist(module_name='img', cpu_bound=True, est_memory_mb=512, max_parallel=1)\n"
+                    "def main(args):\n    pass\n")
+        scanned = scan_module_file(module_file)
+        assert scanned["capabilities"] == {"img": {"cpu_bound": True, "est_memory_mb": 512, "max_parallel": 1}}
+
+        # 无法求值的声明跳过，注册时会校验失败的声明不出现在静态结果中
+        bad_file = os.path.join(tmp_dir, "bad.py")
+        with open(bad_file, "w", encoding="utf-8") as f:
+            f.write("@FUNCTION.regist(module_name='a', pure={[1]: 2}, thread_safe=True)\ndef a(args):\n    pass\n"
+                    "@FUNCTION.regist(module_name='b', pure=True, speed=3)\ndef b(args):\n    pass\n"
+                    "@FUNCTION.regist(module_name='c', pure='yes')\ndef c(args):\n    pass\n")
+        bad_scanned = scan_module_file(bad_file)
+        assert bad_scanned["FUNCTION"] == {"a": "a", "b": "b", "c": "c"}
+        assert bad_scanned["capabilities"] == {"a": {"thread_safe": True}}
+
+    registry.regist_lazy("img", "functions.img.main", "main", scanned["capabilities"]["img"])
+    assert registry.get_capabilities("img")["max_parallel"] == 1
+
+
+def test_batch_runner():
+    """测试 batch：同一进程内并发执行，按线程捕获各任务输出"""
+    import io
+    from gtools.runner import BatchRunner, build_module_config
+
+    config = build_module_config("calculator", {"_positional_args": {"numbers": [1, 2]}})
+    assert config["operation"] == "add" and config["_positional_args"]["numbers"] == [1, 2]
+
+    lines = [json.dumps({"id": f"job{i}", "module": "calculator",
+                         "params": {"operation": "multiply", "_positional_args": {"numbers": [i, 10]}}})
+             for i in range(1, 9)]
+    lines += ["not json", json.dumps({"module": "calculator", "params": {"operation": "bad"}})]
+    output = io.StringIO()
+    runner = BatchRunner(workers=4, ordered=True)
+    failures = runner.run(lines, output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failures == 2 and runner.summary["ok"] == 8
+    assert [r["index"] for r in results] == list(range(10))
+    for i, result in enumerate(results[:8], 1):
+        assert result["ok"] and result["id"] == f"job{i}"
+        # 每个任务只捕获到自己的输出
+        assert f"{float(i)} × 10.0 = {float(i * 10)}" in result["stdout"]
+        assert result["stdout"].count("计算器模块") == 1
+    assert results[8]["error"].startswith("任务格式错误")
+    assert results[9]["exit_code"] == 2
+
+
+def test_result_cache():
+    """测试纯模块结果缓存：命中回放、--no-cache、LRU 淘汰、清空"""
+    import io
+    from contextlib import redirect_stdout
+    from gtools.cache import ResultCache, run_cached
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResultCache(cache_dir=tmp_dir, max_bytes=1024 * 1024)
+        calls = []
+
+        def pure_main(args):
+            calls.append(args.n)
+            print(f"n={args.n}")
+            return args.n * 2
+
+        pure = {"pure": True}
+        original = os.environ.pop("GTOOLS_CACHE_DIR", None)
+        os.environ["GTOOLS_CACHE_DIR"] = tmp_dir
+        try:
+            for _ in range(2):
+                out = io.StringIO()
+                with redirect_stdout(out):
+                    assert run_cached("demo", pure_main, argparse.Namespace(n=3), pure) == 6
+                assert out.getvalue() == "n=3\n"
+            assert calls == [3]
+
+            run_cached("demo", pure_main, argparse.Namespace(n=3), pure, no_cache=True)
+            run_cached("demo", pure_main, argparse.Namespace(n=3), {"pure": False})
+            assert calls == [3, 3, 3]
+
+            # 参数不能经 JSON 原样表示时不缓存（tuple 与 list 不能得到同一个键）
+            assert cache.key_for("demo", pure_main, argparse.Namespace(n=3, shape=(1, 2))) is None
+            with redirect_stdout(io.StringIO()):
+                for _ in range(2):
+                    run_cached("demo", pure_main, argparse.Namespace(n=4, shape=(1, 2)), pure)
+            assert calls == [3, 3, 3, 4, 4]
+
+            # 返回值不能经 JSON 原样还原时不缓存，不会回放成 list 或 repr
+            with redirect_stdout(io.StringIO()):
+                for _ in range(2):
+                    assert run_cached("demo", lambda args: pure_main(args) and (args.n, args.n),
+                                      argparse.Namespace(n=5), pure) == (5, 5)
+            assert calls[-2:] == [5, 5]
+        finally:
+            os.environ.pop("GTOOLS_CACHE_DIR")
+            if original is not None:
+                os.environ["GTOOLS_CACHE_DIR"] = original
+
+        # 超过大小上限时淘汰最久未使用的记录
+        small = ResultCache(cache_dir=os.path.join(tmp_dir, "small"), max_bytes=300)
+        for i in range(5):
+            small.put(f"{i:064x}", {"stdout": "x" * 100, "stderr": "", "result": i})
+            os.utime(small._path(f"{i:064x}"), (i, i))
+        stats = small.stats()
+        assert stats["size_bytes"] <= 300 and stats["evictions"] > 0
+        assert small.get(f"{4:064x}")["result"] == 4
+        assert small.get(f"{0:064x}") is None
+        assert small.clear() == stats["entries"]
+        assert small.stats()["entries"] == 0
+
+        # 未超过上限时写入不扫描缓存目录，计数文件大小固定
+        large = ResultCache(cache_dir=os.path.join(tmp_dir, "large"), max_bytes=1024 * 1024)
+        scans = []
+        entries = large._entries
+        large._entries = lambda: scans.append(1) or entries()
+        for i in range(20):
+            large.put(f"{i:064x}", {"stdout": "", "stderr": "", "result": i})
+            large.get(f"{i:064x}")
+        assert len(scans) == 1 and os.path.getsize(large._counters_path()) == 32
+        assert large.stats()["hits"] == 20
+
+        # 多个进程同时计数时不丢失（计数在文件锁内更新）
+        import multiprocessing
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            workers = [context.Process(target=lambda: [small.get(f"{9:064x}") for _ in range(50)])
+                       for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            assert small.stats()["misses"] == 200
+
+
+def test_python_api():
+    """测试 gtools.run：关键字参数与默认配置合并，返回值与耗时"""
+    import gtools
+    from gtools.registry import ConfigCompileError
+
+    result = gtools.run("calculator", numbers=[2, 3, 4], operation="multiply")
+    assert result.value == 24.0
+    assert set(result.timing) == {"resolve_ms", "compile_ms", "call_ms", "total_ms"}
+    assert result.timing["total_ms"] >= result.timing["call_ms"]
+
+    # _positional_args 写法与配置文件一致；未指定的参数取默认配置
+    assert gtools.run("calculator", _positional_args={"numbers": [1, 2]}).value == 3.0
+
+    try:
+        gtools.run("calculator", numbers=[1], operation="divide")
+    except ConfigCompileError:
+        pass
+    else:
+        assert False, "非法的 choices 应该抛出 ConfigCompileError"
+
+    try:
+        gtools.run("no_such_module")
+    except LookupError:
+        pass
+    else:
+        assert False, "未注册的模块应该抛出 LookupError"
+
+
+def test_async_api():
+    """测试 arun / gather：同步模块在线程池执行，协程模块直接 await，并发受 limit 约束"""
+    import asyncio
+    import gtools
+    from gtools.api import arun, gather, run, shutdown_executor
+
+    state = {"running": 0, "peak": 0}
+
+    @FUNCTION.regist(module_name="async_demo", io_bound=True)
+    async def async_demo(args):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return args.value * 2
+
+    @ARGS.regist(module_name="async_demo")
+    def async_demo_args():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("value", type=int)
+        return parser
+
+    async def scenario():
+        single = await arun("calculator", numbers=[1, 2])
+        results = await gather((("async_demo", {"value": i}) for i in range(20)), limit=5)
+        mixed = await gather([("calculator", {"numbers": [3]}), ("no_such_module", {})],
+                             return_exceptions=True)
+        return single, results, mixed
+
+    try:
+        single, results, mixed = asyncio.run(scenario())
+        assert single.value == 3.0
+        assert [r.value for r in results] == [i * 2 for i in range(20)]
+        assert 1 < state["peak"] <= 5
+        assert mixed[0].value == 3.0 and isinstance(mixed[1], LookupError)
+        # 同步接口也能运行协程模块
+        assert run("async_demo", value=4).value == 8
+        # 默认配置按文件缓存，大量调用不会每次在事件循环中读取文件
+        from gtools.registry import ConfigHandler
+        loads = []
+        original_load = ConfigHandler.load_config
+        ConfigHandler.load_config = staticmethod(lambda path: loads.append(path) or original_load(path))
+        try:
+            asyncio.run(gather(("calculator", {"numbers": [i]}) for i in range(50)))
+        finally:
+            ConfigHandler.load_config = staticmethod(original_load)
+        assert loads == []
+        assert gtools.arun is arun
+    finally:
+        FUNCTION.unregist_module(async_demo.__module__)
+        ARGS.unregist_module(async_demo.__module__)
+        shutdown_executor()
+
+
+def test_sweep():
+    """测试参数扫描：候选值拆分、笛卡尔积展开、进程池执行与结果表"""
+    from gtools.sweep import SweepRunner, expand_grid, nest, split_grid_values
+
+    assert split_grid_values('[1,2],[3,4]') == ['[1,2]', '[3,4]']
+    assert split_grid_values('add, multiply') == ['add', 'multiply']
+    assert split_grid_values('"a,b",c') == ['"a,b"', 'c']
+    assert nest({"_positional_args.numbers": [1], "operation": "add"}) == \
+        {"_positional_args": {"numbers": [1]}, "operation": "add"}
+    assert len(expand_grid({"a": [1, 2, 3], "b": ["x", "y"]})) == 6
+    try:
+        expand_grid({"a": []})
+    except ValueError:
+        pass
+    else:
+        assert False, "空的候选值列表应该报错"
+
+    runner = SweepRunner(workers=2, executor="process")
+    results = runner.run("calculator", {"_positional_args": {"numbers": [2, 5]}},
+                         {"operation": ["add", "multiply", "bogus"]})
+    assert [r["params"]["operation"] for r in results] == ["add", "multiply", "bogus"]
+    assert [r["result"] for r in results[:2]] == [7.0, 10.0]
+    assert not results[2]["ok"] and results[2]["exit_code"] == 2
+    table = runner.format_table(results)
+    assert "multiply" in table and "2.0 × 5.0 = 10.0" in table
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sweep.jsonl")
+        runner.write_results(results, path)
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 3
+
+
+def test_trace():
+    """测试 --trace：未开启时返回共享空上下文，开启后写出 Chrome trace 事件"""
+    from gtools import trace
+
+    assert not trace.enabled()
+    assert trace.span("noop") is trace.span("other")
+
+    tracer = trace.start()
+    try:
+        with trace.span("outer", "test", key="value"):
+            with trace.span("inner", "test"):
+                pass
+    finally:
+        assert trace.stop() is tracer
+    events = {e["name"]: e for e in tracer.to_json()["traceEvents"] if e["ph"] == "X"}
+    assert events["outer"]["args"] == {"key": "value"}
+    assert events["outer"]["ts"] <= events["inner"]["ts"]
+    assert events["inner"]["dur"] <= events["outer"]["dur"]
+
+    # @traced 装饰的函数（合成 argv、合并默认配置）同样记录区间
+    from gtools.registry import build_synthetic_args
+    from gtools.runner import build_module_config
+    tracer = trace.start()
+    try:
+        assert build_synthetic_args("calculator", {"_positional_args": {"numbers": [1, 2]}}) == ["1", "2"]
+        assert build_module_config("calculator", {"operation": "multiply"})["operation"] == "multiply"
+    finally:
+        trace.stop()
+    names = {e["name"] for e in tracer.events}
+    assert {"synthesize args", "build module config"} <= names, names
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "trace.json")
+        result = subprocess.run(
+            [sys.executable, "-m", "gtools", "--no-cache", "--trace", path, "calculator", "1", "2"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)), timeout=60)
+        assert result.returncode == 0, result.stderr
+        with open(path, encoding="utf-8") as f:
+            names = {e["name"] for e in json.load(f)["traceEvents"]}
+        for expected in ("module discovery", "load config", "build parser calculator", "execute calculator"):
+            assert expected in names, names
+
+
+def test_resource_stats():
+    """测试 --stats：资源计量、多节点合计与 JSON 报告"""
+    from gtools import stats
+
+    assert stats.measure("noop") is stats.measure("other")
+
+    records = stats.start()
+    try:
+        with stats.measure("busy"):
+            data = [bytearray(1024 * 1024) for _ in range(32)]
+            sum(i * i for i in range(200000))
+            del data
+        with stats.measure("idle"):
+            pass
+    finally:
+        assert stats.stop() is records
+    busy, idle = records
+    assert busy["label"] == "busy" and busy["ok"]
+    assert busy["user_s"] + busy["sys_s"] > 0 and busy["wall_s"] >= idle["wall_s"]
+    assert busy["peak_rss_mb"] > 0
+    for key in ("read_bytes", "write_bytes", "voluntary_ctx_switches", "involuntary_ctx_switches"):
+        assert isinstance(busy[key], int)
+
+    summary = stats.total(records)
+    assert summary["wall_s"] == busy["wall_s"] + idle["wall_s"]
+    assert summary["peak_rss_mb"] == max(busy["peak_rss_mb"], idle["peak_rss_mb"])
+    assert "总计" in stats.report(records) and "busy" in stats.report(records)
+    assert json.loads(stats.report(records, "json"))["total"]["label"] == "总计"
+
+    result = subprocess.run(
+        [sys.executable, "-m", "gtools", "--stats=json", "--no-cache", "calculator", "1", "2"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)), timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stderr[result.stderr.index("{"):])
+    assert [run["label"] for run in report["runs"]] == ["calculator"]
+
+
+def test_resource_stats_pipeline():
+    """测试 --stats 与并行 / 独立进程的管道：在执行节点的线程或子进程中测量，汇总到父进程的报告"""
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from gtools import stats
+    from gtools.pipeline import DagExecutor, load_nodes
+    import pipeline_fixtures  # noqa: F401  注册 _test_env
+
+    root = os.path.dirname(os.path.dirname(__file__))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = os.path.join(tmp_dir, "pipeline.json")
+        with open(config, "w", encoding="utf-8") as f:
+            json.dump({"working_directory": root, "modules": [
+                {"name": "a", "module_name": "calculator", "params": {"_positional_args": {"numbers": [1, 2]}}},
+                {"name": "b", "module_name": "calculator", "params": {"_positional_args": {"numbers": [3, 4]}}},
+                {"name": "c", "module_name": "calculator", "params": {"_positional_args": {"numbers": [5, 6]}},
+                 "depends_on": ["a", "b"]}]}, f)
+        result = subprocess.run(
+            [sys.executable, "-m", "gtools", "--stats=json", "--no-cache", "run", "--config", config,
+             "--max-workers", "2"], capture_output=True, text=True, cwd=root, timeout=60)
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stderr[result.stderr.index("{"):])
+        assert sorted(run["label"] for run in report["runs"]) == ["a", "b", "c"]
+        assert all(run["ok"] for run in report["runs"])
+
+        specs = [{"name": "x", "module_name": "_test_env"}, {"name": "y", "module_name": "_test_env"}]
+        for options in ({"isolate": True}, {"executor": "process"}):
+            records = stats.start()
+            try:
+                with redirect_stdout(StringIO()):
+                    results = DagExecutor(max_workers=2, working_directory=tmp_dir, **options).run(load_nodes(specs))
+            finally:
+                stats.stop()
+            assert all(r["ok"] and "stats" not in r for r in results)
+            assert sorted(record["label"] for record in records) == ["x", "y"]
+            assert all(record["wall_s"] > 0 for record in records)
+
+
+def test_completion_index():
+    """测试命令行补全：静态提取选项和 choices，清单变化时同步更新索引，补全函数不启动 Python"""
+    import shutil
+    from gtools.completion import bash_script, get_index_path, write_index
+    from gtools.manifest import ModuleManifest, scan_module_file
+
+    options = scan_module_file(os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                            "functions", "mark_imgs", "main.py"))["options"]["mark_imgs"]
+    camera = next(option for option in options if "--camera" in option["flags"])
+    assert camera["flags"] == ["--camera", "-c"] and camera["choices"][-1] == "t2" and camera["value"]
+    assert not next(option for option in options if "--big" in option["flags"])["value"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        functions_dir = os.path.join(tmp_dir, "functions")
+        module_file = os.path.join(functions_dir, "demo", "main.py")
+        os.makedirs(os.path.dirname(module_file))
+        with open(module_file, "w", encoding="utf-8") as f:
+            f.write("import cv2\n"
+                    "@FUNCTION.regist(module_name='demo')\ndef main(args):\n    pass\n"
+                    "@ARGS.regist(module_name='demo')\ndef parse_args():\n"
+                    "    parser.add_argument('--mode', choices=['fast', 'slow'])\n    return parser\n")
+        cache_dir = os.path.join(tmp_dir, "manifest")
+        manifest = ModuleManifest(functions_dir, cache_dir).load()
+        index_path = write_index(manifest)
+        assert index_path == get_index_path(manifest)
+        with open(index_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert "mod\tdemo" in lines and "opt\tdemo\t--mode\t1\tfast slow" in lines
+        assert "arg\t@info\t@modules" in lines and "cmd\tcompletion" in lines
+
+        # 功能包变化时清单重写，补全索引随之更新
+        with open(module_file, "a", encoding="utf-8") as f:
+            f.write("@FUNCTION.regist(module_name='demo2')\ndef other(args):\n    pass\n")
+        ModuleManifest(functions_dir, cache_dir).load()
+        with open(index_path, encoding="utf-8") as f:
+            assert "mod\tdemo2" in f.read().splitlines()
+
+        bash = shutil.which("bash")
+        if bash:
+            script = os.path.join(tmp_dir, "completion.bash")
+            with open(script, "w", encoding="utf-8") as f:
+                f.write(bash_script(index_path))
+            result = subprocess.run(
+                [bash, "-c", f"source {script}; COMP_WORDS=(gtools demo --mode ''); COMP_CWORD=3; "
+                             "_gtools_complete; echo ${COMPREPLY[*]}"],
+                capture_output=True, text=True, timeout=30)
+            assert result.stdout.split() == ["fast", "slow"], result.stderr
+
+
+def test_watch():
+    """测试监听模式：参数拆分、快照比较，以及文件变化（含去抖）后重新执行且出错不中断监听"""
+    import threading
+    import time
+    from gtools.watch import Watcher, changed_files, split_watch_argv, take_snapshot
+
+    assert split_watch_argv(["calculator", "1", "--paths", "a", "b", "--operation", "add", "--interval=1"]) == \
+        (["calculator", "--paths", "a", "b", "--interval=1"], ["1", "--operation", "add"])
+    assert split_watch_argv(["calculator", "--", "--paths"]) == (["calculator"], ["--paths"])
+
+    class FakeCLI:
+        config_handler = ConfigHandler()
+
+        def __init__(self):
+            self.calls = []
+
+        def run_module(self, module_name, args):
+            self.calls.append(args)
+            if len(self.calls) == 1:
+                sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data = os.path.join(tmp_dir, "data.txt")
+        with open(data, "w") as f:
+            f.write("1")
+        os.makedirs(os.path.join(tmp_dir, "__pycache__"))
+        before = take_snapshot([tmp_dir])
+        assert list(before) == [data]
+        with open(os.path.join(tmp_dir, "__pycache__", "x.pyc"), "w") as f:
+            f.write("ignored")
+        assert take_snapshot([tmp_dir]) == before
+
+        cli = FakeCLI()
+        watcher = Watcher(cli, "calculator", ["1", "2"], paths=[tmp_dir], interval=0.02, debounce=0.05)
+
+        def edit():
+            time.sleep(0.1)
+            for i in range(3):
+                with open(data, "a") as f:
+                    f.write(str(i))
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=edit)
+        thread.start()
+        watcher.loop(max_runs=2)
+        thread.join()
+        # 第一次执行以 sys.exit(1) 结束，连续三次写入只触发一次重新执行
+        assert cli.calls == [["1", "2"], ["1", "2"]]
+        assert watcher.snapshot[data] == take_snapshot([data])[data]
+        assert changed_files(before, take_snapshot([tmp_dir])) == [data]
+
+
+def test_output_modes_and_events():
+    """测试输出模式：大缓冲区写日志文件、结构化事件的收集与 JSONL 输出、--quiet 命令行"""
+    from gtools import events
+    from gtools.output import BufferedStdout, parse_size
+
+    assert parse_size("64K") == 65536 and parse_size("4M") == 4 << 20 and parse_size("100") == 100
+    for bad in ("abc", "0", "-1K"):
+        try:
+            parse_size(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    # 未开启时 emit 不做任何事，scope 返回共享的空上下文
+    assert not events.enabled() and events.scope("x") is events.scope("y")
+    events.emit("ignored", value=1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "logs", "run.log")
+        original = sys.stdout
+        with BufferedStdout(log_path, buffer_size=1 << 16) as output:
+            for i in range(1000):
+                print(f"line {i}")
+            # 缓冲区未满时还没有写入文件
+            assert os.path.getsize(log_path) == 0
+        assert sys.stdout is original
+        with open(log_path, encoding="utf-8") as f:
+            assert f.read().splitlines()[-1] == "line 999"
+        assert output.bytes_written == os.path.getsize(log_path)
+
+        with events.collect() as outer:
+            with events.collect() as records:
+                with events.scope("format"):
+                    events.emit("file_formatted", path="a.py", changed=True)
+                events.emit("done")
+        assert [(r["event"], r["module"]) for r in records] == [("file_formatted", "format"), ("done", None)]
+        assert records[0]["path"] == "a.py" and outer == records and not events.enabled()
+
+        events_path = os.path.join(tmp_dir, "events.jsonl")
+        sink = events.start(events_path)
+        events.emit("progress", done=1, total=2)
+        events.stop()
+        assert sink.count == 1 and not events.enabled()
+        with open(events_path, encoding="utf-8") as f:
+            assert json.loads(f.readline())["done"] == 1
+
+        quiet_log = os.path.join(tmp_dir, "quiet.log")
+        result = subprocess.run([sys.executable, "-m", "gtools", "--no-cache", f"--quiet={quiet_log}",
+                                 "calculator", "1", "2"],
+                                cwd=os.path.dirname(os.path.dirname(__file__)),
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0 and result.stdout == "", result.stderr
+        assert quiet_log in result.stderr
+        with open(quiet_log, encoding="utf-8") as f:
+            assert "1.0 + 2.0 = 3.0" in f.read()
+
+
+def test_pipeline_dag():
+    """测试管道调度：依赖完成即启动、并行执行、module_name 查找、失败策略与环检测"""
+    import threading
+    import time
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from gtools.pipeline import DagExecutor, PipelineError, load_nodes, topological_order
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    @FUNCTION.regist(module_name="_test_sleepy", thread_safe=True)
+    def sleepy(args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(args.seconds)
+        with lock:
+            active[0] -= 1
+        return args.seconds
+
+    @ARGS.regist(module_name="_test_sleepy")
+    def sleepy_args():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--seconds", type=float, default=0.2)
+        return parser
+
+    def calc(name, numbers, depends_on=()):
+        return {"name": name, "module_name": "calculator", "depends_on": list(depends_on),
+                "params": {"_positional_args": {"numbers": numbers}}}
+
+    specs = [{"name": f"s{i}", "module_name": "_test_sleepy", "params": {}} for i in range(4)]
+    specs.append(calc("total", [1, 2], depends_on=[f"s{i}" for i in range(4)]))
+    nodes = load_nodes(specs)
+    assert topological_order(nodes)[-1] == "total"
+
+    executor = DagExecutor(max_workers=4)
+    with redirect_stdout(StringIO()):
+        results = executor.run(nodes)
+    assert [r["status"] for r in results] == ["ok"] * 5 and results[-1]["result"] == 3.0
+    # 四个 0.2 秒的节点同时在执行（以并发数判断，不依赖墙钟时间）
+    assert peak[0] == 4
+    assert "1.0 + 2.0 = 3.0" in results[-1]["stdout"] and "并行加速" in executor.format_summary(results)
+
+    specs = [calc("bad", [1]), calc("ok", [1, 2]), calc("child", [1], ["bad"]), calc("grandchild", [1], ["child"])]
+    specs[0]["params"]["operation"] = "bogus"
+    with redirect_stdout(StringIO()):
+        results = {r["name"]: r for r in DagExecutor(max_workers=2, on_error="continue").run(load_nodes(specs))}
+        assert results["bad"]["status"] == "failed" and results["bad"]["exit_code"] == 2
+        assert results["ok"]["status"] == "ok"
+        assert results["grandchild"]["status"] == "skipped" and "child" in results["grandchild"]["error"]
+
+        results = {r["name"]: r for r in DagExecutor(on_error="fail-fast").run(load_nodes(specs))}
+        assert results["ok"]["status"] == "skipped" and "fail-fast" in results["ok"]["error"]
+
+    for bad_specs in ([calc("a", [1], ["b"]), calc("b", [1], ["a"])], [calc("a", [1], ["missing"])],
+                      [calc("a", [1]), calc("a", [2])]):
+        try:
+            load_nodes(bad_specs)
+            assert False, bad_specs
+        except PipelineError:
+            pass
+    FUNCTION.unregist_module(__name__)
+    ARGS.unregist_module(__name__)
+
+
+def test_pipeline_isolation():
+    """测试节点隔离：每个节点单独的工作目录和环境变量、文件描述符层面的输出捕获、崩溃不影响其他节点"""
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from gtools.pipeline import DagExecutor, PipelineError, load_nodes
+    import pipeline_fixtures  # noqa: F401  注册 _test_env
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, "sub"))
+        specs = [{"name": "crash", "module_name": "_test_env", "params": {"crash": True}},
+                 {"name": "a", "module_name": "_test_env", "working_directory": "sub",
+                  "env": {"GTOOLS_TEST_VALUE": "node"}},
+                 {"name": "b", "module_name": "_test_env", "depends_on": ["a"]}]
+        original_cwd = os.getcwd()
+        executor = DagExecutor(max_workers=2, on_error="continue", working_directory=tmp_dir,
+                               env={"GTOOLS_TEST_VALUE": "pipeline"}, isolate=True)
+        with redirect_stdout(StringIO()):
+            results = {r["name"]: r for r in executor.run(load_nodes(specs))}
+        assert results["crash"]["status"] == "failed" and "SIGSEGV" in results["crash"]["error"]
+        assert "report_env" in results["crash"]["stderr"]
+        assert results["a"]["result"] == {"cwd": os.path.realpath(os.path.join(tmp_dir, "sub")), "value": "node"}
+        assert results["b"]["result"] == {"cwd": os.path.realpath(tmp_dir), "value": "pipeline"}
+        assert "raw fd output" in results["a"]["stdout"] and results["a"]["pid"] != os.getpid()
+        # 节点对工作目录和环境变量的修改不会泄漏到当前进程
+        assert os.getcwd() == original_cwd and "GTOOLS_TEST_LEAK" not in os.environ
+
+        # 串行执行时按节点切换并恢复
+        with redirect_stdout(StringIO()):
+            results = {r["name"]: r for r in DagExecutor(working_directory=tmp_dir).run(load_nodes(specs[1:]))}
+        assert results["a"]["result"]["value"] == "node" and results["b"]["result"]["value"] is None
+        assert os.getcwd() == original_cwd
+        os.environ.pop("GTOOLS_TEST_LEAK", None)
+
+        try:
+            DagExecutor(max_workers=2).run(load_nodes(specs[1:]))
+            assert False
+        except PipelineError:
+            pass
+
+
+def test_pipeline_incremental():
+    """测试增量执行：指纹未变化的节点跳过，参数/输入文件变化只重新执行该节点及其下游"""
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from gtools.incremental import IncrementalPlanner
+    from gtools.pipeline import DagExecutor, load_nodes
+
+    calls = []
+
+    @FUNCTION.regist(module_name="_test_counted")
+    def counted(args):
+        calls.append(args.label)
+        return args.label
+
+    @ARGS.regist(module_name="_test_counted")
+    def counted_args():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--label", default="")
+        return parser
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, "input.txt"), "w") as f:
+            f.write("v1")
+        state_path = os.path.join(tmp_dir, "state.json")
+        # a -> b -> c，a -> d
+        specs = [{"name": "a", "module_name": "_test_counted", "params": {"label": "a"}},
+                 {"name": "b", "module_name": "_test_counted", "params": {"label": "b"}, "depends_on": ["a"],
+                  "input_files": ["*.txt"]},
+                 {"name": "c", "module_name": "_test_counted", "params": {"label": "c"}, "depends_on": ["b"]},
+                 {"name": "d", "module_name": "_test_counted", "params": {"label": "d"}, "depends_on": ["a"]}]
+
+        def run(**kwargs):
+            calls.clear()
+            max_workers = kwargs.pop("max_workers", 1)
+            executor = DagExecutor(max_workers=max_workers, working_directory=tmp_dir,
+                                   planner=IncrementalPlanner(state_path, **kwargs))
+            with redirect_stdout(StringIO()) as out:
+                results = {r["name"]: r for r in executor.run(load_nodes(specs))}
+            return sorted(calls), results, out.getvalue()
+
+        assert run()[0] == ["a", "b", "c", "d"]
+        executed, results, _ = run()
+        assert executed == [] and all(r["status"] == "up-to-date" and r["ok"] for r in results.values())
+        # 跳过的节点沿用上次的结果
+        assert results["c"]["result"] == "c"
+
+        specs[1]["params"]["label"] = "b2"
+        executed, _, output = run(explain=True)
+        assert executed == ["b2", "c"]
+        assert "变化: 参数" in output and "上游节点已重新执行: b" in output
+
+        with open(os.path.join(tmp_dir, "input.txt"), "w") as f:
+            f.write("v2")
+        executed, _, output = run(explain=True)
+        assert executed == ["b2", "c"] and "input.txt" in output
+
+        assert run(force_nodes={"a"})[0] == ["a", "b2", "c", "d"]
+        assert run(force=True)[0] == ["a", "b2", "c", "d"]
+        # 执行器类型和并行度不影响指纹
+        assert run(max_workers=2)[0] == []
+
+        # 经 JSON 无法原样还原的返回值（tuple、非 str 的字典键）被下游引用时，上游重新执行
+        received = []
+
+        @FUNCTION.regist(module_name="_test_pair")
+        def pair(args):
+            calls.append("pair")
+            return (1, 2), {1: "a"}
+
+        @ARGS.regist(module_name="_test_pair")
+        def pair_args():
+            return argparse.ArgumentParser()
+
+        @FUNCTION.regist(module_name="_test_take")
+        def take(args):
+            received.append(args.value)
+
+        @ARGS.regist(module_name="_test_take")
+        def take_args():
+            parser = argparse.ArgumentParser()
+            parser.add_argument("--value", type=list)
+            return parser
+
+        specs[:] = [{"name": "pair", "module_name": "_test_pair"},
+                    {"name": "take", "module_name": "_test_take", "inputs": {"value": "pair.result"}}]
+        for _ in range(2):
+            executed, results, _ = run()
+            assert executed == ["pair"] and results["pair"]["replayable"] is False
+            assert received.pop() == ((1, 2), {1: "a"})
+        # 旧版本状态文件中有损记录为可还原的结果不会被沿用，上游重新执行
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        state["version"] = 1
+        state["nodes"]["pair"].update(result=[[1, 2], {"1": "a"}], replayable=True)
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        assert run()[0] == ["pair"] and received.pop() == ((1, 2), {1: "a"})
+    FUNCTION.unregist_module(__name__)
+    ARGS.unregist_module(__name__)
+
+
+def test_pipeline_data_edges():
+    """测试数据边：上游返回值不经序列化注入下游参数，所有下游结束后释放"""
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from gtools.artifacts import ArtifactStore
+    from gtools.pipeline import DagExecutor, PipelineError, load_nodes
+
+    received = {}
+
+    class Payload:
+        """不可 JSON 序列化的返回值"""
+
+    @FUNCTION.regist(module_name="_test_producer")
+    def producer(args):
+        return {"payload": Payload(), "count": args.count}
+
+    @ARGS.regist(module_name="_test_producer")
+    def producer_args():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--count", type=int, default=3)
+        return parser
+
+    @FUNCTION.regist(module_name="_test_consumer")
+    def consumer(args):
+        received[args.tag] = args.items
+        return len(args.items)
+
+    @ARGS.regist(module_name="_test_consumer")
+    def consumer_args():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("items", nargs="+", type=float)
+        parser.add_argument("--tag", default="")
+        return parser
+
+    specs = [{"name": "p", "module_name": "_test_producer"},
+             {"name": "one", "module_name": "_test_consumer", "params": {"tag": "one"},
+              "inputs": {"items": ["p.result.payload", "p.result.count"]}},
+             {"name": "two", "module_name": "_test_consumer", "params": {"tag": "two"},
+              "inputs": {"items": ["one.result"]}}]
+    nodes = load_nodes(specs)
+    # 输入引用的节点自动成为依赖
+    assert nodes[1].depends_on == ["p"] and nodes[2].depends_on == ["one"]
+    for max_workers in (1, 2):
+        received.clear()
+        with redirect_stdout(StringIO()):
+            results = {r["name"]: r for r in DagExecutor(max_workers=max_workers).run(load_nodes(specs))}
+        assert all(r["ok"] for r in results.values())
+        # 不经过类型转换和序列化：收到的是上游返回的同一个对象
+        assert isinstance(received["one"][0], Payload) and received["one"][1] == 3
+        assert received["two"] == [2] and "value" not in results["p"]
+
+    store = ArtifactStore()
+    store.publish("p", [1, 2], consumers=2)
+    assert store.resolve("p.result.1") == 2
+    store.release("p")
+    assert "p" in store
+    store.release("p")
+    assert len(store) == 0
+
+    with redirect_stdout(StringIO()):
+        results = DagExecutor().run(load_nodes([specs[0], {"name": "bad", "module_name": "_test_consumer",
+                                                           "inputs": {"missing": "p.result"}}]))
+    assert results[1]["status"] == "failed" and "未知参数" in results[1]["error"]
+    try:
+        load_nodes([{"name": "x", "inputs": {"items": "p.output"}}])
+        assert False
+    except PipelineError:
+        pass
+    FUNCTION.unregist_module(__name__)
+    ARGS.unregist_module(__name__)
+
+
+def test_shared_memory_transport():
+    """测试共享内存传递：大返回值经共享内存交给子进程中的下游节点，最后一个下游结束后释放"""
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from multiprocessing import shared_memory
+    from gtools import transport
+    from gtools.pipeline import DagExecutor, load_nodes
+
+    if not transport.SHARED_MEMORY_AVAILABLE:
+        return
+    # 同时注册 _test_big / _test_reader（独立进程中导入该文件）
+    from pipeline_fixtures import BIG_SIZE as size
+    assert transport.share(bytearray(10)) == bytearray(10)
+    handle = transport.share({"data": bytearray(b"\x07") * size, "label": "x"})
+    assert isinstance(handle, transport.SharedValue) and handle.size >= size
+    assert handle.select(["label"]).load() == "x"
+    transport.close_attached()
+    handle.unlink()
+    try:
+        shared_memory.SharedMemory(name=handle.name)
+        assert False
+    except FileNotFoundError:
+        pass
+
+    specs = [{"name": "big", "module_name": "_test_big"},
+             {"name": "r1", "module_name": "_test_reader", "inputs": {"data": "big.result.data"}},
+             {"name": "r2", "module_name": "_test_reader", "inputs": {"data": "big.result.data"}}]
+    # 父进程在最后一个下游节点结束后 unlink
+    released = []
+    original_unlink = transport.SharedValue.unlink
+
+    def recording_unlink(self):
+        released.append(self.name)
+        original_unlink(self)
+
+    transport.SharedValue.unlink = recording_unlink
+    try:
+        for options in ({"isolate": True, "max_workers": 2}, {"executor": "process", "max_workers": 2}):
+            with redirect_stdout(StringIO()):
+                results = {r["name"]: r for r in DagExecutor(**options).run(load_nodes(specs))}
+            assert all(r["ok"] for r in results.values())
+            assert results["r1"]["result"]["size"] == size and results["r2"]["result"]["ok"]
+            assert results["r1"]["result"]["pid"] != os.getpid()
+            # 结果中只记录二进制数据的大小
+            assert "<bytearray 4194304 bytes>" in results["big"]["result"]
+    finally:
+        transport.SharedValue.unlink = original_unlink
+    # 可 JSON 序列化的大返回值同样只经共享内存传递，回传的结果中只有摘要
+    import pickle
+    from gtools.pipeline import execute_node
+
+    @FUNCTION.regist(module_name="_test_big_list")
+    def big_list(args):
+        return list(range(size // 4))
+
+    @ARGS.regist(module_name="_test_big_list")
+    def big_list_args():
+        return argparse.ArgumentParser()
+
+    node = {"name": "big", "module": "_test_big_list", "params": {}, "publish": True, "shared_memory": True}
+    result = execute_node(node)
+    assert result["ok"] and isinstance(result["value"], transport.SharedValue)
+    assert len(pickle.dumps(result)) < 64 * 1024 and result["replayable"] is False
+    released.append(result["value"].name)
+    result["value"].unlink()
+    assert isinstance(execute_node({**node, "publish": False})["result"], str)
+    assert len(released) == 3
+    for name in released:
+        try:
+            shared_memory.SharedMemory(name=name)
+            assert False
+        except FileNotFoundError:
+            pass
+    FUNCTION.unregist_module(__name__)
+    ARGS.unregist_module(__name__)
+
+
 def main():
     """主测试函数"""
     print("🚀 开始测试 gtools 功能")